@@ -0,0 +1 @@
+"""Benchmarks package for Even/Odd League"""
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Message codec vs the previous dict path
+
+For representative league.v2 messages, times the full life of one sent
+message:
+  - dict path: dict literal, wrap_request, json.dumps for the wire (what
+    httpx json= did), json.dumps of the log entry, json.loads on receipt
+  - codec path: schema-built message wrapped in Encoded, encoded once and
+    reused for the wire and the log entry, decoded from the same bytes
+
+Standings broadcasts are also timed for a fleet of recipients, where the
+dict path encoded the body once per recipient. A second table compares
+the JSON and binary wire formats: body size, encode + decode time and
+decode time alone.
+
+Usage:
+    python -m benchmarks.codec_bench --players 100 --recipients 100
+"""
+import argparse
+import json
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from utils import binary_codec, codec
+from utils.codec import Encoded, build_message, encode_body, encode_log_entry
+from utils.jsonrpc_utils import wrap_notification, wrap_request
+
+SENDER = "referee:ref_bench"
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def standings(count: int) -> List[Dict[str, Any]]:
+    return [{"rank": i + 1, "player_id": f"player_{i}", "display_name": f"Player {i}", "played": 10,
+             "wins": 5, "draws": 2, "losses": 3, "points": 17} for i in range(count)]
+
+
+def message_fields(players: int) -> Dict[str, Dict[str, Any]]:
+    """Fields (besides the envelope) of each benchmarked message type"""
+    return {
+        "CHOOSE_PARITY_CALL": {
+            "conversation_id": "conv_bench", "match_id": "match_bench", "player_id": "player_1",
+            "game_type": "even_odd", "deadline": now(),
+            "context": {"opponent_id": "player_2", "round_id": 1, "your_standings": {"wins": 0, "losses": 0, "draws": 0}}
+        },
+        "CHOOSE_PARITY_RESPONSE": {
+            "conversation_id": "conv_bench", "auth_token": secrets.token_urlsafe(32), "match_id": "match_bench",
+            "choice": "even"
+        },
+        "GAME_OVER": {
+            "conversation_id": "conv_bench", "match_id": "match_bench", "game_type": "even_odd",
+            "game_result": {"status": "WIN", "winner_player_id": "player_1", "drawn_number": 42,
+                            "number_parity": "even", "choices": {"player_1": "even", "player_2": "odd"},
+                            "reason": "player_1 chose even, number was 42 (even)"}
+        },
+        "MATCH_RESULT_REPORT": {
+            "conversation_id": "conv_bench", "league_id": "league_2025_even_odd", "round_id": 1,
+            "match_id": "match_bench", "game_type": "even_odd", "auth_token": "token_bench",
+            "result": {"winner": "player_1", "score": {"player_1": 3, "player_2": 0},
+                       "details": {"drawn_number": 42, "choices": {"player_1": "even", "player_2": "odd"}}}
+        },
+        "LEAGUE_STANDINGS_UPDATE": {
+            "conversation_id": "conv_bench", "league_id": "league_2025_even_odd", "round_id": 1,
+            "standings": standings(players)
+        },
+    }
+
+
+def dict_path(message_type: str, fields: Dict[str, Any]) -> Callable[[], Any]:
+    def run():
+        message = {"protocol": "league.v2", "message_type": message_type, "sender": SENDER,
+                   "timestamp": now(), **fields}
+        request = wrap_request(message, 1)
+        wire = json.dumps(request).encode("utf-8")
+        json.dumps({"timestamp": now(), "direction": "sent", "message": request}, default=str)
+        return json.loads(wire)
+    return run
+
+
+def codec_path(message_type: str, fields: Dict[str, Any]) -> Callable[[], Any]:
+    def run():
+        message = build_message(message_type, SENDER, now(), **fields)
+        request = Encoded(wrap_request(message, 1))
+        wire = encode_body(request)
+        encode_log_entry({"timestamp": now(), "direction": "sent", "message": request})
+        return codec.loads(wire)
+    return run
+
+
+def dict_broadcast(fields: Dict[str, Any], recipients: int) -> Callable[[], Any]:
+    def run():
+        message = {"protocol": "league.v2", "message_type": "LEAGUE_STANDINGS_UPDATE", "sender": "league_manager",
+                   "timestamp": now(), **fields}
+        payload = wrap_notification(message)
+        for _ in range(recipients):
+            json.dumps(payload).encode("utf-8")
+    return run
+
+
+def codec_broadcast(fields: Dict[str, Any], recipients: int) -> Callable[[], Any]:
+    def run():
+        message = build_message("LEAGUE_STANDINGS_UPDATE", "league_manager", now(), **fields)
+        payload = Encoded(wrap_notification(message))
+        for _ in range(recipients):
+            encode_body(payload)
+    return run
+
+
+def wire_round_trip(encode: Callable[[Any], bytes], decode: Callable[[bytes], Any], body: Any) -> Callable[[], Any]:
+    def run():
+        return decode(encode(body))
+    return run
+
+
+def wire_decode(encode: Callable[[Any], bytes], decode: Callable[[bytes], Any], body: Any) -> Callable[[], Any]:
+    data = encode(body)
+
+    def run():
+        return decode(data)
+    return run
+
+
+def time_per_call(run: Callable[[], Any], min_time: float) -> float:
+    """Best of 5 timed repeats, each at least min_time long"""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        iterations *= 2
+    best = elapsed
+    for _ in range(4):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Message codec benchmark")
+    parser.add_argument("--players", type=int, default=100, help="Rows in the standings message")
+    parser.add_argument("--recipients", type=int, default=100, help="Recipients of the standings broadcast")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per timed repeat")
+    args = parser.parse_args()
+
+    fields = message_fields(args.players)
+    cases: List[Tuple[str, Callable[[], Any], Callable[[], Any]]] = [
+        (message_type, dict_path(message_type, message), codec_path(message_type, message))
+        for message_type, message in fields.items()
+    ]
+    cases.append((f"broadcast x{args.recipients}", dict_broadcast(fields["LEAGUE_STANDINGS_UPDATE"], args.recipients),
+                  codec_broadcast(fields["LEAGUE_STANDINGS_UPDATE"], args.recipients)))
+
+    print(f"JSON backend: {codec.BACKEND}")
+    print(f"{'message':28} {'dict us':>10} {'codec us':>10} {'speedup':>8}")
+    for label, baseline, candidate in cases:
+        before = time_per_call(baseline, args.min_time)
+        after = time_per_call(candidate, args.min_time)
+        print(f"{label:28} {before * 1e6:10.2f} {after * 1e6:10.2f} {before / after:7.2f}x")
+
+    print()
+    print(f"Binary decoder: {binary_codec.BACKEND}")
+    print(f"{'wire format':28} {'JSON B':>8} {'binary B':>9} {'size':>6} {'JSON us':>9} {'binary us':>10} "
+          f"{'JSON dec':>9} {'binary dec':>11}")
+    for message_type, message in fields.items():
+        body = wrap_request(build_message(message_type, SENDER, now(), **message), 1)
+        json_size, binary_size = len(codec.dumps(body)), len(binary_codec.encode(body))
+        json_time = time_per_call(wire_round_trip(codec.dumps, codec.loads, body), args.min_time)
+        binary_time = time_per_call(wire_round_trip(binary_codec.encode, binary_codec.decode, body), args.min_time)
+        json_decode = time_per_call(wire_decode(codec.dumps, codec.loads, body), args.min_time)
+        binary_decode = time_per_call(wire_decode(binary_codec.encode, binary_codec.decode, body), args.min_time)
+        print(f"{message_type:28} {json_size:8} {binary_size:9} {binary_size / json_size:6.0%} "
+              f"{json_time * 1e6:9.2f} {binary_time * 1e6:10.2f} {json_decode * 1e6:9.2f} {binary_decode * 1e6:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
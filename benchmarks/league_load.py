@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+End-to-end league load benchmark with synthetic agent fleets
+
+Starts a LeagueManager, a fleet of RefereeServer instances and a fleet of
+PlayerAgent instances in one process, runs a complete league and reports
+throughput, per-message-type latency, peak RSS and event-loop lag as JSON.
+
+Agents talk over real HTTP (each agent gets its own uvicorn server on
+localhost, listening on a TCP port or with --uds on a Unix domain socket),
+over persistent WebSocket channels between those servers, or through the
+InProcessTransport.
+
+Usage:
+    python -m benchmarks.league_load --players 50 --referees 5 --rounds 1
+    python -m benchmarks.league_load --transport http --players 20 --output before.json
+    python -m benchmarks.league_load --transport ws --players 20 --output after.json
+    python -m benchmarks.league_load --transport http --uds --players 20
+"""
+import argparse
+import asyncio
+import contextlib
+import inspect
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import uvicorn
+from fastapi import FastAPI, Request, Response, WebSocket
+
+from benchmarks.referee_throughput import REPO_ROOT, free_port
+from utils.codec import body_of, negotiated_response, read_body
+from utils.league_endpoints import channel_peer_verifier, handle_mcp_body, start_league
+from utils.league_manager_class import LeagueManager
+from utils.player_agent_class import PlayerAgent
+from utils.referee_server_class import RefereeServer
+from utils.subscriptions import parse_subscription_option
+from utils.transport import HttpTransport, InProcessTransport, Transport, unix_endpoint, unix_socket_path
+from utils.ws_channel import WebSocketTransport, serve_channel
+
+
+def message_label(payload: Any) -> str:
+    """Latency bucket for a JSON-RPC body: its message type, broadcast:<types> or batch:<types>"""
+    payload = body_of(payload)
+    messages = payload if isinstance(payload, list) else [payload]
+    types = "+".join(dict.fromkeys(message.get("params", {}).get("message_type", "UNKNOWN") for message in messages))
+    if any("id" not in message for message in messages):
+        return f"broadcast:{types}"
+    if isinstance(payload, list):
+        return f"batch:{types}"
+    return types
+
+
+class MeasuringTransport(Transport):
+    """Wraps a transport and records round-trip latency per message type"""
+
+    def __init__(self, inner: Transport, shared: Optional["MeasuringTransport"] = None):
+        self.inner = inner
+        # Agents with transports of their own record into one shared report
+        self.root = shared.root if shared else self
+        self.latencies: Dict[str, List[float]] = shared.latencies if shared else defaultdict(list)
+        self.errors: Dict[str, int] = shared.errors if shared else defaultdict(int)
+        self.in_flight = 0
+
+    def reset(self):
+        self.latencies.clear()
+        self.errors.clear()
+
+    async def post(self, url: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        label = message_label(payload)
+        start = time.perf_counter()
+        self.root.in_flight += 1
+        try:
+            result = await self.inner.post(url, payload, timeout=timeout)
+        except Exception:
+            self.errors[label] += 1
+            raise
+        finally:
+            self.root.in_flight -= 1
+        self.latencies[label].append(time.perf_counter() - start)
+        return result
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up a sleeping task"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Count, mean, p50/p95/p99 and max of a list of durations, in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": round(1000 * sum(ordered) / len(ordered), 3),
+        "p50": round(1000 * percentile(ordered, 50), 3),
+        "p95": round(1000 * percentile(ordered, 95), 3),
+        "p99": round(1000 * percentile(ordered, 99), 3),
+        "max": round(1000 * ordered[-1], 3)
+    }
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_agent_app(handler: Callable[[Any], Any], transport: Optional[Transport] = None,
+                   verify: Optional[Callable[[str, Any], bool]] = None) -> FastAPI:
+    """Minimal /mcp and /ws app serving one agent's body handler"""
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def channel(websocket: WebSocket):
+        await serve_channel(websocket, handler, transport, verify)
+
+    @app.post("/mcp")
+    async def mcp(request: Request):
+        result = handler(await read_body(request))
+        if inspect.isawaitable(result):
+            result = await result
+        if result is None:
+            return Response(status_code=204)
+        return negotiated_response(result, request)
+
+    return app
+
+
+async def start_server(app: FastAPI, port: Optional[int] = None, uds: Optional[str] = None) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="localhost", port=port, uds=uds,
+                                           log_level="warning", lifespan="off"))
+    server.task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+async def run_league(args) -> Dict[str, Any]:
+    in_process = args.transport == "inprocess"
+    inner = InProcessTransport() if in_process else HttpTransport(binary=args.wire == "binary")
+    transport = MeasuringTransport(inner)
+    # In-process agents never bind, their ports only have to be distinct
+    unbound_ports = iter(range(20000, 65535))
+
+    def port() -> int:
+        return next(unbound_ports) if in_process else free_port()
+
+    league_manager = LeagueManager(transport=transport)
+    league_manager_port = port()
+    league_manager_url = f"http://localhost:{league_manager_port}/mcp"
+    referees = [RefereeServer(f"Load Referee {i}", port(), transport=transport,
+                              max_concurrent_matches=args.referee_capacity, batch_size=args.batch_size)
+                for i in range(args.referees)]
+    players = [PlayerAgent(f"Load Player {i}", port(), args.strategy, transport=transport)
+               for i in range(args.players)]
+    if args.uds and not in_process:
+        # Socket files in the working directory (a fresh temporary one) instead of ports
+        league_manager_url = unix_endpoint("league_manager.sock")
+        for referee in referees:
+            referee.endpoint = unix_endpoint(f"referee_{referee.port}.sock")
+        for player in players:
+            player.agent_endpoint = unix_endpoint(f"player_{player.port}.sock")
+    for agent in referees + players:
+        agent.league_manager_url = league_manager_url
+    for player in players:
+        player.subscriptions = args.subscribe
+
+    # Every agent with its body handler and the URL it is reached at
+    agents = [(league_manager, lambda body: handle_mcp_body(body, league_manager), league_manager_url)]
+    agents += [(referee, referee.handle_message, referee.endpoint) for referee in referees]
+    agents += [(player, player.handle_message, player.agent_endpoint) for player in players]
+    if args.transport == "ws":
+        # Channels belong to one agent each, so every agent gets its own transport
+        for agent, handler, url in agents:
+            agent.transport = MeasuringTransport(WebSocketTransport(url, handler, binary=args.wire == "binary"),
+                                                 shared=transport)
+
+    servers = []
+    if in_process:
+        inner.register_league_manager(league_manager, url=league_manager_url)
+        for referee in referees:
+            inner.register_referee(referee)
+        for player in players:
+            inner.register_player(player)
+    else:
+        for agent, handler, url in agents:
+            # Only the League Manager pushes over channels its peers dialed in
+            verify = channel_peer_verifier(league_manager) if agent is league_manager else None
+            app = make_agent_app(handler, agent.transport.inner, verify)
+            uds = unix_socket_path(url)
+            servers.append(await start_server(app, uds=uds) if uds else await start_server(app, urlsplit(url).port))
+
+    await asyncio.gather(*(referee.register_with_league() for referee in referees))
+    await asyncio.gather(*(player.register_with_league() for player in players))
+    transport.reset()
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    start = time.perf_counter()
+    started = await start_league(args.rounds, league_manager)
+    deadline = start + args.timeout
+    while not league_manager.check_league_complete() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    # The final standings and LEAGUE_COMPLETED broadcast is still on its way
+    while transport.in_flight and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    await monitor.stop()
+
+    completed = league_manager.schedule_index.completed_matches
+    dispatcher_stats = league_manager.dispatcher.stats()
+
+    for server in servers:
+        server.should_exit = True
+    await asyncio.gather(*(server.task for server in servers))
+    for agent, _, _ in agents:
+        if agent.transport is not transport:
+            await agent.transport.aclose()
+    await inner.aclose()
+    for agent in [league_manager] + referees + players:
+        agent.log_writer.close()
+
+    return {
+        "league": {
+            "matches": started.get("matches", 0),
+            "completed_matches": completed,
+            "completed": league_manager.check_league_complete(),
+            "elapsed": elapsed,
+            "matches_per_sec": completed / elapsed if elapsed else 0.0,
+            "failed_assignments": dispatcher_stats["failed"],
+            "avg_queue_wait_ms": 1000 * dispatcher_stats["avg_queue_wait"]
+        },
+        "latency_ms": {label: summarize(samples) for label, samples in sorted(transport.latencies.items())},
+        "errors": dict(transport.errors),
+        "event_loop_lag_ms": summarize(monitor.samples)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end league load benchmark")
+    parser.add_argument("--players", type=int, default=50, help="Number of synthetic players")
+    parser.add_argument("--referees", type=int, default=5, help="Number of synthetic referees")
+    parser.add_argument("--rounds", type=int, default=1, help="League rounds")
+    parser.add_argument("--referee-capacity", type=int, default=2, help="max_concurrent_matches per referee")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Run referees in batch mode with this batch size")
+    parser.add_argument("--strategy", default="random", help="Player strategy")
+    parser.add_argument("--transport", choices=["inprocess", "http", "ws"], default="inprocess",
+                        help="How agents exchange messages")
+    parser.add_argument("--uds", action="store_true",
+                        help="Serve http/ws agents on Unix domain sockets instead of TCP ports")
+    parser.add_argument("--wire", choices=["json", "binary"], default="json",
+                        help="Wire format offered over HTTP (binary is negotiated per agent)")
+    parser.add_argument("--subscribe", type=parse_subscription_option, default=None, metavar="TOPICS",
+                        help="Player broadcast subscriptions: full, own, top:K, rounds or none")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Give up after this many seconds")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # Keep per-message INFO logging and game progress prints out of the measurement
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(tempfile.mkdtemp(prefix="league_load_"))
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = asyncio.run(run_league(args))
+
+    report = {
+        "benchmark": "league_load",
+        "commit": current_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        **results,
+        "peak_rss_mb": peak_rss_mb()
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if not results["league"]["completed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Handler-path cost of JSONL message logging
+
+Compares the previous inline open/json.dumps/close per message with
+JsonlWriter.write(), which only queues the entry for the writer thread.
+
+Usage:
+    python -m benchmarks.log_overhead --messages 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from utils.jsonl_writer import JsonlWriter, message_type_of
+from utils.jsonrpc_utils import wrap_request
+
+
+def sample_message(i: int):
+    return wrap_request({
+        "protocol": "league.v2",
+        "message_type": "CHOOSE_PARITY_CALL",
+        "sender": "referee:ref_bench",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "conversation_id": f"conv-{i}",
+        "match_id": f"match_{i}",
+        "player_id": "player_bench",
+        "game_type": "even_odd",
+        "context": {"opponent_id": "player_other", "round_id": 1,
+                    "your_standings": {"wins": 0, "losses": 0, "draws": 0}},
+        "auth_token": "x" * 43
+    }, i)
+
+
+def inline_log(path: str, message):
+    log_entry = {"timestamp": datetime.now(timezone.utc).isoformat(), "direction": "sent", "message": message}
+    with open(path, "a") as f:
+        f.write(json.dumps(log_entry) + "\n")
+
+
+def queued_log(writer: JsonlWriter, message):
+    log_entry = {"timestamp": datetime.now(timezone.utc).isoformat(), "direction": "sent", "message": message}
+    writer.write(log_entry, message_type_of(message))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL logging overhead benchmark")
+    parser.add_argument("--messages", type=int, default=20000, help="Messages to log per mode")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="league_log_bench_")
+    messages = [sample_message(i) for i in range(args.messages)]
+
+    path = os.path.join(directory, "inline.jsonl")
+    start = time.perf_counter()
+    for message in messages:
+        inline_log(path, message)
+    inline_us = (time.perf_counter() - start) / args.messages * 1e6
+
+    writer = JsonlWriter(os.path.join(directory, "queued.jsonl"))
+    start = time.perf_counter()
+    for message in messages:
+        queued_log(writer, message)
+    queued_us = (time.perf_counter() - start) / args.messages * 1e6
+    start = time.perf_counter()
+    writer.close()
+    drain_s = time.perf_counter() - start
+
+    print(f"messages={args.messages}")
+    print(f"inline open/dumps/close: {inline_us:8.2f} us/message on the handler path")
+    print(f"JsonlWriter.write:       {queued_us:8.2f} us/message on the handler path")
+    print(f"writer thread drained the backlog {drain_s * 1000:.1f} ms after the last write")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Memory per match and status-scan speed at league scale
+
+Stores N completed matches three ways and measures traced memory and the
+time to count completed matches:
+  - dict-backed Match objects held in a dict by ID and a schedule list
+    (the previous LeagueManager layout)
+  - __slots__ Match objects held the same way
+  - MatchTable rows (what the LeagueManager keeps for completed matches)
+
+Usage:
+    python -m benchmarks.match_memory --matches 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from models.league_models import Match, MatchStatus
+from utils.match_table import MatchTable
+
+
+class DictMatch:
+    """The previous, dict-backed Match"""
+
+    def __init__(self, match_id: str, round_id: int, player1_id: str, player2_id: str, referee_id: str,
+                 wave_id: int = 1):
+        self.match_id = match_id
+        self.round_id = round_id
+        self.wave_id = wave_id
+        self.player1_id = player1_id
+        self.player2_id = player2_id
+        self.referee_id = referee_id
+        self.status = MatchStatus.PENDING
+        self.result = None
+
+
+def sample_result(player1_id: str, player2_id: str) -> Dict[str, Any]:
+    return {"winner": player1_id, "score": {player1_id: 3, player2_id: 0},
+            "details": {"drawn_number": 42, "choices": {player1_id: "even", player2_id: "odd"}}}
+
+
+def build_objects(match_class, count: int, players: int):
+    # Player IDs are shared strings, as they are in LeagueManager.players
+    player_ids = [f"player_{i}" for i in range(players)]
+    matches, schedule = {}, []
+    for i in range(count):
+        player1_id, player2_id = player_ids[i % players], player_ids[(i + 1) % players]
+        match = match_class(f"match_{i:08x}", 1 + i // 100000, player1_id, player2_id, "ref_1",
+                            1 + i % 1000)
+        match.status = MatchStatus.COMPLETED
+        match.result = sample_result(player1_id, player2_id)
+        matches[match.match_id] = match
+        schedule.append(match)
+    return matches, schedule
+
+
+def build_table(count: int, players: int) -> MatchTable:
+    player_ids = [f"player_{i}" for i in range(players)]
+    table = MatchTable()
+    for i in range(count):
+        player1_id, player2_id = player_ids[i % players], player_ids[(i + 1) % players]
+        row = table.append(1 + i // 100000, 1 + i % 1000, player1_id, player2_id, "ref_1")
+        table.set_status(row, MatchStatus.COMPLETED)
+        table.record_result(row, sample_result(player1_id, player2_id))
+    return table
+
+
+def measure(build: Callable[[], Any]):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        data = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return data, size
+
+
+def timed(function: Callable[[], int]):
+    start = time.perf_counter()
+    value = function()
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match storage memory benchmark")
+    parser.add_argument("--matches", type=int, default=1000000, help="Number of matches")
+    parser.add_argument("--players", type=int, default=2000, help="Number of distinct players")
+    args = parser.parse_args()
+
+    rows = []
+    for label, match_class in [("dict objects", DictMatch), ("__slots__ objects", Match)]:
+        (matches, schedule), size = measure(lambda: build_objects(match_class, args.matches, args.players))
+        completed, elapsed = timed(lambda: sum(1 for match in schedule if match.status == MatchStatus.COMPLETED))
+        rows.append((label, size, elapsed))
+        del matches, schedule
+
+    table, size = measure(lambda: build_table(args.matches, args.players))
+    completed, elapsed = timed(lambda: table.count_status(MatchStatus.COMPLETED))
+    rows.append(("MatchTable", size, elapsed))
+
+    print(f"matches={args.matches} players={args.players}")
+    print(f"{'layout':20} {'MB':>10} {'bytes/match':>12} {'status scan ms':>15}")
+    for label, size, elapsed in rows:
+        print(f"{label:20} {size / 2 ** 20:10.1f} {size / args.matches:12.1f} {elapsed * 1000:15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for league hot functions
+
+Times each function at several scales (players, matches, history length
+or payload rows, depending on the function) and measures its allocations
+with tracemalloc. Results can be saved as a baseline; later runs compare
+against it and exit non-zero when a function got slower than the
+threshold allows.
+
+Usage:
+    python -m benchmarks.micro_bench --save-baseline
+    python -m benchmarks.micro_bench --threshold 1.25
+    python -m benchmarks.micro_bench --only get_standings --scales 10 1000
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from game import game_logic
+from game.batch_referee import resolve_batch
+from models.league_models import MatchStatus, Player, PlayerMetadata, Referee, RefereeMetadata
+from models.referee_models import GameSession
+from strategies.player_strategies import choose_parity_history
+from utils.jsonrpc_utils import wrap_request, wrap_response, unwrap_message
+from utils.league_manager_class import LeagueManager
+from utils.referee_server_class import RefereeServer
+from utils.transport import InProcessTransport
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_baseline.json")
+
+# name -> setup(scale) returning run(iterations)
+BENCHMARKS: Dict[str, Callable[[int], Callable[[int], Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def make_league(num_players: int, num_matches: int = 0) -> LeagueManager:
+    """League with players and matches created directly (no registration round trips)"""
+    league_manager = LeagueManager(transport=InProcessTransport())
+    league_manager.log_writer.close()
+    league_manager.referees["ref_bench"] = Referee("ref_bench", "token", RefereeMetadata(display_name="Bench"))
+    for i in range(num_players):
+        player_id = f"player_{i}"
+        # No agent endpoint: broadcasts have no recipients
+        player = Player(player_id, "token", PlayerMetadata(display_name=f"Player {i}", agent_endpoint=""))
+        player.wins, player.draws = random.randint(0, 20), random.randint(0, 5)
+        player.total_points_earned = 3 * player.wins + player.draws
+        league_manager.players[player_id] = player
+        league_manager.standings_index.add(player_id, player.total_points_earned, player.wins, player.draws)
+    for i in range(num_matches):
+        match = league_manager.match_table.create_match(1, 1, f"player_{(2 * i) % num_players}",
+                                                        f"player_{(2 * i + 1) % num_players}", "ref_bench")
+        league_manager.matches[match.match_id] = match
+        league_manager.schedule_index.add(match)
+    return league_manager
+
+
+def standings_rows(count: int) -> List[Dict[str, Any]]:
+    return [{"rank": i + 1, "player_id": f"player_{i}", "display_name": f"Player {i}", "played": 10,
+             "wins": 5, "draws": 2, "losses": 3, "points": 17} for i in range(count)]
+
+
+@benchmark("get_standings")
+def bench_get_standings(scale: int):
+    league_manager = make_league(scale)
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            league_manager.get_standings()
+    return run
+
+
+@benchmark("update_match_result")
+def bench_update_match_result(scale: int):
+    league_manager = make_league(max(scale, 2), num_matches=max(scale // 2, 1))
+    matches = list(league_manager.matches.values())[:1000]
+    loop = asyncio.new_event_loop()
+    result = {"winner": None, "score": {}}
+
+    async def report(iterations: int):
+        for i in range(iterations):
+            match = matches[i % len(matches)]
+            result["winner"] = match.player1_id
+            result["score"] = {match.player1_id: 3, match.player2_id: 0}
+            await league_manager.update_match_result(match.match_id, result)
+            # Re-arm the match so the next report is not a duplicate
+            league_manager.matches[match.match_id] = match
+            league_manager.set_match_status(match, MatchStatus.PENDING)
+
+    def run(iterations: int):
+        loop.run_until_complete(report(iterations))
+    return run
+
+
+@benchmark("create_schedule")
+def bench_create_schedule(scale: int):
+    league_manager = make_league(max(scale, 2))
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            league_manager.create_schedule(rounds=1)
+    return run
+
+
+def half_completed_league(scale: int) -> LeagueManager:
+    league_manager = make_league(max(scale, 2), num_matches=scale)
+    for match in list(league_manager.matches.values())[:scale // 2]:
+        league_manager.set_match_status(match, MatchStatus.COMPLETED)
+    return league_manager
+
+
+@benchmark("check_round_complete")
+def bench_check_round_complete(scale: int):
+    league_manager = half_completed_league(scale)
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            league_manager.check_round_complete(1)
+    return run
+
+
+@benchmark("check_league_complete")
+def bench_check_league_complete(scale: int):
+    league_manager = half_completed_league(scale)
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            league_manager.check_league_complete()
+    return run
+
+
+@benchmark("wrap_request")
+def bench_wrap_request(scale: int):
+    message = {"protocol": "league.v2", "message_type": "LEAGUE_STANDINGS_UPDATE", "standings": standings_rows(scale)}
+
+    def run(iterations: int):
+        for i in range(iterations):
+            wrap_request(message, i)
+    return run
+
+
+@benchmark("unwrap_message")
+def bench_unwrap_message(scale: int):
+    response = wrap_response({"message_type": "LEAGUE_QUERY_RESPONSE", "standings": standings_rows(scale)}, 1)
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            unwrap_message(response)
+    return run
+
+
+@benchmark("create_message")
+def bench_create_message(scale: int):
+    referee = RefereeServer(name="Bench Referee", port=0, transport=InProcessTransport())
+    referee.log_writer.close()
+    referee.referee_id = "ref_bench"
+    game_result = {"status": "DRAW", "choices": {row["player_id"]: "even" for row in standings_rows(scale)}}
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            referee.create_message("GAME_OVER", conversation_id="conv_bench", match_id="match_bench",
+                                   game_type="even_odd", game_result=game_result)
+    return run
+
+
+@benchmark("determine_winner")
+def bench_determine_winner(scale: int):
+    games = []
+    for i in range(scale):
+        game = GameSession(f"match_{i}", "player_a", "player_b", "", "")
+        game.player1_choice, game.player2_choice = random.choice(["even", "odd"]), random.choice(["even", "odd"])
+        games.append(game)
+
+    def run(iterations: int):
+        # determine_winner never awaits, so drive the coroutine by hand
+        with contextlib.redirect_stdout(None):
+            for _ in range(iterations):
+                for game in games:
+                    with contextlib.suppress(StopIteration):
+                        game_logic.determine_winner(game).send(None)
+    return run
+
+
+@benchmark("resolve_batch")
+def bench_resolve_batch(scale: int):
+    player1_choices = [random.randint(0, 1) for _ in range(scale)]
+    player2_choices = [random.randint(0, 1) for _ in range(scale)]
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            resolve_batch(player1_choices, player2_choices)
+    return run
+
+
+@benchmark("choose_parity_history")
+def bench_choose_parity_history(scale: int):
+    history = [{"result": random.choice(["win", "loss", "draw"]), "my_choice": random.choice(["even", "odd"])}
+               for _ in range(scale)]
+
+    def run(iterations: int):
+        for _ in range(iterations):
+            choose_parity_history(history, "even")
+    return run
+
+
+def time_per_call(run: Callable[[int], Any], min_time: float, repeats: int) -> Dict[str, float]:
+    """Best-of-repeats seconds per call, with iterations calibrated to take at least min_time"""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        run(iterations)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        run(iterations)
+        best = min(best, time.perf_counter() - start)
+    return {"iterations": iterations, "seconds_per_call": best / iterations}
+
+
+def allocations_per_call(run: Callable[[int], Any]) -> Dict[str, int]:
+    """Peak and retained traced memory of a single call"""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run(1)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_alloc_bytes": peak - baseline, "retained_bytes": current - baseline}
+
+
+def run_suite(names: List[str], scales: List[int], min_time: float, repeats: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name in names:
+        for scale in scales:
+            random.seed(scale)
+            run = BENCHMARKS[name](scale)
+            run(1)  # Warm up
+            entry = time_per_call(run, min_time, repeats)
+            entry.update(allocations_per_call(run))
+            results[f"{name}[{scale}]"] = entry
+            print(f"{name + f'[{scale}]':34} {entry['seconds_per_call'] * 1e6:14.2f} us/call "
+                  f"{entry['peak_alloc_bytes']:>14,} B peak", file=sys.stderr)
+    return results
+
+
+def find_regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                     threshold: float) -> List[str]:
+    """Names of results slower than threshold x their baseline time"""
+    regressions = []
+    for key, entry in results.items():
+        previous = baseline.get(key)
+        if previous and entry["seconds_per_call"] > previous["seconds_per_call"] * threshold:
+            ratio = entry["seconds_per_call"] / previous["seconds_per_call"]
+            regressions.append(f"{key}: {ratio:.2f}x the baseline time")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for league hot functions")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="Players/matches/rows per benchmark")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timed repeat")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repeats (best is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Fail when a function is this many times slower than its baseline")
+    parser.add_argument("--output", help="Also write the results JSON here")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="league_micro_"))
+    results = run_suite(args.only or list(BENCHMARKS), args.scales, args.min_time, args.repeats)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.2f}x of baseline")
+
+
+if __name__ == "__main__":
+    main()
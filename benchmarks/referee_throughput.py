@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Games/sec benchmark for a single referee
+
+Runs one RefereeServer against player agents started as separate
+player_agent.py processes and compares the pooled async transport with the previous blocking
+requests.post path (one new connection per message, pushed through the
+default thread pool executor).
+
+Usage:
+    python -m benchmarks.referee_throughput --games 200 --players 8
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+import uvicorn
+from fastapi import FastAPI, Request
+
+from game import game_logic
+from models.referee_models import GameSession
+from utils.jsonrpc_utils import wrap_request, wrap_response, unwrap_message, is_jsonrpc_message
+from utils.referee_server_class import RefereeServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LegacyRefereeServer(RefereeServer):
+    """Referee using the pre-transport blocking path"""
+
+    def _send_blocking(self, url: str, message: Dict[str, Any], request_id: int) -> Optional[Dict[str, Any]]:
+        if self.auth_token and "auth_token" not in message:
+            message["auth_token"] = self.auth_token
+        jsonrpc_message = wrap_request(message, request_id)
+        self.log_message(jsonrpc_message, "sent")
+        try:
+            response = requests.post(url, json=jsonrpc_message,
+                                     headers={"Content-Type": "application/json"}, timeout=30)
+            response.raise_for_status()
+            response_data = response.json()
+            self.log_message(response_data, "received")
+            if is_jsonrpc_message(response_data):
+                return unwrap_message(response_data)
+            return response_data
+        except Exception as e:
+            print(f"Error sending message to {url}: {e}")
+            return None
+
+    async def send_message(self, url: str, message: Dict[str, Any], request_id: int = 1) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._send_blocking, url, message, request_id)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def start_player(name: str, port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "player_agent.py"),
+         "--name", name, "--port", str(port), "--strategy", "random"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_until_healthy(port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://localhost:{port}/health", timeout=1).raise_for_status()
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"Player on port {port} did not start")
+
+
+def make_league_stub_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/mcp")
+    async def mcp(request: Request):
+        body = await request.json()
+        return wrap_response({"message_type": "MATCH_RESULT_ACKNOWLEDGED"}, body.get("id"))
+
+    return app
+
+
+async def run_games(referee: RefereeServer, player_ports: List[int], games: int) -> float:
+    sessions = []
+    for i in range(games):
+        port1, port2 = random.sample(player_ports, 2)
+        sessions.append(GameSession(f"match_{i}", f"player_{port1}", f"player_{port2}",
+                                    f"http://localhost:{port1}/mcp", f"http://localhost:{port2}/mcp"))
+    start = time.perf_counter()
+    await asyncio.gather(*(game_logic.run_game(referee, game) for game in sessions))
+    return time.perf_counter() - start
+
+
+async def main_async(args, player_ports: List[int]) -> Dict[str, float]:
+    league_port = free_port()
+    server = uvicorn.Server(uvicorn.Config(make_league_stub_app(), host="localhost",
+                                           port=league_port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    results = {}
+    for label, referee_class in [("before", LegacyRefereeServer), ("after", RefereeServer)]:
+        referee = referee_class(name=f"Bench Referee ({label})", port=free_port())
+        referee.referee_id = "ref_bench"
+        referee.auth_token = "bench"
+        referee.league_manager_url = f"http://localhost:{league_port}/mcp"
+        elapsed = await run_games(referee, player_ports, args.games)
+        results[label] = args.games / elapsed
+        await referee.transport.aclose()
+
+    server.should_exit = True
+    await server_task
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single referee games/sec benchmark")
+    parser.add_argument("--games", type=int, default=200, help="Games to run per mode")
+    parser.add_argument("--players", type=int, default=8, help="Number of player agents")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="league_bench_"))
+    player_ports = [free_port() for _ in range(args.players)]
+    processes = [start_player(f"Bench{i}", port) for i, port in enumerate(player_ports)]
+    try:
+        for port in player_ports:
+            wait_until_healthy(port)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = asyncio.run(main_async(args, player_ports))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print(f"games={args.games} players={args.players}")
+    print(f"before (requests.post in to_thread): {results['before']:8.1f} games/sec")
+    print(f"after  (pooled async transport):     {results['after']:8.1f} games/sec")
+    print(f"speedup: {results['after'] / results['before']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
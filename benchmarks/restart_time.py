@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+League Manager restart time with durable state
+
+Plays a league of roughly N matches directly against a LeagueManager (no
+agents), persists it to a LeagueStore, keeps playing for --tail-matches
+more matches without a snapshot and then "crashes": the store is flushed
+and closed without a final snapshot. A fresh LeagueManager then restores
+from the same database; the time to load the snapshot and replay the tail
+is reported.
+
+Usage:
+    python -m benchmarks.restart_time --matches 1000000
+"""
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+from models.league_models import MatchStatus, PlayerMetadata, RefereeMetadata
+from utils.league_manager_class import LeagueManager
+from utils.league_store import LeagueStore
+from utils.transport import InProcessTransport
+
+
+def play_waves(league_manager: LeagueManager, until_matches: int):
+    """Release waves and complete every match in them until until_matches have been released"""
+    while len(league_manager.match_table) < until_matches:
+        wave = league_manager._create_next_wave()
+        if not wave:
+            return
+        for match in wave:
+            league_manager.set_match_status(match, MatchStatus.IN_PROGRESS)
+            winner = random.choice((match.player1_id, match.player2_id, None))
+            loser = match.player2_id if winner == match.player1_id else match.player1_id
+            score = {match.player1_id: 1, match.player2_id: 1} if winner is None else {winner: 3, loser: 0}
+            league_manager.apply_match_result(match, {"winner": winner, "score": score, "details": {
+                "drawn_number": random.randint(1, 100),
+                "choices": {match.player1_id: "even", match.player2_id: "odd"}}})
+
+
+def build_league(path: str, matches: int, referees: int, tail_matches: int) -> LeagueManager:
+    # Smallest player count whose single round reaches the requested size
+    players = math.ceil((1 + math.sqrt(1 + 8 * matches)) / 2)
+    league_manager = LeagueManager(transport=InProcessTransport())
+    league_manager.log_writer.close()
+    for i in range(referees):
+        league_manager.register_referee(RefereeMetadata(display_name=f"Referee {i}",
+                                                        endpoint=f"http://localhost:{9000 + i}/mcp"))
+    for i in range(players):
+        league_manager.register_player(PlayerMetadata(display_name=f"Player {i}",
+                                                      agent_endpoint=f"http://localhost:{10000 + i}/mcp"))
+    league_manager.create_schedule(rounds=1)
+    total = league_manager.lazy_schedule.total_matches
+
+    # Play the bulk without a store and persist it as one snapshot, then keep
+    # playing so the restart also has a tail of events to replay
+    play_waves(league_manager, total - 2 * tail_matches)
+    league_manager.store = LeagueStore(path, snapshot_every=10 ** 9)
+    league_manager.save_snapshot()
+    play_waves(league_manager, len(league_manager.match_table) + tail_matches)
+    return league_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="League Manager restart-time benchmark")
+    parser.add_argument("--matches", type=int, default=1000000, help="Approximate matches in the league")
+    parser.add_argument("--referees", type=int, default=100, help="Registered referees")
+    parser.add_argument("--tail-matches", type=int, default=5000,
+                        help="Matches played after the last snapshot (their events are replayed on restart)")
+    parser.add_argument("--db", help="SQLite file (default: a temporary file)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    db = os.path.abspath(args.db) if args.db else None
+    cwd = os.getcwd()
+    # The league managers write their jsonl/ logs to the working directory
+    with tempfile.TemporaryDirectory(prefix="league_restart_") as directory:
+        os.chdir(directory)
+        try:
+            run(db or os.path.join(directory, "league_state.db"), args)
+        finally:
+            os.chdir(cwd)
+
+
+def run(path: str, args: argparse.Namespace):
+    start = time.perf_counter()
+    league_manager = build_league(path, args.matches, args.referees, args.tail_matches)
+    build_time = time.perf_counter() - start
+
+    # Crash: everything recorded is committed, but no final snapshot is taken
+    league_manager.store.flush()
+    league_manager.store.close()
+    expected = league_manager.get_standings()
+    replayed = league_manager.store.seq - league_manager.store.load()[0].last_seq
+    matches = len(league_manager.match_table)
+    del league_manager
+
+    restarted = LeagueManager(transport=InProcessTransport())
+    restarted.log_writer.close()
+    restarted.store = LeagueStore(path)
+    start = time.perf_counter()
+    restarted.restore()
+    restore_time = time.perf_counter() - start
+    restarted.store.close()
+
+    print(f"matches={matches} players={len(restarted.players)} db={os.path.getsize(path) / 2 ** 20:.1f} MB "
+          f"(built in {build_time:.1f}s)")
+    print(f"restore: {restore_time * 1000:.1f} ms "
+          f"(snapshot + {replayed} replayed events), state matches: {restarted.get_standings() == expected}")
+
+
+if __name__ == "__main__":
+    main()
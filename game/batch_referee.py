@@ -0,0 +1,218 @@
+"""
+Batch resolution of Even/Odd games
+
+Resolves many games in one pass: all numbers are drawn at once and
+parity, winners and points come from a single table lookup per game
+instead of per-game branches. Uses numpy when it is installed and a
+pure-Python path otherwise.
+"""
+import asyncio
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.referee_models import GameSession, GameState
+from utils.codec import Encoded, encode_batch
+from utils.jsonrpc_utils import wrap_request
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+# Choice encoding
+NO_CHOICE, EVEN, ODD = -1, 0, 1
+CHOICE_CODES = {"even": EVEN, "odd": ODD, None: NO_CHOICE}
+
+# Outcome encoding
+DRAW, PLAYER1_WINS, PLAYER2_WINS = 0, 1, 2
+PLAYER1_POINTS = (1, 3, 0)  # Indexed by outcome
+PLAYER2_POINTS = (1, 0, 3)
+
+
+def _outcome(player1_choice: int, player2_choice: int, parity: int) -> int:
+    """Same rules as game_logic.run_game/determine_winner, for one game"""
+    if player1_choice == NO_CHOICE:
+        return PLAYER2_WINS  # Technical loss
+    if player2_choice == NO_CHOICE:
+        return PLAYER1_WINS
+    if player1_choice == parity and player2_choice != parity:
+        return PLAYER1_WINS
+    if player2_choice == parity and player1_choice != parity:
+        return PLAYER2_WINS
+    return DRAW
+
+
+# Every (player1 choice, player2 choice, parity) combination, indexed by
+# (player1_choice + 1) * 6 + (player2_choice + 1) * 2 + parity
+OUTCOME_TABLE = [_outcome(c1, c2, parity) for c1 in (NO_CHOICE, EVEN, ODD)
+                 for c2 in (NO_CHOICE, EVEN, ODD) for parity in (EVEN, ODD)]
+
+
+def resolve_batch(player1_choices: Sequence[int], player2_choices: Sequence[int],
+                  rng: Optional[Any] = None) -> Tuple[Any, Any]:
+    """
+    Resolve a batch of games from encoded choices.
+
+    Args:
+        player1_choices: EVEN, ODD or NO_CHOICE per game
+        player2_choices: EVEN, ODD or NO_CHOICE per game
+        rng: numpy Generator (numpy path) or random.Random (fallback path)
+
+    Returns:
+        (drawn_numbers, outcomes) as numpy arrays, or lists without numpy
+    """
+    count = len(player1_choices)
+    if np is not None:
+        rng = rng if rng is not None else np.random.default_rng()
+        drawn = rng.integers(1, 101, size=count, dtype=np.int16)
+        index = ((np.asarray(player1_choices, dtype=np.int16) + 1) * 6
+                 + (np.asarray(player2_choices, dtype=np.int16) + 1) * 2 + (drawn & 1))
+        return drawn, np.asarray(OUTCOME_TABLE, dtype=np.int8)[index]
+
+    rng = rng if rng is not None else random
+    drawn = rng.choices(range(1, 101), k=count)
+    outcomes = [OUTCOME_TABLE[(c1 + 1) * 6 + (c2 + 1) * 2 + (number & 1)]
+                for c1, c2, number in zip(player1_choices, player2_choices, drawn)]
+    return drawn, outcomes
+
+
+def as_list(values: Any) -> List[int]:
+    return values.tolist() if np is not None and isinstance(values, np.ndarray) else list(values)
+
+
+class BatchReferee:
+    """
+    Batch mode for a RefereeServer.
+
+    Games whose choices have been collected are queued instead of being
+    resolved one by one. When batch_size games are queued, or linger
+    seconds after the first one, the whole batch is resolved with
+    resolve_batch, GAME_OVER messages go out as one JSON-RPC batch per
+    player endpoint and all MATCH_RESULT_REPORTs as a single batch to the
+    league manager.
+    """
+
+    def __init__(self, referee_server, batch_size: int = 256, linger: float = 0.01, rng: Optional[Any] = None):
+        self.referee_server = referee_server
+        self.batch_size = batch_size
+        self.linger = linger
+        self.rng = rng
+        self.pending: List[Tuple[GameSession, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.resolved = 0
+
+    async def submit(self, game: GameSession):
+        """Queue a game with collected choices and wait until its results are sent"""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        self.pending.append((game, done))
+        if len(self.pending) >= self.batch_size:
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.linger, self._start_flush)
+        await done
+
+    def _start_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._flush(batch))
+
+    async def _flush(self, batch: List[Tuple[GameSession, asyncio.Future]]):
+        games = [game for game, _ in batch]
+        try:
+            self.resolve(games)
+            await self.send_results(games)
+        except Exception as e:
+            for _, done in batch:
+                if not done.done():
+                    done.set_exception(e)
+            return
+        for _, done in batch:
+            if not done.done():
+                done.set_result(None)
+
+    def resolve(self, games: List[GameSession]):
+        """Draw numbers and set drawn_number/winner_id for every game in one pass"""
+        drawn, outcomes = resolve_batch([CHOICE_CODES.get(game.player1_choice, NO_CHOICE) for game in games],
+                                        [CHOICE_CODES.get(game.player2_choice, NO_CHOICE) for game in games],
+                                        self.rng)
+        for game, number, outcome in zip(games, as_list(drawn), as_list(outcomes)):
+            game.state = GameState.DETERMINING_WINNER
+            game.drawn_number = number
+            game.winner_id = (None, game.player1_id, game.player2_id)[outcome]
+        self.resolved += len(games)
+
+    def game_over_message(self, game: GameSession) -> Dict[str, Any]:
+        """GAME_OVER for both players of a resolved game (same payload as send_game_over)"""
+        number_parity = "even" if game.drawn_number % 2 == 0 else "odd"
+        if game.winner_id is None:
+            status = "DRAW"
+            reason = f"Both players chose {game.player1_choice}, number was {game.drawn_number} ({number_parity})"
+        else:
+            status = "WIN"
+            winner_choice = game.player1_choice if game.winner_id == game.player1_id else game.player2_choice
+            reason = f"{game.winner_id} chose {winner_choice}, number was {game.drawn_number} ({number_parity})"
+        return self.referee_server.create_message(
+            "GAME_OVER",
+            conversation_id=game.conversation_id,
+            match_id=game.match_id,
+            game_type="even_odd",
+            game_result={
+                "status": status,
+                "winner_player_id": game.winner_id,
+                "drawn_number": game.drawn_number,
+                "number_parity": number_parity,
+                "choices": {game.player1_id: game.player1_choice, game.player2_id: game.player2_choice},
+                "reason": reason
+            }
+        )
+
+    def match_result_message(self, game: GameSession) -> Dict[str, Any]:
+        """MATCH_RESULT_REPORT for a resolved game (same payload as send_match_result)"""
+        if game.winner_id is None:
+            outcome = DRAW
+        else:
+            outcome = PLAYER1_WINS if game.winner_id == game.player1_id else PLAYER2_WINS
+        return self.referee_server.create_message(
+            "MATCH_RESULT_REPORT",
+            conversation_id=game.conversation_id,
+            league_id=game.league_id,
+            round_id=game.round_id,
+            match_id=game.match_id,
+            game_type="even_odd",
+            result={
+                "winner": game.winner_id,
+                "score": {game.player1_id: PLAYER1_POINTS[outcome], game.player2_id: PLAYER2_POINTS[outcome]},
+                "details": {
+                    "drawn_number": game.drawn_number,
+                    "choices": {game.player1_id: game.player1_choice, game.player2_id: game.player2_choice}
+                }
+            }
+        )
+
+    async def send_results(self, games: List[GameSession]):
+        """Send GAME_OVER batches to players, then one MATCH_RESULT_REPORT batch to the league manager"""
+        by_endpoint: Dict[str, List[Dict[str, Any]]] = {}
+        for game in games:
+            message = self.game_over_message(game)
+            by_endpoint.setdefault(game.player1_endpoint, []).append(message)
+            by_endpoint.setdefault(game.player2_endpoint, []).append(message)
+        await asyncio.gather(*(self._post_batch(endpoint, messages) for endpoint, messages in by_endpoint.items()),
+                             return_exceptions=True)
+        await self._post_batch(self.referee_server.league_manager_url,
+                               [self.match_result_message(game) for game in games])
+
+    async def _post_batch(self, url: str, messages: List[Dict[str, Any]]):
+        referee = self.referee_server
+        requests = []
+        for request_id, message in enumerate(messages, start=1):
+            if referee.auth_token and "auth_token" not in message:
+                message["auth_token"] = referee.auth_token
+            # Each request is encoded once; the batch body reuses the same bytes
+            request = Encoded(wrap_request(message, request_id))
+            referee.log_message(request, "sent")
+            requests.append(request)
+        await referee.transport.post(url, encode_batch(requests), timeout=30)
@@ -32,8 +32,7 @@ async def run_game(referee_server, game):
 
         # Send invitations in parallel
         results = await asyncio.gather(
-            asyncio.to_thread(
-                referee_server.send_message,
+            referee_server.send_message(
                 game.player1_endpoint,
                 referee_server.create_message(
                     "GAME_INVITATION",
@@ -46,8 +45,7 @@ async def run_game(referee_server, game):
                     opponent_id=game.player2_id
                 )
             ),
-            asyncio.to_thread(
-                referee_server.send_message,
+            referee_server.send_message(
                 game.player2_endpoint,
                 referee_server.create_message(
                     "GAME_INVITATION",
@@ -97,6 +95,13 @@ async def run_game(referee_server, game):
         game.player1_choice = results[0] if not isinstance(results[0], Exception) else None
         game.player2_choice = results[1] if not isinstance(results[1], Exception) else None
 
+        if referee_server.batch_referee is not None:
+            # Resolved and reported together with other games of the batch
+            await referee_server.batch_referee.submit(game)
+            game.state = GameState.COMPLETED
+            print(f"=== Game {game.match_id} Completed ===\n")
+            return
+
         if game.player1_choice is None:
             game.winner_id = game.player2_id
             print(f"Technical loss: {game.player1_id} failed to respond")
@@ -122,4 +127,4 @@ async def run_game(referee_server, game):
                 error_code="GAME_ERROR",
                 error_message=str(e)
             )
-            referee_server.send_message(player_endpoint, error_msg)
+            await referee_server.send_message(player_endpoint, error_msg)
@@ -24,12 +24,8 @@ async def request_player_choice(referee_server, game, player_id: str, player_end
     max_retries = 3
     timeout_seconds = 30
 
-    # Initialize retry counter for this player if not exists
-    if player_id not in game.retry_counts:
-        game.retry_counts[player_id] = 0
-
     # Retry loop - give player multiple chances to respond
-    while game.retry_counts[player_id] < max_retries:
+    while game.retries(player_id) < max_retries:
         # Determine who the opponent is (the other player in the match)
         opponent_id = game.player2_id if player_id == game.player1_id else game.player1_id
 
@@ -59,7 +55,7 @@ async def request_player_choice(referee_server, game, player_id: str, player_end
         try:
             # Send message and wait for response with timeout
             response = await asyncio.wait_for(
-                asyncio.to_thread(referee_server.send_message, player_endpoint, message),
+                referee_server.send_message(player_endpoint, message),
                 timeout=timeout_seconds
             )
 
@@ -73,12 +69,12 @@ async def request_player_choice(referee_server, game, player_id: str, player_end
                     print(f"Invalid choice from {player_id}: {choice}")
 
             # Invalid response - increment retry counter
-            game.retry_counts[player_id] += 1
+            game.add_retry(player_id)
 
         except asyncio.TimeoutError:
             # Player didn't respond in time
-            print(f"Timeout waiting for {player_id} choice (attempt {game.retry_counts[player_id] + 1})")
-            game.retry_counts[player_id] += 1
+            print(f"Timeout waiting for {player_id} choice (attempt {game.retries(player_id) + 1})")
+            game.add_retry(player_id)
 
             # Send error notification to player
             error_msg = referee_server.create_message(
@@ -88,7 +84,7 @@ async def request_player_choice(referee_server, game, player_id: str, player_end
                 error_code="TIMEOUT",
                 error_message=f"Player {player_id} did not respond in time"
             )
-            referee_server.send_message(player_endpoint, error_msg)
+            await referee_server.send_message(player_endpoint, error_msg)
 
     # Player failed after all retries
     return None
@@ -129,11 +125,9 @@ async def send_game_over(referee_server, game):
         winner_choice = game.player1_choice if game.winner_id == game.player1_id else game.player2_choice
         reason = f"{game.winner_id} chose {winner_choice}, number was {game.drawn_number} ({number_parity})"
 
-    # Send GAME_OVER message to both players
-    for player_id, player_endpoint in [
-        (game.player1_id, game.player1_endpoint),
-        (game.player2_id, game.player2_endpoint)
-    ]:
+    # Send GAME_OVER message to both players concurrently
+    messages = []
+    for player_endpoint in [game.player1_endpoint, game.player2_endpoint]:
         message = referee_server.create_message(
             "GAME_OVER",
             conversation_id=game.conversation_id,
@@ -148,7 +142,8 @@ async def send_game_over(referee_server, game):
                 "reason": reason                     # Human-readable explanation
             }
         )
-        referee_server.send_message(player_endpoint, message)
+        messages.append(referee_server.send_message(player_endpoint, message))
+    await asyncio.gather(*messages)
 
 
 async def send_match_result(referee_server, game):
@@ -208,4 +203,4 @@ async def send_match_result(referee_server, game):
             }
         }
     )
-    referee_server.send_message(referee_server.league_manager_url, message)
+    await referee_server.send_message(referee_server.league_manager_url, message)
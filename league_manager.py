@@ -2,8 +2,11 @@
 League Manager HTTP Server for Even/Odd Game League System
 Handles referee and player registrations, match scheduling, and standings tracking
 """
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Request, WebSocket
 from utils.league_manager_class import LeagueManager
+from utils.league_store import LeagueStore
 import logging
 
 # Configure logging
@@ -13,8 +16,21 @@ logger = logging.getLogger(__name__)
 # Initialize League Manager
 league_manager = LeagueManager()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Restore persisted state on startup; snapshot it and close pooled connections on shutdown"""
+    if league_manager.restore():
+        league_manager.resume()
+    yield
+    await league_manager.transport.aclose()
+    league_manager.log_writer.close()
+    if league_manager.store is not None:
+        league_manager.save_snapshot()
+        league_manager.store.close()
+
+
 # FastAPI App
-app = FastAPI(title="League Manager", version="1.0.0")
+app = FastAPI(title="League Manager", version="1.0.0", lifespan=lifespan)
 
 
 @app.post("/mcp")
@@ -24,6 +40,42 @@ async def handle_mcp(request: Request):
     return await handle_mcp_request(request, league_manager)
 
 
+@app.websocket("/ws")
+async def channel_endpoint(websocket: WebSocket):
+    """Persistent channel carrying the same JSON-RPC bodies as /mcp"""
+    from utils.league_endpoints import channel_peer_verifier, handle_mcp_body
+    from utils.ws_channel import serve_channel
+    await serve_channel(websocket, lambda body: handle_mcp_body(body, league_manager), league_manager.transport,
+                        channel_peer_verifier(league_manager))
+
+
+@app.get("/query/{query_type}")
+async def query_endpoint(request: Request, query_type: str, player_id: str, target_player_id: Optional[str] = None,
+                         target_player_ids: Optional[str] = None):
+    """LEAGUE_QUERY as a plain GET (Authorization: Bearer <token>), answered from the query cache with ETags"""
+    from utils.league_endpoints import handle_query_request
+    return handle_query_request(request, league_manager, query_type, player_id, target_player_id,
+                                target_player_ids)
+
+
+@app.get("/schedule")
+async def schedule_endpoint(request: Request, player_id: str, round_id: Optional[int] = None,
+                            participant: Optional[str] = None, status: Optional[str] = None,
+                            referee_id: Optional[str] = None, cursor: Optional[str] = None,
+                            limit: Optional[int] = None):
+    """Filtered schedule streamed as NDJSON (Authorization: Bearer <token>); resume with cursor=<last match_id>"""
+    from utils.league_endpoints import handle_schedule_stream
+    filters = {"round_id": round_id, "player_id": participant, "status": status, "referee_id": referee_id}
+    return handle_schedule_stream(request, league_manager, player_id, filters, cursor, limit)
+
+
+@app.get("/events")
+async def events_endpoint(request: Request, since: Optional[int] = None, topics: Optional[str] = None):
+    """Server-Sent Events feed of standings versions, match status changes and round events"""
+    from utils.league_endpoints import handle_events_request
+    return handle_events_request(request, league_manager, since, topics)
+
+
 @app.post("/start_league")
 async def start_league_endpoint(rounds: int = 1):
     """Create schedule and start the league"""
@@ -38,10 +90,50 @@ async def health_check():
         "status": "healthy",
         "referees": len(league_manager.referees),
         "players": len(league_manager.players),
-        "matches": len(league_manager.matches)
+        "matches": len(league_manager.match_table),
+        "dispatcher": league_manager.dispatcher.stats(),
+        "query_cache": league_manager.query_cache.stats()
     }
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="localhost", port=8000)
+    import argparse
+    from utils.serving import serve_app
+    from utils.transport import unix_endpoint
+
+    parser = argparse.ArgumentParser(description="League Manager for Even/Odd League")
+    parser.add_argument("--port", type=int, default=8000, help="Port to run server on")
+    parser.add_argument("--state-db", default=None,
+                        help="SQLite file for durable league state (restored on restart)")
+    parser.add_argument("--binary-wire", action="store_true",
+                        help="Offer the compact binary format to agents that support it")
+    parser.add_argument("--websocket", action="store_true",
+                        help="Talk to other agents over persistent WebSocket channels (HTTP fallback)")
+    parser.add_argument("--standings-interval", type=float, default=league_manager.standings_interval,
+                        help="Seconds over which standings changes are coalesced into one broadcast")
+    parser.add_argument("--standings-batch", type=int, default=league_manager.standings_batch_size,
+                        help="Broadcast standings at the latest after this many match results")
+    parser.add_argument("--query-cache-mb", type=float, default=league_manager.query_cache.max_bytes / 2 ** 20,
+                        help="Memory for cached LEAGUE_QUERY results (MB of JSON)")
+    parser.add_argument("--uds", default=None,
+                        help="Also listen on this Unix domain socket (agents reach it as unix:<path>)")
+    parser.add_argument("--no-tcp", action="store_true", help="Listen on the Unix domain socket only")
+    args = parser.parse_args()
+    if args.no_tcp and not args.uds:
+        parser.error("--no-tcp requires --uds")
+
+    if args.websocket:
+        from utils.league_endpoints import handle_mcp_body
+        from utils.ws_channel import WebSocketTransport
+        endpoint = unix_endpoint(args.uds) if args.uds else f"http://localhost:{args.port}/mcp"
+        league_manager.transport = WebSocketTransport(endpoint, lambda body: handle_mcp_body(body, league_manager))
+    league_manager.transport.binary = args.binary_wire
+    league_manager.standings_interval = args.standings_interval
+    league_manager.standings_batch_size = args.standings_batch
+    league_manager.query_cache.max_bytes = int(args.query_cache_mb * 2 ** 20)
+
+    if args.state_db:
+        league_manager.store = LeagueStore(args.state_db)
+
+    serve_app(app, host="localhost", port=None if args.no_tcp else args.port, uds=args.uds,
+              on_shutdown=league_manager.events.close)
@@ -16,15 +16,20 @@ class RefereeMetadata(BaseModel):
     display_name: str
     version: Optional[str] = None
     endpoint: Optional[str] = None
+    max_concurrent_matches: int = 1
+    subscriptions: Optional[Dict[str, Any]] = None
 
 
 class PlayerMetadata(BaseModel):
     display_name: str
     agent_endpoint: str
     strategy: Optional[str] = None
+    subscriptions: Optional[Dict[str, Any]] = None
 
 
 class Referee:
+    __slots__ = ("referee_id", "auth_token", "metadata")
+
     def __init__(self, referee_id: str, auth_token: str, metadata: RefereeMetadata):
         self.referee_id = referee_id
         self.auth_token = auth_token
@@ -32,6 +37,9 @@ class Referee:
 
 
 class Player:
+    __slots__ = ("player_id", "auth_token", "metadata", "wins", "losses", "draws",
+                 "total_points_earned", "total_points_lost")
+
     def __init__(self, player_id: str, auth_token: str, metadata: PlayerMetadata):
         self.player_id = player_id
         self.auth_token = auth_token
@@ -44,14 +52,26 @@ class Player:
 
 
 class Match:
-    def __init__(self, match_id: str, round_id: int, player1_id: str, player2_id: str, referee_id: str):
+    """
+    A released match that has not been completed yet.
+
+    Completed matches only live on as rows of the league's MatchTable;
+    row is the match's position there (None for matches not in a table).
+    """
+    __slots__ = ("match_id", "round_id", "wave_id", "player1_id", "player2_id", "referee_id",
+                 "status", "result", "row")
+
+    def __init__(self, match_id: str, round_id: int, player1_id: str, player2_id: str, referee_id: str,
+                 wave_id: int = 1, row: Optional[int] = None):
         self.match_id = match_id
         self.round_id = round_id
+        self.wave_id = wave_id
         self.player1_id = player1_id
         self.player2_id = player2_id
         self.referee_id = referee_id
         self.status = MatchStatus.PENDING
         self.result = None
+        self.row = row
 
 
 class JSONRPCRequest(BaseModel):
@@ -2,7 +2,7 @@
 Data Models for Referee Agent
 """
 from enum import Enum
-from typing import Dict, Optional
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -29,6 +29,11 @@ class Message(BaseModel):
 
 class GameSession:
     """Manages a single game session"""
+    __slots__ = ("match_id", "league_id", "round_id", "conversation_id", "state",
+                 "player1_id", "player2_id", "player1_endpoint", "player2_endpoint",
+                 "player1_joined", "player2_joined", "player1_choice", "player2_choice",
+                 "drawn_number", "winner_id", "player1_retries", "player2_retries")
+
     def __init__(self, match_id: str, player1_id: str, player2_id: str,
                  player1_endpoint: str, player2_endpoint: str,
                  league_id: str = "league_2025_even_odd", round_id: int = 1):
@@ -52,4 +57,15 @@ class GameSession:
         self.drawn_number: Optional[int] = None
         self.winner_id: Optional[str] = None
 
-        self.retry_counts: Dict[str, int] = {player1_id: 0, player2_id: 0}
+        self.player1_retries = 0
+        self.player2_retries = 0
+
+    def retries(self, player_id: str) -> int:
+        """Number of failed choice requests for a player"""
+        return self.player1_retries if player_id == self.player1_id else self.player2_retries
+
+    def add_retry(self, player_id: str):
+        if player_id == self.player1_id:
+            self.player1_retries += 1
+        else:
+            self.player2_retries += 1
@@ -8,10 +8,14 @@ import asyncio
 from typing import Optional
 from contextlib import asynccontextmanager
 
-import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response, WebSocket
 
+from utils.codec import negotiated_response, read_body
 from utils.player_agent_class import PlayerAgent
+from utils.serving import serve_app
+from utils.subscriptions import parse_subscription_option
+from utils.transport import unix_endpoint
+from utils.ws_channel import WebSocketTransport, serve_channel
 
 
 # Global player agent instance
@@ -23,11 +27,13 @@ async def lifespan(app: FastAPI):
     """Handle startup and shutdown"""
     await asyncio.sleep(2)
     if player_agent:
-        player_agent.register_with_league()
+        await player_agent.register_with_league()
         player_agent.logger.info("Player agent ready and waiting for messages...")
     yield
     if player_agent:
         player_agent.logger.info("Shutting down player agent...")
+        await player_agent.transport.aclose()
+        player_agent.log_writer.close()
 
 
 app = FastAPI(title="Player Agent", version="1.0.0", lifespan=lifespan)
@@ -37,18 +43,28 @@ app = FastAPI(title="Player Agent", version="1.0.0", lifespan=lifespan)
 async def handle_mcp_request(request: Request):
     """Handle incoming JSON-RPC 2.0 requests"""
     try:
-        message = await request.json()
+        message = await read_body(request)
         if player_agent is None:
             return {"error": "Player agent not initialized"}
         response = player_agent.handle_message(message)
         if response is None:
-            response = {"status": "processed"}
-        return response
+            # Notification(s) only - nothing to send back
+            return Response(status_code=204)
+        return negotiated_response(response, request)
     except Exception as e:
         player_agent.logger.error(f"Error handling request: {e}")
         return {"error": str(e)}
 
 
+@app.websocket("/ws")
+async def channel_endpoint(websocket: WebSocket):
+    """Persistent channel carrying the same JSON-RPC bodies as /mcp"""
+    if player_agent is None:
+        await websocket.close()
+        return
+    await serve_channel(websocket, player_agent.handle_message, player_agent.transport)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -81,13 +97,33 @@ def main():
     parser.add_argument("--port", type=int, default=8101, help="HTTP server port (default: 8101)")
     parser.add_argument("--strategy", type=str, choices=["random", "alternating", "history"],
                        default="random", help="Playing strategy (default: random)")
+    parser.add_argument("--binary-wire", action="store_true",
+                        help="Offer the compact binary format to agents that support it")
+    parser.add_argument("--websocket", action="store_true",
+                        help="Talk to other agents over persistent WebSocket channels (HTTP fallback)")
+    parser.add_argument("--uds", default=None,
+                        help="Also listen on this Unix domain socket and advertise it as a unix: endpoint")
+    parser.add_argument("--no-tcp", action="store_true", help="Listen on the Unix domain socket only")
+    parser.add_argument("--league-manager", default="http://localhost:8000/mcp",
+                        help="League Manager endpoint (an http:// URL or unix:<socket path>)")
+    parser.add_argument("--subscribe", type=parse_subscription_option, default=None, metavar="TOPICS",
+                        help="Broadcasts to receive: full, own, top:K, rounds or none (default: full)")
 
     args = parser.parse_args()
+    if args.no_tcp and not args.uds:
+        parser.error("--no-tcp requires --uds")
 
     global player_agent
     player_agent = PlayerAgent(args.name, args.port, args.strategy)
-
-    uvicorn.run(app, host="0.0.0.0", port=args.port)
+    player_agent.subscriptions = args.subscribe
+    player_agent.league_manager_url = args.league_manager
+    if args.uds:
+        player_agent.agent_endpoint = unix_endpoint(args.uds)
+    if args.websocket:
+        player_agent.transport = WebSocketTransport(player_agent.agent_endpoint, player_agent.handle_message)
+    player_agent.transport.binary = args.binary_wire
+
+    serve_app(app, host="0.0.0.0", port=None if args.no_tcp else args.port, uds=args.uds)
 
 
 if __name__ == "__main__":
@@ -4,13 +4,15 @@ Referee HTTP Server for Even/Odd League Games
 Manages game sessions, enforces rules, and determines winners
 """
 import argparse
-from typing import Dict, Any
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
-import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket
 
+from utils.codec import negotiated_response, read_body
 from utils.referee_server_class import RefereeServer
+from utils.serving import serve_app
+from utils.transport import unix_endpoint
+from utils.ws_channel import WebSocketTransport, serve_channel
 
 
 # Global referee instance
@@ -24,6 +26,8 @@ async def lifespan(app: FastAPI):
     await referee.register_with_league()
     yield
     print("Shutting down Referee Server...")
+    await referee.transport.aclose()
+    referee.log_writer.close()
 
 
 # FastAPI app
@@ -31,16 +35,25 @@ app = FastAPI(title="Referee Server", lifespan=lifespan)
 
 
 @app.post("/mcp")
-async def mcp_endpoint(message: Dict[str, Any]):
-    """Main JSON-RPC 2.0 endpoint"""
+async def mcp_endpoint(request: Request):
+    """Main JSON-RPC 2.0 endpoint (single messages, notifications and batches)"""
     try:
-        response = await referee.handle_message(message)
-        return response
+        response = await referee.handle_message(await read_body(request))
+        if response is None:
+            # Notification(s) only - nothing to send back
+            return Response(status_code=204)
+        return negotiated_response(response, request)
     except Exception as e:
         print(f"Error handling message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/ws")
+async def channel_endpoint(websocket: WebSocket):
+    """Persistent channel carrying the same JSON-RPC bodies as /mcp"""
+    await serve_channel(websocket, referee.handle_message, referee.transport)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -55,8 +68,27 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Referee Server for Even/Odd League")
     parser.add_argument("--name", default="Referee Alpha", help="Referee display name")
     parser.add_argument("--port", type=int, default=8001, help="Port to run server on")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Resolve and report games in batches of this size")
+    parser.add_argument("--binary-wire", action="store_true",
+                        help="Offer the compact binary format to agents that support it")
+    parser.add_argument("--websocket", action="store_true",
+                        help="Talk to other agents over persistent WebSocket channels (HTTP fallback)")
+    parser.add_argument("--uds", default=None,
+                        help="Also listen on this Unix domain socket and advertise it as a unix: endpoint")
+    parser.add_argument("--no-tcp", action="store_true", help="Listen on the Unix domain socket only")
+    parser.add_argument("--league-manager", default="http://localhost:8000/mcp",
+                        help="League Manager endpoint (an http:// URL or unix:<socket path>)")
     args = parser.parse_args()
-
-    referee = RefereeServer(name=args.name, port=args.port)
-
-    uvicorn.run(app, host="localhost", port=args.port)
+    if args.no_tcp and not args.uds:
+        parser.error("--no-tcp requires --uds")
+
+    referee = RefereeServer(name=args.name, port=args.port, batch_size=args.batch_size)
+    referee.league_manager_url = args.league_manager
+    if args.uds:
+        referee.endpoint = unix_endpoint(args.uds)
+    if args.websocket:
+        referee.transport = WebSocketTransport(referee.endpoint, referee.handle_message)
+    referee.transport.binary = args.binary_wire
+
+    serve_app(app, host="localhost", port=None if args.no_tcp else args.port, uds=args.uds)
@@ -0,0 +1,93 @@
+"""
+Who may attach an inbound WebSocket channel on the League Manager
+"""
+import asyncio
+
+import pytest
+
+from utils.jsonrpc_utils import wrap_request
+from utils.league_endpoints import channel_peer_verifier, handle_mcp_body
+from utils.league_manager_class import LeagueManager
+from utils.transport import InProcessTransport
+from utils.ws_channel import Channel, WebSocketTransport
+
+VICTIM = "http://127.0.0.1:8101/mcp"
+REFEREE = "http://127.0.0.1:8001/mcp"
+
+
+@pytest.fixture
+def league_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = LeagueManager(transport=InProcessTransport())
+    yield manager
+    manager.log_writer.close()
+
+
+def call(league_manager, message_type, **params):
+    body = wrap_request({"protocol": "league.v2", "message_type": message_type, **params}, 1)
+    return asyncio.run(handle_mcp_body(body, league_manager))["result"]
+
+
+def register_player(league_manager, endpoint):
+    result = call(league_manager, "LEAGUE_REGISTER_REQUEST", sender="player:Someone",
+                  player_meta={"display_name": "Someone", "contact_endpoint": endpoint})
+    return result["player_id"], result["auth_token"]
+
+
+def request(message_type, **params):
+    return wrap_request({"protocol": "league.v2", "message_type": message_type, **params}, 1)
+
+
+def test_registration_does_not_prove_an_endpoint(league_manager):
+    verify = channel_peer_verifier(league_manager)
+    registration = request("LEAGUE_REGISTER_REQUEST", sender="player:Someone",
+                           player_meta={"display_name": "Someone", "contact_endpoint": VICTIM})
+    register_player(league_manager, VICTIM)
+    assert not verify(VICTIM, registration)
+
+
+def test_owner_token_proves_its_endpoint(league_manager):
+    verify = channel_peer_verifier(league_manager)
+    player_id, auth_token = register_player(league_manager, VICTIM)
+    assert verify(VICTIM, request("LEAGUE_QUERY", player_id=player_id, auth_token=auth_token,
+                                  query_type="GET_STANDINGS"))
+    assert not verify(VICTIM, request("LEAGUE_QUERY", player_id=player_id, auth_token="forged",
+                                      query_type="GET_STANDINGS"))
+    assert not verify("http://127.0.0.1:8102/mcp", request("LEAGUE_QUERY", player_id=player_id,
+                                                           auth_token=auth_token, query_type="GET_STANDINGS"))
+
+
+def test_second_registration_of_an_endpoint_cannot_attach(league_manager):
+    verify = channel_peer_verifier(league_manager)
+    victim_id, _ = register_player(league_manager, VICTIM)
+    attacker_id, attacker_token = register_player(league_manager, VICTIM)
+    assert league_manager.endpoint_owners[VICTIM] == victim_id
+    assert not verify(VICTIM, request("LEAGUE_QUERY", player_id=attacker_id, auth_token=attacker_token,
+                                      query_type="GET_STANDINGS"))
+    assert not verify(VICTIM, [request("LEAGUE_REGISTER_REQUEST",
+                                       player_meta={"display_name": "X", "contact_endpoint": VICTIM}),
+                               request("ACK", sender=f"player:{attacker_id}", auth_token=attacker_token)])
+
+
+def test_referee_proves_its_endpoint_through_the_sender(league_manager):
+    verify = channel_peer_verifier(league_manager)
+    result = call(league_manager, "REFEREE_REGISTER_REQUEST", sender="referee:UNREGISTERED",
+                  referee_meta={"display_name": "Referee", "contact_endpoint": REFEREE})
+    report = request("MATCH_RESULT_REPORT", sender=f"referee:{result['referee_id']}",
+                     auth_token=result["auth_token"], match_id="R1M1")
+    assert verify(REFEREE, report)
+    assert not verify(VICTIM, report)
+
+
+def test_attached_channel_only_serves_its_exact_endpoint():
+    async def run():
+        transport = WebSocketTransport()
+        channel = Channel(lambda data: asyncio.sleep(0))
+        transport.attach(VICTIM, channel)
+        assert await transport._channel(VICTIM) is channel
+        transport.http_hosts.add("127.0.0.1:8101")
+        assert await transport._channel("http://127.0.0.1:8101/other/mcp") is None
+        transport.detach(VICTIM, channel)
+        assert await transport._channel(VICTIM) is None
+        await transport.aclose()
+    asyncio.run(run())
@@ -0,0 +1,27 @@
+"""
+JsonlWriter rotation and compression
+"""
+import gzip
+import os
+
+from utils.jsonl_writer import JsonlWriter
+
+
+def test_rotation_compresses_segments_left_by_an_interrupted_run(tmp_path):
+    path = tmp_path / "agent.jsonl"
+    # A run killed while compressing: raw segment, empty .gz and a half-written temp file
+    leftover = tmp_path / "agent.jsonl.20260101T000000"
+    leftover.write_bytes(b'{"n": 0}\n')
+    (tmp_path / "agent.jsonl.20260101T000000.gz").write_bytes(b"")
+    (tmp_path / "agent.jsonl.20260101T000000.gz.partial").write_bytes(b"\x1f")
+
+    writer = JsonlWriter(str(path), max_bytes=1)
+    writer.write({"n": 1})
+    writer.close()
+
+    names = sorted(os.listdir(tmp_path))
+    assert all(name == "agent.jsonl" or name.endswith(".gz") for name in names), names
+    assert gzip.decompress((tmp_path / "agent.jsonl.20260101T000000.gz").read_bytes()) == b'{"n": 0}\n'
+    rotated = [name for name in names if name.endswith(".gz") and "20260101" not in name]
+    assert len(rotated) == 1
+    assert gzip.decompress((tmp_path / rotated[0]).read_bytes()) == b'{"n":1}\n'
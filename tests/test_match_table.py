@@ -0,0 +1,48 @@
+"""
+MatchTable result columns
+"""
+import pytest
+
+from utils.match_table import MatchTable
+
+
+@pytest.fixture
+def table():
+    table = MatchTable()
+    table.append(1, 0, "P1", "P2", "REF1")
+    return table
+
+
+@pytest.mark.parametrize("result", [
+    {"winner": "P3", "score": {"P1": 3, "P2": 0}},
+    {"winner": "P1", "score": {"P1": 300, "P2": 0}},
+    {"winner": "P1", "score": {"P1": -1, "P2": 0}},
+    {"winner": "P1", "score": {"P1": "3", "P2": 0}},
+    {"winner": "P1", "score": {"P1": 3.0, "P2": 0}},
+    {"winner": "P1", "score": ["P1"]},
+    {"winner": "P1", "score": {"P1": 3, "P2": 0}, "details": {"drawn_number": 256}},
+    {"winner": "P1", "score": {"P1": 3, "P2": 0}, "details": {"choices": "even"}},
+    "P1",
+])
+def test_rejected_result_leaves_the_row_unchanged(table, result):
+    with pytest.raises(ValueError):
+        table.record_result(0, result)
+    assert table.result(0) is None
+
+
+def test_result_round_trips(table):
+    table.record_result(0, {"winner": "P2", "score": {"P1": 0, "P2": 3},
+                            "details": {"drawn_number": 7, "choices": {"P1": "even", "P2": "odd"}}})
+    assert table.result(0) == {"winner": "P2", "score": {"P1": 0, "P2": 3},
+                               "details": {"drawn_number": 7, "choices": {"P1": "even", "P2": "odd"}}}
+
+
+def test_void_result_is_stored_as_its_own_outcome(table):
+    table.record_result(0, {"winner": None, "details": {"void": "3 attempts"}})
+    assert table.result(0) == {"winner": None, "score": {}, "details": {"void": True}}
+
+
+def test_void_result_cannot_name_a_winner(table):
+    with pytest.raises(ValueError):
+        table.record_result(0, {"winner": "P1", "details": {"void": "3 attempts"}})
+    assert table.result(0) is None
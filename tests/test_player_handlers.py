@@ -0,0 +1,34 @@
+"""
+Applying LEAGUE_STANDINGS_UPDATE broadcasts on the player side
+"""
+from types import SimpleNamespace
+
+from utils.player_handlers import handle_league_standings_update
+
+
+def update(version, base_version, rows):
+    return {"message_type": "LEAGUE_STANDINGS_UPDATE", "standings_version": version, "base_version": base_version,
+            "standings": rows}
+
+
+def row(player_id, rank, points):
+    return {"rank": rank, "player_id": player_id, "played": 1, "wins": points // 3, "draws": 0,
+            "losses": 1 - points // 3, "points": points}
+
+
+def test_late_full_table_does_not_roll_back_newer_deltas():
+    player = SimpleNamespace(player_id="P1", standings={}, standings_version=0)
+    handle_league_standings_update(player, update(1, 0, [row("P1", 1, 0), row("P2", 2, 0)]))
+    handle_league_standings_update(player, update(3, 1, [row("P2", 1, 3), row("P1", 2, 0)]))
+    handle_league_standings_update(player, update(2, 0, [row("P1", 1, 3), row("P2", 2, 0)]))
+    assert player.standings_version == 3
+    assert player.standings["P2"]["points"] == 3
+    handle_league_standings_update(player, update(4, 3, [row("P1", 1, 6)]))
+    assert player.standings_version == 4
+    assert player.standings["P1"]["points"] == 6
+
+
+def test_unversioned_full_table_always_applies():
+    player = SimpleNamespace(player_id="P1", standings={}, standings_version=5)
+    handle_league_standings_update(player, {"standings": [row("P1", 1, 3)]})
+    assert player.standings == {"P1": row("P1", 1, 3)}
@@ -0,0 +1,376 @@
+"""
+Compact binary encoding of league.v2 messages
+
+A MessagePack encoder/decoder with two league-specific dictionaries:
+well-known field names are sent as small integer keys, and the values of
+enumerated fields (message_type, method, protocol, ...) as integer codes.
+URL-safe auth tokens travel as their raw bytes. Decoding uses the msgpack
+C extension when it is installed and a pure-Python decoder otherwise.
+
+Both tables are part of the wire format (see MEDIA_TYPE): only ever
+append to them, and bump the version when an entry has to change.
+"""
+import base64
+import struct
+from typing import Any, Dict, List, Tuple
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+MEDIA_TYPE = "application/vnd.league.v2+msgpack"
+
+FIELDS: List[str] = [
+    # JSON-RPC envelope
+    "jsonrpc", "method", "params", "id", "result", "error", "code", "message",
+    # league.v2 envelope
+    "protocol", "message_type", "sender", "timestamp", "conversation_id", "auth_token",
+    # Common message fields
+    "match_id", "league_id", "round_id", "player_id", "referee_id", "game_type", "status", "reason",
+    "player1_id", "player2_id", "player1_endpoint", "player2_endpoint", "role_in_match", "opponent_id",
+    "context", "your_standings", "deadline", "timeout_seconds", "choice", "accept", "arrival_timestamp",
+    "game_result", "winner_player_id", "drawn_number", "number_parity", "choices", "winner", "score",
+    "details", "standings", "final_standings", "champion", "matches_played", "next_round_id",
+    "total_rounds", "total_matches", "query_type", "data", "error_code", "error_message",
+    "referee_meta", "player_meta", "display_name", "version", "game_types", "contact_endpoint",
+    "max_concurrent_matches", "strategy",
+    # Standings rows
+    "rank", "played", "wins", "draws", "losses", "points",
+    # Delta standings updates
+    "standings_version", "base_version",
+    # Broadcast subscriptions
+    "subscriptions", "top_k", "rounds",
+    # Schedule pages
+    "filters", "cursor", "limit", "next_cursor", "matches",
+    # Bulk queries
+    "target_player_ids", "unknown", "total_points_earned", "total_points_lost", "total_games",
+]
+FIELD_CODES: Dict[str, int] = {field: code for code, field in enumerate(FIELDS)}
+
+VALUES: Dict[str, List[str]] = {
+    "jsonrpc": ["2.0"],
+    "protocol": ["league.v2"],
+    "message_type": [
+        "REFEREE_REGISTER_REQUEST", "REFEREE_REGISTER_RESPONSE", "LEAGUE_REGISTER_REQUEST",
+        "LEAGUE_REGISTER_RESPONSE", "MATCH_ASSIGNMENT", "MATCH_ASSIGNMENT_ACK", "GAME_INVITATION",
+        "GAME_JOIN_ACK", "CHOOSE_PARITY_CALL", "CHOOSE_PARITY_RESPONSE", "GAME_OVER", "MATCH_RESULT_REPORT",
+        "MATCH_RESULT_ACKNOWLEDGED", "ROUND_ANNOUNCEMENT", "ROUND_COMPLETED", "LEAGUE_STANDINGS_UPDATE",
+        "LEAGUE_COMPLETED", "LEAGUE_QUERY", "LEAGUE_QUERY_RESPONSE", "ACK", "ERROR", "GAME_ERROR",
+        "LEAGUE_SUBSCRIBE", "LEAGUE_SUBSCRIBE_RESPONSE",
+    ],
+    "method": [
+        "register_referee", "register_player", "assign_match", "handle_game_invitation", "choose_parity",
+        "notify_match_result", "report_match_result", "announce_round", "notify_round_completed",
+        "update_standings", "notify_league_completed", "query_league", "acknowledge", "error", "unknown",
+        "subscribe",
+    ],
+    "game_type": ["even_odd"],
+    "choice": ["even", "odd"],
+    "number_parity": ["even", "odd"],
+}
+VALUE_CODES: Dict[str, Dict[str, int]] = {field: {value: code for code, value in enumerate(values)}
+                                          for field, values in VALUES.items()}
+# VALUES and VALUE_CODES by field code, None for fields without value codes
+_FIELD_VALUES: List[Any] = [VALUES.get(field) for field in FIELDS]
+_FIELD_VALUE_CODES: List[Any] = [VALUE_CODES.get(field) for field in FIELDS]
+_AUTH_TOKEN = FIELD_CODES["auth_token"]
+
+# Ext type for auth tokens sent as raw bytes (secrets.token_urlsafe output)
+EXT_TOKEN = 1
+
+_pack_uint16 = struct.Struct(">H").pack
+_pack_uint32 = struct.Struct(">I").pack
+_pack_uint64 = struct.Struct(">Q").pack
+_pack_int64 = struct.Struct(">q").pack
+_pack_double = struct.Struct(">d").pack
+_unpack_uint16 = struct.Struct(">H").unpack_from
+_unpack_uint32 = struct.Struct(">I").unpack_from
+_unpack_uint64 = struct.Struct(">Q").unpack_from
+_unpack_int64 = struct.Struct(">q").unpack_from
+_unpack_double = struct.Struct(">d").unpack_from
+
+
+def _pack_str(value: str, out: bytearray):
+    data = value.encode("utf-8")
+    size = len(data)
+    if size < 32:
+        out.append(0xa0 | size)
+    elif size < 0x100:
+        out += b"\xd9" + bytes((size,))
+    elif size < 0x10000:
+        out += b"\xda" + _pack_uint16(size)
+    else:
+        out += b"\xdb" + _pack_uint32(size)
+    out += data
+
+
+def _pack_int(value: int, out: bytearray):
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xff)
+    elif 0 <= value < 0x100:
+        out += b"\xcc" + bytes((value,))
+    elif 0 <= value < 0x10000:
+        out += b"\xcd" + _pack_uint16(value)
+    elif 0 <= value < 0x100000000:
+        out += b"\xce" + _pack_uint32(value)
+    elif 0 <= value < 0x10000000000000000:
+        out += b"\xcf" + _pack_uint64(value)
+    else:
+        out += b"\xd3" + _pack_int64(value)
+
+
+def _pack_token(value: str, out: bytearray) -> bool:
+    """Pack a URL-safe base64 token as raw bytes if it round-trips exactly"""
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+    except ValueError:
+        return False
+    if len(raw) >= 0x100 or base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii") != value:
+        return False
+    out += b"\xc7" + bytes((len(raw), EXT_TOKEN)) + raw
+    return True
+
+
+def _pack(value: Any, out: bytearray):
+    if value.__class__ is str:
+        _pack_str(value, out)
+    elif isinstance(value, dict):
+        size = len(value)
+        if size < 16:
+            out.append(0x80 | size)
+        elif size < 0x10000:
+            out += b"\xde" + _pack_uint16(size)
+        else:
+            out += b"\xdf" + _pack_uint32(size)
+        for key, item in value.items():
+            code = FIELD_CODES.get(key)
+            if code is None:
+                _pack(key if isinstance(key, str) else str(key), out)
+                _pack(item, out)
+                continue
+            out.append(code)
+            cls = item.__class__
+            if cls is str:
+                values = _FIELD_VALUE_CODES[code]
+                if values is not None and item in values:
+                    out.append(values[item])
+                elif code != _AUTH_TOKEN or not _pack_token(item, out):
+                    _pack_str(item, out)
+            elif cls is int and 0 <= item < 0x80:
+                out.append(item)
+            else:
+                _pack(item, out)
+    elif value is None:
+        out.append(0xc0)
+    elif value is True:
+        out.append(0xc3)
+    elif value is False:
+        out.append(0xc2)
+    elif isinstance(value, int):
+        _pack_int(value, out)
+    elif isinstance(value, (list, tuple)):
+        out += array_header(len(value))
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, float):
+        out += b"\xcb" + _pack_double(value)
+    elif isinstance(value, str):
+        # str subclasses such as str-valued enums encode as their value, like in JSON
+        _pack_str(str.__str__(value), out)
+    else:
+        # Same fallback as the JSON codec
+        _pack_str(str(value), out)
+
+
+def array_header(size: int) -> bytes:
+    """Header of an array of size items (their encodings follow it)"""
+    if size < 16:
+        return bytes((0x90 | size,))
+    if size < 0x10000:
+        return b"\xdc" + _pack_uint16(size)
+    return b"\xdd" + _pack_uint32(size)
+
+
+def encode(value: Any) -> bytes:
+    """Encode a JSON-compatible object"""
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+_unpack_int8 = struct.Struct(">b").unpack_from
+_unpack_int16 = struct.Struct(">h").unpack_from
+_unpack_int32 = struct.Struct(">i").unpack_from
+_unpack_float = struct.Struct(">f").unpack_from
+
+# Fixed-size numbers: type byte -> (unpack, size)
+_NUMBERS = {
+    0xcc: (lambda data, pos: (data[pos],), 1), 0xcd: (_unpack_uint16, 2), 0xce: (_unpack_uint32, 4),
+    0xcf: (_unpack_uint64, 8), 0xd0: (_unpack_int8, 1), 0xd1: (_unpack_int16, 2), 0xd2: (_unpack_int32, 4),
+    0xd3: (_unpack_int64, 8), 0xca: (_unpack_float, 4), 0xcb: (_unpack_double, 8),
+}
+# Variable-size headers: type byte -> (kind, length unpack, length size)
+_SIZED = {
+    0xd9: ("str", lambda data, pos: (data[pos],), 1), 0xda: ("str", _unpack_uint16, 2),
+    0xdb: ("str", _unpack_uint32, 4), 0xdc: ("array", _unpack_uint16, 2), 0xdd: ("array", _unpack_uint32, 4),
+    0xde: ("map", _unpack_uint16, 2), 0xdf: ("map", _unpack_uint32, 4),
+}
+_CONSTANTS = {0xc0: None, 0xc2: False, 0xc3: True}
+# fixext 1/2/4/8/16 and ext 8 (how a C msgpack packer may frame tokens)
+_FIXEXT_SIZES = {0xd4: 1, 0xd5: 2, 0xd6: 4, 0xd7: 8, 0xd8: 16}
+
+
+def _unpack(data: bytes, pos: int) -> Tuple[Any, int]:
+    # Cases ordered by how often they occur in league messages
+    byte = data[pos]
+    pos += 1
+    if byte < 0x80:
+        return byte, pos
+    if byte >= 0xa0:
+        if byte <= 0xbf:
+            end = pos + (byte & 0x1f)
+            return data[pos:end].decode("utf-8"), end
+        if byte >= 0xe0:
+            return byte - 0x100, pos
+    elif byte <= 0x8f:
+        return _unpack_map(data, pos, byte & 0x0f)
+    else:
+        return _unpack_array(data, pos, byte & 0x0f)
+    number = _NUMBERS.get(byte)
+    if number is not None:
+        unpack, size = number
+        return unpack(data, pos)[0], pos + size
+    sized = _SIZED.get(byte)
+    if sized is not None:
+        kind, unpack, size = sized
+        length, pos = unpack(data, pos)[0], pos + size
+        if kind == "str":
+            return data[pos:pos + length].decode("utf-8"), pos + length
+        if kind == "array":
+            return _unpack_array(data, pos, length)
+        return _unpack_map(data, pos, length)
+    if byte in _CONSTANTS:
+        return _CONSTANTS[byte], pos
+    if byte == 0xc7:
+        size, ext_type, pos = data[pos], data[pos + 1], pos + 2
+    elif byte in _FIXEXT_SIZES:
+        size, ext_type, pos = _FIXEXT_SIZES[byte], data[pos], pos + 1
+    else:
+        size = ext_type = None
+    if ext_type == EXT_TOKEN:
+        return base64.urlsafe_b64encode(data[pos:pos + size]).rstrip(b"=").decode("ascii"), pos + size
+    raise ValueError(f"Unsupported binary type byte 0x{byte:02x} at offset {pos - 1}")
+
+
+def _unpack_array(data: bytes, pos: int, size: int) -> Tuple[List[Any], int]:
+    items = []
+    append = items.append
+    for _ in range(size):
+        byte = data[pos]
+        if 0x80 <= byte <= 0x8f:
+            # Arrays in league messages are mostly rows (standings, schedules)
+            item, pos = _unpack_map(data, pos + 1, byte & 0x0f)
+        else:
+            item, pos = _unpack(data, pos)
+        append(item)
+    return items, pos
+
+
+def _unpack_map(data: bytes, pos: int, size: int) -> Tuple[Dict[str, Any], int]:
+    # The common keys (field codes) and values (small ints, short strings,
+    # value codes, nested maps and arrays) are decoded inline rather than
+    # through _unpack
+    result = {}
+    for _ in range(size):
+        byte = data[pos]
+        if byte < 0x80:
+            # Integer keys are field codes (JSON objects only have string keys)
+            key = FIELDS[byte]
+            codes = _FIELD_VALUES[byte]
+            pos += 1
+        else:
+            key, pos = _unpack(data, pos)
+            codes = None
+            if key.__class__ is int:
+                if key < 0:
+                    raise KeyError(key)
+                codes = _FIELD_VALUES[key]
+                key = FIELDS[key]
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            value = byte if codes is None else codes[byte]
+        elif byte >= 0xa0:
+            if byte <= 0xbf:
+                end = pos + (byte & 0x1f)
+                value = data[pos:end].decode("utf-8")
+                pos = end
+            else:
+                value, pos = _unpack(data, pos - 1)
+                if codes is not None and value.__class__ is int:
+                    value = codes[value]
+        elif byte <= 0x8f:
+            value, pos = _unpack_map(data, pos, byte & 0x0f)
+        else:
+            value, pos = _unpack_array(data, pos, byte & 0x0f)
+        result[key] = value
+    return result, pos
+
+
+def _unpack_pairs(pairs: List[Tuple[Any, Any]]) -> Dict[str, Any]:
+    # object_pairs_hook for the msgpack backend: same key/value mapping as _unpack_map
+    result = {}
+    for key, value in pairs:
+        if key.__class__ is int:
+            if key < 0:
+                raise KeyError(key)
+            codes = _FIELD_VALUES[key]
+            key = FIELDS[key]
+            if codes is not None and value.__class__ is int:
+                value = codes[value]
+        result[key] = value
+    return result
+
+
+def _unpack_ext(ext_type: int, data: bytes) -> str:
+    if ext_type != EXT_TOKEN:
+        raise ValueError(f"Unsupported binary ext type {ext_type}")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+if msgpack is not None:
+    BACKEND = "msgpack"
+    _DECODE_ERRORS = (IndexError, KeyError, TypeError, ValueError, msgpack.UnpackException)
+
+    def decode(data: bytes) -> Any:
+        """
+        Decode a binary body.
+
+        Raises:
+            ValueError: If the body is truncated, malformed or has trailing bytes
+        """
+        try:
+            return msgpack.unpackb(data, object_pairs_hook=_unpack_pairs, ext_hook=_unpack_ext,
+                                   strict_map_key=False)
+        except _DECODE_ERRORS as e:
+            raise ValueError(f"Malformed binary body: {e}") from e
+else:
+    BACKEND = "python"
+
+    def decode(data: bytes) -> Any:
+        """
+        Decode a binary body.
+
+        Raises:
+            ValueError: If the body is truncated, malformed or has trailing bytes
+        """
+        try:
+            value, end = _unpack(data, 0)
+        except (IndexError, KeyError, TypeError, struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Malformed binary body: {e}") from e
+        if end != len(data):
+            raise ValueError(f"Malformed binary body: {len(data) - end} trailing bytes")
+        return value
@@ -0,0 +1,327 @@
+"""
+league.v2 message codec
+
+Messages are built from one precompiled schema per message type and
+encoded to bytes at most once: the same buffer is posted to the wire and
+written to the JSONL log. Incoming bodies are decoded straight from the
+request bytes. Uses orjson when it is installed and the stdlib json
+module otherwise.
+
+/mcp bodies are JSON by default. Agents that send an Accept header naming
+binary_codec.MEDIA_TYPE get binary responses, and binary requests are
+recognised by their Content-Type.
+"""
+import json
+import secrets
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils import binary_codec
+from utils.jsonrpc_utils import MESSAGE_TYPE_TO_METHOD
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+PROTOCOL = "league.v2"
+JSON_MEDIA_TYPE = "application/json"
+BINARY_MEDIA_TYPE = binary_codec.MEDIA_TYPE
+JSON_HEADERS = {"Content-Type": JSON_MEDIA_TYPE}
+BINARY_HEADERS = {"Content-Type": BINARY_MEDIA_TYPE}
+# Sent by clients that can read binary responses
+ACCEPT_BINARY = f"{BINARY_MEDIA_TYPE}, {JSON_MEDIA_TYPE};q=0.9"
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Encode a JSON-serializable object to UTF-8 bytes"""
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+
+    def loads(data: Any) -> Any:
+        """Decode JSON from bytes or str"""
+        return orjson.loads(data)
+else:
+    BACKEND = "json"
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False, default=str)
+
+    def dumps(obj: Any) -> bytes:
+        """Encode a JSON-serializable object to UTF-8 bytes"""
+        return _encoder.encode(obj).encode("utf-8")
+
+    def loads(data: Any) -> Any:
+        """Decode JSON from bytes or str"""
+        return json.loads(data)
+
+
+class Encoded:
+    """
+    A JSON body together with its encoding.
+
+    The bytes are produced on first access and reused afterwards, so a
+    message broadcast to many agents and written to the log is serialized
+    once. In-process delivery uses the object itself and never encodes.
+    The message must not be mutated once it is wrapped.
+    """
+    __slots__ = ("message", "_data", "_binary")
+
+    def __init__(self, message: Any, data: Optional[bytes] = None):
+        self.message = message
+        self._data = data
+        self._binary = None
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            self._data = dumps(self.message)
+        return self._data
+
+    @property
+    def binary(self) -> bytes:
+        """The binary wire encoding, also produced at most once"""
+        if self._binary is None:
+            self._binary = binary_codec.encode(self.message)
+        return self._binary
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Encoded":
+        """Wrap received bytes, keeping them for the log"""
+        return cls(loads(data), data)
+
+
+class EncodedBatch(Encoded):
+    """A JSON-RPC batch array whose bytes are joined from its Encoded entries"""
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: List[Encoded]):
+        super().__init__([part.message for part in parts])
+        self.parts = parts
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            self._data = b"[" + b",".join(part.data for part in self.parts) + b"]"
+        return self._data
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = binary_codec.array_header(len(self.parts)) + b"".join(part.binary for part in self.parts)
+        return self._binary
+
+
+# Stand-in for a Spliced body's embedded value (never a real field value)
+SPLICE = f"\x00splice:{secrets.token_hex(8)}"
+_SPLICE_JSON = dumps(SPLICE)
+_SPLICE_BINARY = binary_codec.encode(SPLICE)
+
+
+class Spliced(Encoded):
+    """
+    A body embedding an Encoded value (such as a cached query result).
+
+    The body is encoded with SPLICE in the value's place and the value's
+    existing bytes are substituted in, so a large value is never encoded
+    again for each body carrying it.
+
+    Args:
+        template: The body with SPLICE where the value goes
+        part: The embedded value
+        message: The body with the value itself (for in-process delivery)
+    """
+    __slots__ = ("template", "part")
+
+    def __init__(self, template: Any, part: Encoded, message: Any):
+        super().__init__(message)
+        self.template = template
+        self.part = part
+
+    def map(self, wrap: Callable[[Any], Any]) -> "Spliced":
+        """The same splice inside an envelope, e.g. lambda body: wrap_response(body, request_id)"""
+        return Spliced(wrap(self.template), self.part, wrap(self.message))
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            self._data = dumps(self.template).replace(_SPLICE_JSON, self.part.data, 1)
+        return self._data
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = binary_codec.encode(self.template).replace(_SPLICE_BINARY, self.part.binary, 1)
+        return self._binary
+
+
+def encode_batch(parts: List[Encoded]) -> Encoded:
+    """Combine Encoded messages like wrap_batch: one stays as is, more become a batch"""
+    return parts[0] if len(parts) == 1 else EncodedBatch(parts)
+
+
+def body_of(payload: Any) -> Any:
+    """The JSON object of a payload that may be Encoded"""
+    return payload.message if isinstance(payload, Encoded) else payload
+
+
+def encode_body(payload: Any, binary: bool = False) -> bytes:
+    """Bytes of a payload that may already be Encoded, as JSON or in the binary format"""
+    if isinstance(payload, Encoded):
+        return payload.binary if binary else payload.data
+    return binary_codec.encode(payload) if binary else dumps(payload)
+
+
+def is_binary(content_type: Optional[str]) -> bool:
+    """Whether a Content-Type header names the binary format"""
+    return bool(content_type) and content_type.split(";", 1)[0].strip() == BINARY_MEDIA_TYPE
+
+
+def accepts_binary(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for the binary format"""
+    return bool(accept) and BINARY_MEDIA_TYPE in accept
+
+
+def decode_body(data: bytes, content_type: Optional[str] = None) -> Any:
+    """
+    Decode a body according to its Content-Type (JSON unless it names the binary format).
+
+    Raises:
+        ValueError: If the body is not valid in its format
+    """
+    if is_binary(content_type):
+        return binary_codec.decode(data)
+    return loads(data)
+
+
+def encode_log_entry(entry: Dict[str, Any]) -> bytes:
+    """
+    Encode a log entry, splicing in the bytes of Encoded values.
+
+    Entries are small envelopes (timestamp, direction) around a message;
+    when the message is Encoded its existing buffer is copied in as is.
+    """
+    plain = {}
+    spliced = []
+    for key, value in entry.items():
+        if isinstance(value, Encoded):
+            spliced.append(dumps(key) + b":" + value.data)
+        else:
+            plain[key] = value
+    if not spliced:
+        return dumps(entry)
+    head = dumps(plain)[:-1]
+    return head + (b"," if plain else b"") + b",".join(spliced) + b"}"
+
+
+class MessageSchema:
+    """
+    Field layout of one league.v2 message type.
+
+    Compiled once per type: the JSON-RPC method, the required and optional
+    fields that build() checks and the canonical order of envelope fields.
+    A schema that declares no fields (the ad-hoc ones build_message makes
+    for unknown types) accepts any.
+    """
+    __slots__ = ("message_type", "method", "required", "optional", "fields")
+
+    def __init__(self, message_type: str, required: Iterable[str] = (), optional: Iterable[str] = ()):
+        self.message_type = message_type
+        self.method = MESSAGE_TYPE_TO_METHOD.get(message_type, "unknown")
+        self.required = tuple(required)
+        self.optional = tuple(optional)
+        self.fields = frozenset(self.required + self.optional) or None
+
+    def build(self, sender: str, timestamp: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Create a message with the standard envelope followed by its fields.
+
+        Raises:
+            ValueError: If a required field is missing or a field is not in the schema
+        """
+        for field in self.required:
+            if field not in fields:
+                raise ValueError(f"{self.message_type} requires field '{field}'")
+        if self.fields is not None and not self.fields.issuperset(fields):
+            unknown = sorted(set(fields) - self.fields)
+            raise ValueError(f"{self.message_type} has no field {', '.join(map(repr, unknown))}")
+        message = {"protocol": PROTOCOL, "message_type": self.message_type, "sender": sender,
+                   "timestamp": timestamp}
+        message.update(fields)
+        return message
+
+
+def _schemas(*schemas: MessageSchema) -> Dict[str, MessageSchema]:
+    return {schema.message_type: schema for schema in schemas}
+
+
+SCHEMAS: Dict[str, MessageSchema] = _schemas(
+    MessageSchema("REFEREE_REGISTER_REQUEST", ["conversation_id", "referee_meta"]),
+    MessageSchema("REFEREE_REGISTER_RESPONSE",
+                  ["conversation_id", "status", "referee_id", "auth_token", "league_id"], ["reason"]),
+    MessageSchema("LEAGUE_REGISTER_REQUEST", ["conversation_id", "player_meta"]),
+    MessageSchema("LEAGUE_REGISTER_RESPONSE",
+                  ["conversation_id", "status", "player_id", "auth_token", "league_id"], ["reason"]),
+    MessageSchema("MATCH_ASSIGNMENT", ["conversation_id", "match_id", "league_id", "round_id", "player1_id",
+                                       "player2_id", "player1_endpoint", "player2_endpoint"]),
+    MessageSchema("MATCH_ASSIGNMENT_ACK", ["conversation_id", "match_id", "status"]),
+    MessageSchema("GAME_INVITATION", ["conversation_id", "match_id", "game_type", "league_id", "round_id",
+                                      "role_in_match", "opponent_id"]),
+    MessageSchema("GAME_JOIN_ACK", ["conversation_id", "match_id", "player_id", "accept"],
+                  ["auth_token", "arrival_timestamp"]),
+    MessageSchema("CHOOSE_PARITY_CALL", ["conversation_id", "match_id", "player_id", "game_type"],
+                  ["context", "deadline", "timeout_seconds"]),
+    MessageSchema("CHOOSE_PARITY_RESPONSE", ["conversation_id", "match_id", "choice"], ["auth_token"]),
+    MessageSchema("GAME_OVER", ["conversation_id", "match_id", "game_type", "game_result"]),
+    MessageSchema("GAME_ERROR", ["conversation_id", "match_id", "error_code", "error_message"]),
+    MessageSchema("MATCH_RESULT_REPORT", ["conversation_id", "league_id", "round_id", "match_id",
+                                          "game_type", "result"]),
+    MessageSchema("MATCH_RESULT_ACKNOWLEDGED", ["conversation_id", "match_id"]),
+    MessageSchema("ROUND_ANNOUNCEMENT", ["conversation_id"], ["round_number", "schedule"]),
+    MessageSchema("ROUND_COMPLETED", ["conversation_id", "round_id", "matches_played", "next_round_id"],
+                  ["league_id"]),
+    MessageSchema("LEAGUE_STANDINGS_UPDATE", ["conversation_id", "league_id", "round_id", "standings"],
+                  ["standings_version", "base_version"]),
+    MessageSchema("LEAGUE_COMPLETED", ["conversation_id", "league_id", "final_standings"],
+                  ["total_rounds", "total_matches", "champion"]),
+    MessageSchema("LEAGUE_SUBSCRIBE", ["conversation_id", "subscriptions"], ["player_id", "referee_id", "auth_token"]),
+    MessageSchema("LEAGUE_SUBSCRIBE_RESPONSE", ["conversation_id", "status", "subscriptions"]),
+    MessageSchema("LEAGUE_QUERY", ["conversation_id", "query_type"],
+                  ["player_id", "referee_id", "auth_token", "target_player_id", "target_player_ids", "filters",
+                   "cursor", "limit"]),
+    MessageSchema("LEAGUE_QUERY_RESPONSE", ["conversation_id", "query_type", "data"]),
+    MessageSchema("ACK", ["conversation_id"], ["status"]),
+    MessageSchema("ERROR", ["conversation_id", "error_code", "error_message"]),
+)
+
+
+def build_message(message_type: str, sender: str, timestamp: str, **fields: Any) -> Dict[str, Any]:
+    """Build a message with its type's schema (unknown types get the envelope only)"""
+    schema = SCHEMAS.get(message_type)
+    if schema is None:
+        schema = SCHEMAS[message_type] = MessageSchema(message_type)
+    return schema.build(sender, timestamp, **fields)
+
+
+def json_response(body: Any, status_code: int = 200):
+    """
+    FastAPI response carrying an already-encoded JSON body.
+
+    Skips FastAPI's jsonable_encoder walk and stdlib re-encoding of the
+    returned object.
+    """
+    from fastapi import Response
+    return Response(content=encode_body(body), status_code=status_code, media_type=JSON_MEDIA_TYPE)
+
+
+async def read_body(request) -> Any:
+    """Decode an /mcp request body in whichever format it was sent"""
+    return decode_body(await request.body(), request.headers.get("content-type"))
+
+
+def negotiated_response(body: Any, request, status_code: int = 200):
+    """Encode an /mcp response as binary if the request's Accept header allows it, else as JSON"""
+    if not accepts_binary(request.headers.get("accept")):
+        return json_response(body, status_code)
+    from fastapi import Response
+    return Response(content=encode_body(body, binary=True), status_code=status_code,
+                    media_type=BINARY_MEDIA_TYPE)
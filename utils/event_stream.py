@@ -0,0 +1,183 @@
+"""
+Server-Sent Events feed of league changes for read-only followers
+
+The league manager publishes each standings version, match status change
+and round/league completion once. An event is encoded as an SSE frame the
+first time a reader needs it (right away while anyone is connected) and
+the same bytes go to every reader, so followers never trigger a
+recomputation of the table or schedule, and the write path does not pay
+for encoding when nobody is listening.
+
+Readers resume with Last-Event-ID (or ?since=) from a bounded history;
+those too far behind start over from a snapshot. Each reader has a
+bounded buffer, and one that falls behind by more than that is
+disconnected instead of holding events in memory; EventSource clients
+reconnect by themselves and replay from their last event ID.
+"""
+import asyncio
+from collections import deque
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Deque, FrozenSet, List, Optional, Set
+
+from utils.codec import dumps
+
+# Event names readers can filter on with ?topics=
+TOPICS = frozenset({"standings", "match", "round_completed", "league_completed"})
+
+
+def sse_frame(event_id: int, event: str, data) -> bytes:
+    """One SSE event with a JSON data line"""
+    return f"id: {event_id}\nevent: {event}\ndata: ".encode("ascii") + dumps(data) + b"\n\n"
+
+
+class StreamReader:
+    """One connected reader: its topic filter and bounded queue of frames"""
+
+    def __init__(self, topics: FrozenSet[str], buffer: int):
+        self.topics = topics
+        self.buffer = buffer
+        self.frames: Deque[bytes] = deque()
+        self.overflowed = False
+        self.closed = False
+        self._wake = asyncio.Event()
+
+    def push(self, event: str, frame: bytes):
+        if self.overflowed or event not in self.topics:
+            return
+        if len(self.frames) >= self.buffer:
+            # Too slow: drop it rather than buffer without bound
+            self.overflowed = True
+            self.frames.clear()
+        else:
+            self.frames.append(frame)
+        self._wake.set()
+
+    def close(self):
+        self.closed = True
+        self._wake.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for frames (or overflow/close); False on timeout"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._wake.clear()
+        return True
+
+
+class _Event:
+    """A published event, encoded on first use"""
+    __slots__ = ("event_id", "event", "data", "_frame")
+
+    def __init__(self, event_id: int, event: str, data: Any):
+        self.event_id = event_id
+        self.event = event
+        self.data = data
+        self._frame: Optional[bytes] = None
+
+    @property
+    def frame(self) -> bytes:
+        if self._frame is None:
+            self._frame = sse_frame(self.event_id, self.event, self.data)
+            self.data = None
+        return self._frame
+
+
+class EventStream:
+    """
+    Publisher side of the feed: event history plus the connected readers.
+
+    Args:
+        history: Events kept for replay
+        reader_buffer: Events queued per reader before it is disconnected
+        keepalive: Seconds between comment lines on an idle stream
+    """
+
+    def __init__(self, history: int = 4096, reader_buffer: int = 1024, keepalive: float = 15.0):
+        self.last_id = 0
+        self.reader_buffer = reader_buffer
+        self.keepalive = keepalive
+        self._history: Deque[_Event] = deque(maxlen=history)
+        self.readers: Set[StreamReader] = set()
+
+    def publish(self, event: str, data: Any) -> int:
+        """
+        Keep an event for replay and queue it for every reader.
+
+        data is encoded later and must not be changed afterwards.
+        """
+        self.last_id += 1
+        entry = _Event(self.last_id, event, data)
+        self._history.append(entry)
+        if self.readers:
+            frame = entry.frame
+            for reader in self.readers:
+                reader.push(event, frame)
+        return self.last_id
+
+    def replay(self, since: int) -> Optional[List[_Event]]:
+        """Events after since, or None if some of them are no longer kept"""
+        if since > self.last_id:
+            return None
+        if since == self.last_id:
+            return []
+        if not self._history or self._history[0].event_id > since + 1:
+            return None
+        return list(islice(self._history, since + 1 - self._history[0].event_id, None))
+
+    def close(self):
+        """End every reader's stream (on shutdown)"""
+        for reader in self.readers:
+            reader.close()
+
+    async def follow(self, topics: FrozenSet[str], since: Optional[int],
+                     snapshot: Callable[[], dict]) -> AsyncIterator[bytes]:
+        """
+        Frames for one reader: replay or snapshot, then live events until it disconnects.
+
+        Args:
+            topics: Event names to deliver
+            since: Last event ID the reader has seen, or None for a new reader
+            snapshot: Builds the current state, sent as a "snapshot" event
+                when the reader cannot be brought up to date by replay
+        """
+        reader = StreamReader(topics, self.reader_buffer)
+        # Register and catch up without yielding in between, so every
+        # event is either in the catch-up frames or queued for the reader
+        self.readers.add(reader)
+        replayed = self.replay(since) if since is not None else None
+        if replayed is None:
+            # The snapshot covers everything up to the current ID
+            initial = [sse_frame(self.last_id, "snapshot", snapshot())]
+        else:
+            initial = [entry.frame for entry in replayed if entry.event in topics]
+        try:
+            yield b"retry: 1000\n\n"
+            for frame in initial:
+                yield frame
+            while not reader.closed:
+                while reader.frames:
+                    yield reader.frames.popleft()
+                if reader.overflowed:
+                    break
+                if not reader.frames and not await reader.wait(self.keepalive):
+                    yield b": keepalive\n\n"
+        finally:
+            self.readers.discard(reader)
+
+
+def parse_topics(value: Optional[str]) -> FrozenSet[str]:
+    """
+    Topic filter from a comma-separated ?topics= value (None means all).
+
+    Raises:
+        ValueError: If a topic is unknown
+    """
+    if not value:
+        return TOPICS
+    topics = frozenset(topic.strip() for topic in value.split(",") if topic.strip())
+    unknown = topics - TOPICS
+    if unknown:
+        raise ValueError(f"Unknown topics: {', '.join(sorted(unknown))}")
+    return topics
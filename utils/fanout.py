@@ -0,0 +1,86 @@
+"""
+Concurrent, bounded message fan-out for League Manager broadcasts
+"""
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Union
+
+from utils.codec import body_of
+from utils.transport import Transport
+
+
+class FanOutSummary:
+    """Delivery report for one broadcast"""
+
+    def __init__(self, message_type: str):
+        self.message_type = message_type
+        self.delivered: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+        self.elapsed = 0.0
+
+    @property
+    def max_latency(self) -> float:
+        return max(self.delivered.values(), default=0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "message_type": self.message_type,
+            "delivered": len(self.delivered),
+            "failed": len(self.failed),
+            "failed_recipients": dict(self.failed),
+            "max_latency": self.max_latency,
+            "elapsed": self.elapsed
+        }
+
+
+async def fan_out(transport: Transport, recipients: Dict[str, str],
+                  payload: Union[Dict[str, Any], List[Dict[str, Any]], None],
+                  max_concurrency: int = 64, timeout: float = 5.0,
+                  message_type: Optional[str] = None,
+                  payloads: Optional[Dict[str, Any]] = None) -> FanOutSummary:
+    """
+    Send the same payload (or each recipient's own) to every recipient at once.
+
+    At most max_concurrency requests are in flight at a time and every
+    recipient gets its own timeout, so one dead agent costs at most
+    `timeout` seconds and never delays delivery to the others.
+
+    Args:
+        transport: Pooled transport used for the POSTs
+        recipients: Mapping of recipient ID to endpoint URL
+        payload: JSON-RPC message or batch array sent to every recipient;
+            pass it Encoded to serialize it once for all recipients
+        max_concurrency: Maximum number of requests in flight
+        timeout: Per-recipient timeout in seconds
+        message_type: Label for the summary (defaults to params.message_type)
+        payloads: Per-recipient payloads used instead of payload for the
+            recipients they name
+
+    Returns:
+        FanOutSummary with per-recipient latency and failures
+    """
+    if payloads is None:
+        payloads = {}
+    if message_type is None:
+        body = body_of(payload if payload is not None else next(iter(payloads.values()), []))
+        messages = body if isinstance(body, list) else [body]
+        message_type = "+".join(message.get("params", {}).get("message_type", "") for message in messages)
+    summary = FanOutSummary(message_type)
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def deliver(recipient_id: str, url: str):
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(transport.post(url, payloads.get(recipient_id, payload), timeout=timeout),
+                                       timeout)
+                summary.delivered[recipient_id] = time.perf_counter() - start
+            except asyncio.TimeoutError:
+                summary.failed[recipient_id] = f"timeout after {timeout}s"
+            except Exception as e:
+                summary.failed[recipient_id] = str(e) or type(e).__name__
+
+    start = time.perf_counter()
+    await asyncio.gather(*(deliver(recipient_id, url) for recipient_id, url in recipients.items()))
+    summary.elapsed = time.perf_counter() - start
+    return summary
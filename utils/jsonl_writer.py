@@ -0,0 +1,271 @@
+"""
+Buffered background JSONL writer shared by League Manager, Referee and Player logs
+"""
+import atexit
+import gzip
+import os
+import queue
+import random
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from utils.codec import Encoded, encode_log_entry
+
+
+# fsync policies
+FSYNC_NEVER = "never"          # Leave flushing to disk to the OS
+FSYNC_BATCH = "batch"          # fsync after every batch written
+FSYNC_INTERVAL = "interval"    # fsync at most once per fsync_interval seconds
+
+_STOP = object()
+# Suffix of a compressed segment while it is being written
+_PARTIAL = ".partial"
+
+
+def message_type_of(message: Dict[str, Any]) -> Optional[str]:
+    """Extract the league.v2 message_type from a plain, Encoded or JSON-RPC wrapped message"""
+    if isinstance(message, Encoded):
+        message = message.message
+    if not isinstance(message, dict):
+        return None
+    for key in ("params", "result", "body"):
+        inner = message.get(key)
+        if isinstance(inner, (dict, Encoded)):
+            return message_type_of(inner)
+    return message.get("message_type")
+
+
+class JsonlWriter:
+    """
+    Append-only JSONL log written from a dedicated thread.
+
+    write() only puts the entry on a queue, so the cost on the request
+    path is a few microseconds. The writer thread drains the queue in
+    batches, serializes them (reusing the bytes of Encoded messages) and
+    appends them with a single write call, applies
+    the fsync policy and rotates the file by size and/or age. Rotated
+    segments are gzip-compressed; a segment whose compression was
+    interrupted (e.g. the process was killed) is compressed again at the
+    next rotation.
+
+    Entries must not be mutated after they are handed to write().
+    """
+
+    def __init__(self, path: str, batch_size: int = 512, flush_interval: float = 0.2,
+                 fsync: str = FSYNC_NEVER, fsync_interval: float = 1.0,
+                 max_bytes: Optional[int] = 50 * 1024 * 1024, rotate_interval: Optional[float] = None,
+                 compress: bool = True, backup_count: Optional[int] = 10,
+                 sample_rates: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            path: JSONL file to append to
+            batch_size: Maximum entries written per batch
+            flush_interval: Maximum seconds an entry waits before being written
+            fsync: One of FSYNC_NEVER, FSYNC_BATCH, FSYNC_INTERVAL
+            fsync_interval: Seconds between fsyncs for FSYNC_INTERVAL
+            max_bytes: Rotate once the file reaches this size (None disables)
+            rotate_interval: Rotate once the file is this many seconds old (None disables)
+            compress: gzip rotated segments
+            backup_count: Rotated segments to keep (None keeps all)
+            sample_rates: Fraction of entries to keep per message_type (default 1.0)
+        """
+        if fsync not in (FSYNC_NEVER, FSYNC_BATCH, FSYNC_INTERVAL):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.backup_count = backup_count
+        self.sample_rates = dict(sample_rates or {})
+
+        self.written = 0
+        self.sampled_out = 0
+        self.failed = 0
+
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._file = None
+        self._opened_at = 0.0
+        self._last_fsync = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"jsonl-writer:{self.path}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, entry: Dict[str, Any], message_type: Optional[str] = None):
+        """Queue an entry for writing (subject to per-message-type sampling)"""
+        if self.sample_rates and message_type is not None:
+            rate = self.sample_rates.get(message_type, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                self.sampled_out += 1
+                return
+        self._queue.put(entry)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything queued so far has been written"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Write pending entries and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._opened_at = time.time()
+
+    def _run(self):
+        self._open()
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                try:
+                    self._maybe_fsync()
+                except Exception as e:
+                    self._report("fsync failed", e)
+                continue
+
+            lines, waiters = [], []
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    try:
+                        lines.append(encode_log_entry(item))
+                    except Exception as e:
+                        # E.g. an entry mutated while it was encoded; drop it, keep the thread alive
+                        self.failed += 1
+                        self._report("dropped an entry that could not be encoded", e)
+                if stop or len(lines) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if lines:
+                try:
+                    self._write_batch(lines)
+                except Exception as e:
+                    self.failed += len(lines)
+                    self._report(f"failed to write {len(lines)} entries", e)
+                    self._recover()
+                else:
+                    try:
+                        if self._should_rotate():
+                            self._rotate()
+                    except Exception as e:
+                        self._report("failed to rotate", e)
+                        self._recover()
+            for waiter in waiters:
+                waiter.set()
+
+        try:
+            self._sync()
+            self._file.close()
+        except Exception as e:
+            self._report("failed to close", e)
+
+    def _report(self, what: str, error: Exception):
+        # Not through logging: its handlers may be what is failing
+        print(f"JsonlWriter({self.path}): {what}: {error!r}", file=sys.stderr)
+
+    def _recover(self):
+        """Reopen the file if a failed write or rotation left it closed"""
+        if self._file is None or self._file.closed:
+            try:
+                self._open()
+            except Exception as e:
+                self._report("failed to reopen", e)
+
+    def _write_batch(self, lines):
+        self._file.write(b"\n".join(lines) + b"\n")
+        self._file.flush()
+        self.written += len(lines)
+        if self.fsync == FSYNC_BATCH:
+            self._sync()
+        else:
+            self._maybe_fsync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _maybe_fsync(self):
+        if self.fsync == FSYNC_INTERVAL and time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._sync()
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes is not None and self._file.tell() >= self.max_bytes:
+            return True
+        if self.rotate_interval is not None and time.time() - self._opened_at >= self.rotate_interval:
+            return True
+        return False
+
+    def _rotate(self):
+        if self.fsync != FSYNC_NEVER:
+            self._sync()
+        self._file.close()
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        segment = f"{self.path}.{stamp}"
+        suffix = 1
+        while os.path.exists(segment) or os.path.exists(segment + ".gz"):
+            segment = f"{self.path}.{stamp}.{suffix}"
+            suffix += 1
+        os.replace(self.path, segment)
+        self._open()
+
+        if self.compress:
+            self._compress_segments()
+        self._prune_segments()
+
+    def _segments(self) -> List[str]:
+        """Paths of this log's rotated segments (compressed or not)"""
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.basename(self.path) + "."
+        return [os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix)]
+
+    def _compress_segments(self):
+        # The .gz only gets its final name once complete, and the segment is removed after that,
+        # so a crash at any point leaves the raw segment to compress again here
+        segments = self._segments()
+        for segment in segments:
+            if segment.endswith(_PARTIAL):
+                os.remove(segment)
+        for segment in segments:
+            if segment.endswith(".gz") or segment.endswith(_PARTIAL):
+                continue
+            partial = segment + ".gz" + _PARTIAL
+            with open(segment, "rb") as source, gzip.open(partial, "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(partial, segment + ".gz")
+            os.remove(segment)
+
+    def _prune_segments(self):
+        if self.backup_count is None:
+            return
+        segments = sorted(self._segments(), key=os.path.getmtime)
+        for segment in segments[:max(0, len(segments) - self.backup_count)]:
+            os.remove(segment)
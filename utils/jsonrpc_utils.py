@@ -1,7 +1,7 @@
 """
 JSON-RPC 2.0 message wrapper utilities
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 
 
 # Message type to JSON-RPC method mapping
@@ -33,6 +33,10 @@ MESSAGE_TYPE_TO_METHOD = {
     "LEAGUE_STANDINGS_UPDATE": "update_standings",       # League → All: current standings
     "LEAGUE_COMPLETED": "notify_league_completed",       # League → All: tournament finished
 
+    # Broadcast subscriptions
+    "LEAGUE_SUBSCRIBE": "subscribe",                     # Agent → League: change subscriptions
+    "LEAGUE_SUBSCRIBE_RESPONSE": "subscribe",            # League acknowledgment
+
     # Queries and acknowledgments
     "LEAGUE_QUERY": "query_league",                      # Query league information
     "LEAGUE_QUERY_RESPONSE": "query_league",             # Query response
@@ -63,6 +67,29 @@ def wrap_request(params: Dict[str, Any], request_id: Optional[int] = 1) -> Dict[
     }
 
 
+def wrap_notification(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wrap a message as a JSON-RPC 2.0 notification (a request without an id).
+
+    Receivers process notifications but never send a response for them,
+    which suits fire-and-forget traffic such as standings broadcasts.
+
+    Args:
+        params: The message parameters (protocol, message_type, sender, etc.)
+
+    Returns:
+        JSON-RPC 2.0 formatted notification
+    """
+    message_type = params.get("message_type", "")
+    method = MESSAGE_TYPE_TO_METHOD.get(message_type, "unknown")
+
+    return {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params
+    }
+
+
 def wrap_response(result: Dict[str, Any], request_id: Optional[int] = 1,
                   error: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
@@ -121,3 +148,41 @@ def get_request_id(jsonrpc_message: Dict[str, Any]) -> Optional[int]:
 def is_jsonrpc_message(message: Dict[str, Any]) -> bool:
     """Check if a message is in JSON-RPC 2.0 format"""
     return message.get("jsonrpc") == "2.0"
+
+
+def is_notification(message: Dict[str, Any]) -> bool:
+    """Check if a message is a JSON-RPC 2.0 notification (request without id)"""
+    return is_jsonrpc_message(message) and "method" in message and "id" not in message
+
+
+def is_batch(body: Any) -> bool:
+    """Check if a request body is a JSON-RPC 2.0 batch array"""
+    return isinstance(body, list)
+
+
+def wrap_batch(messages: List[Dict[str, Any]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Combine several JSON-RPC 2.0 messages into one body.
+
+    A single message is sent as-is so older agents keep working; two or
+    more messages become a batch array.
+    """
+    if len(messages) == 1:
+        return messages[0]
+    return list(messages)
+
+
+def batch_response(responses: List[Optional[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Build the combined response for a batch request.
+
+    Notifications produce no entry; if every entry was a notification the
+    batch has no response at all and None is returned.
+    """
+    responses = [response for response in responses if response is not None]
+    return responses or None
+
+
+def invalid_request_response() -> Dict[str, Any]:
+    """JSON-RPC 2.0 error response for an empty batch or a body/batch entry that is not an object"""
+    return wrap_response(None, None, error={"code": -32600, "message": "Invalid Request"})
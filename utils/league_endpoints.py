@@ -1,165 +1,435 @@
 """
 FastAPI endpoint handlers for League Manager
 """
-from fastapi import HTTPException, Request
-from typing import Dict, Any
-from models.league_models import RefereeMetadata, PlayerMetadata, MatchStatus
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from itertools import islice
+from typing import Any, Callable, Dict, Optional
+from models.league_models import RefereeMetadata, PlayerMetadata
 from utils.league_utils import (
     create_referee_register_response, create_league_register_response,
-    create_league_query_response, create_error_response, create_base_message
+    create_league_query_response, create_error_response, create_message
+)
+from utils.codec import (
+    BINARY_MEDIA_TYPE, JSON_MEDIA_TYPE, SPLICE, Encoded, EncodedBatch, Spliced, accepts_binary, dumps,
+    encode_body, negotiated_response, read_body
+)
+from utils.league_manager_core import BULK_QUERIES, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SCHEDULE_FILTERS
+from utils.query_cache import etag_matches
+from utils.event_stream import parse_topics
+from utils.jsonrpc_utils import (
+    wrap_response, unwrap_message, get_request_id, is_jsonrpc_message,
+    is_notification, is_batch, batch_response, invalid_request_response
 )
-from utils.jsonrpc_utils import wrap_request, wrap_response, unwrap_message, get_request_id, is_jsonrpc_message
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+# NDJSON lines encoded per chunk of a streamed schedule
+STREAM_CHUNK_ROWS = 256
+
+
+def parse_schedule_query(filters: Optional[Dict[str, Any]], cursor: Optional[str] = None,
+                         limit: Optional[int] = None, max_limit: Optional[int] = MAX_PAGE_SIZE):
+    """
+    Validate schedule filters, cursor and page size.
+
+    Returns:
+        (filters, cursor, limit); limit falls back to DEFAULT_PAGE_SIZE
+        when max_limit is set and to None (no limit) otherwise
+
+    Raises:
+        ValueError: On unknown filters or values of the wrong type
+    """
+    filters = dict(filters or {})
+    unknown = set(filters) - set(SCHEDULE_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown schedule filters: {', '.join(sorted(unknown))}")
+    filters = {name: value for name, value in filters.items() if value is not None}
+    round_id = filters.get("round_id")
+    if round_id is not None and (not isinstance(round_id, int) or isinstance(round_id, bool)):
+        raise ValueError("round_id must be an integer")
+    for name in ("player_id", "status", "referee_id"):
+        if name in filters and not isinstance(filters[name], str):
+            raise ValueError(f"{name} must be a string")
+    if cursor is not None and not isinstance(cursor, str):
+        raise ValueError("cursor must be a match ID")
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE if max_limit is not None else None
+    elif not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        raise ValueError("limit must be a positive integer")
+    elif max_limit is not None:
+        limit = min(limit, max_limit)
+    return filters, cursor, limit
+
+
+def parse_target_players(value: Any) -> Optional[tuple]:
+    """
+    Players a bulk query is about: a list of player IDs, or "all" (None).
+
+    Raises:
+        ValueError: If value is neither
+    """
+    if value == "all":
+        return None
+    if not isinstance(value, list) or not all(isinstance(player_id, str) for player_id in value):
+        raise ValueError('target_player_ids must be a list of player IDs or "all"')
+    return tuple(value)
+
+
+def authorized_player(request: Request, league_manager, player_id: str):
+    """
+    Check the "Authorization: Bearer <token>" header of a GET request.
+
+    Raises:
+        HTTPException: 401 if the token is not the player's
+    """
+    scheme, _, auth_token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not league_manager.validate_auth(player_id, auth_token, "player"):
+        raise HTTPException(status_code=401, detail="Invalid auth token", headers={"WWW-Authenticate": "Bearer"})
+
 
 async def handle_mcp_request(request: Request, league_manager):
-    """Handle JSON-RPC 2.0 requests"""
-    try:
-        body = await request.json()
-        league_manager.log_message({"type": "incoming_request", "body": body})
-
-        # Unwrap JSON-RPC if needed
-        request_id = get_request_id(body) if is_jsonrpc_message(body) else 1
-        if is_jsonrpc_message(body):
-            body = unwrap_message(body)
-
-        conversation_id = body.get("conversation_id", str(uuid.uuid4()))
-        message_type = body.get("message_type")
-
-        if message_type == "REFEREE_REGISTER_REQUEST":
-            metadata_dict = body.get("referee_meta", body.get("metadata", {}))
-            metadata = RefereeMetadata(
-                display_name=metadata_dict.get("display_name", "Unknown Referee"),
-                version=metadata_dict.get("version"),
-                endpoint=metadata_dict.get("contact_endpoint", metadata_dict.get("endpoint"))
-            )
+    """Handle JSON-RPC 2.0 requests, notifications and batches"""
+    result = await handle_mcp_body(await read_body(request), league_manager)
+    if result is None:
+        # Notifications only - nothing to send back
+        return Response(status_code=204)
+    return negotiated_response(result, request)
+
+
+async def handle_mcp_body(body: Any, league_manager) -> Optional[Any]:
+    """
+    Handle a decoded /mcp body (single message or batch array).
+
+    Shared by the HTTP endpoint and the in-process transport.
+
+    Returns:
+        The JSON-RPC response(s), or None if only notifications were received
+    """
+    if is_batch(body):
+        league_manager.log_message({"type": "incoming_batch", "size": len(body)})
+        if not body:
+            return invalid_request_response()
+        responses = []
+        for message in body:
+            if not isinstance(message, dict):
+                # Not a request object: Invalid Request (id null) for this entry only
+                responses.append(invalid_request_response())
+                continue
+            try:
+                responses.append(await process_mcp_message(message, league_manager))
+            except Exception as e:
+                # One failing entry must not drop the rest of the batch
+                logger.error(f"Error handling batch entry: {e}", exc_info=True)
+                if not is_notification(message):
+                    error_response = create_error_response("INTERNAL_ERROR", str(e), str(uuid.uuid4()))
+                    league_manager.log_message({"type": "outgoing_response", "body": error_response})
+                    responses.append(wrap_response(error_response, get_request_id(message)))
+        result = batch_response(responses)
+        if result and any(isinstance(response, Encoded) for response in result):
+            # Cached query results are spliced in as bytes; keep them that way in the batch
+            result = EncodedBatch([response if isinstance(response, Encoded) else Encoded(response)
+                                   for response in result])
+    elif not isinstance(body, dict):
+        result = invalid_request_response()
+    else:
+        try:
+            result = await process_mcp_message(body, league_manager)
+        except Exception as e:
+            logger.error(f"Error handling request: {e}", exc_info=True)
+            error_response = create_error_response("INTERNAL_ERROR", str(e), str(uuid.uuid4()))
+            league_manager.log_message({"type": "outgoing_response", "body": error_response})
+            raise HTTPException(status_code=500, detail=str(e))
+    return result
+
+
+async def process_mcp_message(body: Dict[str, Any], league_manager) -> Optional[Dict[str, Any]]:
+    """
+    Handle a single JSON-RPC 2.0 message.
+
+    Returns:
+        The JSON-RPC response, or None if the message was a notification
+    """
+    league_manager.log_message({"type": "incoming_request", "body": body})
+
+    # Unwrap JSON-RPC if needed
+    notification = is_notification(body)
+    request_id = get_request_id(body) if is_jsonrpc_message(body) else 1
+    if is_jsonrpc_message(body):
+        body = unwrap_message(body)
+
+    response = await dispatch_message(body, league_manager)
+    if notification:
+        return None
+    league_manager.log_message({"type": "outgoing_response", "body": response})
+    if isinstance(response, Spliced):
+        return response.map(lambda body: wrap_response(body, request_id))
+    return wrap_response(response, request_id)
+
+
+async def dispatch_message(body: Dict[str, Any], league_manager) -> Dict[str, Any]:
+    """Route an unwrapped league.v2 message and build its response"""
+    conversation_id = body.get("conversation_id", str(uuid.uuid4()))
+    message_type = body.get("message_type")
+
+    if message_type == "REFEREE_REGISTER_REQUEST":
+        metadata_dict = body.get("referee_meta", body.get("metadata", {}))
+        metadata = RefereeMetadata(
+            display_name=metadata_dict.get("display_name", "Unknown Referee"),
+            version=metadata_dict.get("version"),
+            endpoint=metadata_dict.get("contact_endpoint", metadata_dict.get("endpoint")),
+            max_concurrent_matches=metadata_dict.get("max_concurrent_matches", 1),
+            subscriptions=metadata_dict.get("subscriptions")
+        )
+        try:
             referee_id, auth_token = league_manager.register_referee(metadata)
-            response = create_referee_register_response(referee_id, auth_token, conversation_id)
-            league_manager.log_message({"type": "outgoing_response", "body": response})
-            return wrap_response(response, request_id)
-
-        elif message_type == "LEAGUE_REGISTER_REQUEST":
-            metadata_dict = body.get("player_meta", body.get("metadata", {}))
-            metadata = PlayerMetadata(
-                display_name=metadata_dict.get("display_name", "Unknown Player"),
-                agent_endpoint=metadata_dict.get("contact_endpoint", metadata_dict.get("agent_endpoint", "")),
-                strategy=metadata_dict.get("strategy")
-            )
+        except ValueError as e:
+            return create_error_response("INVALID_SUBSCRIPTION", str(e), conversation_id)
+        return create_referee_register_response(referee_id, auth_token, conversation_id)
+
+    elif message_type == "LEAGUE_REGISTER_REQUEST":
+        metadata_dict = body.get("player_meta", body.get("metadata", {}))
+        metadata = PlayerMetadata(
+            display_name=metadata_dict.get("display_name", "Unknown Player"),
+            agent_endpoint=metadata_dict.get("contact_endpoint", metadata_dict.get("agent_endpoint", "")),
+            strategy=metadata_dict.get("strategy"),
+            subscriptions=metadata_dict.get("subscriptions")
+        )
+        try:
             player_id, auth_token = league_manager.register_player(metadata)
-            response = create_league_register_response(player_id, auth_token, conversation_id)
-            league_manager.log_message({"type": "outgoing_response", "body": response})
-            return wrap_response(response, request_id)
-
-        elif message_type == "MATCH_RESULT_REPORT":
-            # Extract auth from sender field
-            sender = body.get("sender", "")
-            if sender.startswith("referee:"):
-                referee_id = sender.split(":")[1]
-            else:
-                referee_id = body.get("referee_id")
-
-            auth_token = body.get("auth_token")
-            if not league_manager.validate_auth(referee_id, auth_token, "referee"):
-                error_response = create_error_response("AUTH_FAILED", "Invalid auth token", conversation_id)
-                league_manager.log_message({"type": "outgoing_response", "body": error_response})
-                return wrap_response(error_response, request_id)
-
-            match_id = body.get("match_id")
-            result = body.get("result", {})
-            league_manager.update_match_result(match_id, result)
-
-            response = create_base_message("MATCH_RESULT_ACKNOWLEDGED", conversation_id)
-            response["match_id"] = match_id
-            league_manager.log_message({"type": "outgoing_response", "body": response})
-            return wrap_response(response, request_id)
-
-        elif message_type == "LEAGUE_QUERY":
-            player_id, auth_token = body.get("player_id"), body.get("auth_token")
-            if not league_manager.validate_auth(player_id, auth_token, "player"):
-                error_response = create_error_response("AUTH_FAILED", "Invalid auth token", conversation_id)
-                league_manager.log_message({"type": "outgoing_response", "body": error_response})
-                return wrap_response(error_response, request_id)
-            query_type = body.get("query_type")
-            if query_type == "GET_STANDINGS":
-                data = league_manager.get_standings()
-                response = create_league_query_response("GET_STANDINGS", data, conversation_id)
-            elif query_type == "GET_SCHEDULE":
-                data = league_manager.get_schedule_data()
-                response = create_league_query_response("GET_SCHEDULE", data, conversation_id)
-            elif query_type == "GET_NEXT_MATCH":
-                data = league_manager.get_next_match(player_id)
-                response = create_league_query_response("GET_NEXT_MATCH", data, conversation_id)
-            elif query_type == "GET_PLAYER_STATS":
-                target_player_id = body.get("target_player_id", player_id)
-                data = league_manager.get_player_stats(target_player_id)
-                response = create_league_query_response("GET_PLAYER_STATS", data, conversation_id)
-            else:
-                error_response = create_error_response("UNKNOWN_QUERY", f"Unknown query type: {query_type}", conversation_id)
-                league_manager.log_message({"type": "outgoing_response", "body": error_response})
-                return wrap_response(error_response, request_id)
-            league_manager.log_message({"type": "outgoing_response", "body": response})
-            return wrap_response(response, request_id)
+        except ValueError as e:
+            return create_error_response("INVALID_SUBSCRIPTION", str(e), conversation_id)
+        return create_league_register_response(player_id, auth_token, conversation_id)
+
+    elif message_type == "MATCH_RESULT_REPORT":
+        # Extract auth from sender field
+        sender = body.get("sender", "")
+        if sender.startswith("referee:"):
+            referee_id = sender.split(":")[1]
         else:
-            error_response = create_error_response("UNKNOWN_MESSAGE_TYPE", f"Unknown message type: {message_type}", conversation_id)
-            league_manager.log_message({"type": "outgoing_response", "body": error_response})
-            return wrap_response(error_response, request_id)
-    except Exception as e:
-        logger.error(f"Error handling request: {e}", exc_info=True)
-        error_response = create_error_response("INTERNAL_ERROR", str(e), str(uuid.uuid4()))
-        league_manager.log_message({"type": "outgoing_response", "body": error_response})
-        wrapped_error = wrap_response(error_response, 1)
-        raise HTTPException(status_code=500, detail=str(e))
+            referee_id = body.get("referee_id")
 
+        auth_token = body.get("auth_token")
+        if not league_manager.validate_auth(referee_id, auth_token, "referee"):
+            return create_error_response("AUTH_FAILED", "Invalid auth token", conversation_id)
 
-async def start_league(rounds: int, league_manager):
-    """Create schedule and start the league"""
+        match_id = body.get("match_id")
+        result = body.get("result", {})
+        try:
+            await league_manager.update_match_result(match_id, result)
+        except ValueError as e:
+            logger.warning(f"Rejected result from {referee_id}: {e}")
+            return create_error_response("INVALID_RESULT", str(e), conversation_id)
+
+        return create_message("MATCH_RESULT_ACKNOWLEDGED", conversation_id, match_id=match_id)
+
+    elif message_type == "LEAGUE_SUBSCRIBE":
+        # Players and referees may both change their subscriptions
+        agent_id, entity_type = body.get("player_id"), "player"
+        if agent_id is None:
+            agent_id, entity_type = body.get("referee_id"), "referee"
+        if not league_manager.validate_auth(agent_id, body.get("auth_token"), entity_type):
+            return create_error_response("AUTH_FAILED", "Invalid auth token", conversation_id)
+        try:
+            subscription = league_manager.subscribe(agent_id, body.get("subscriptions") or {})
+        except ValueError as e:
+            return create_error_response("INVALID_SUBSCRIPTION", str(e), conversation_id)
+        # Deliver what the new subscription covers without waiting for the next result
+        league_manager.schedule_standings_flush()
+        return create_message("LEAGUE_SUBSCRIBE_RESPONSE", conversation_id, status="ACCEPTED",
+                              subscriptions=subscription.to_spec())
+
+    elif message_type == "LEAGUE_QUERY":
+        # Referees may query too (e.g. bulk stats for their tooling)
+        player_id = body.get("player_id")
+        agent_id, entity_type = player_id, "player"
+        if agent_id is None:
+            agent_id, entity_type = body.get("referee_id"), "referee"
+        if not league_manager.validate_auth(agent_id, body.get("auth_token"), entity_type):
+            return create_error_response("AUTH_FAILED", "Invalid auth token", conversation_id)
+        query_type = body.get("query_type")
+        page = player_ids = None
+        if query_type in BULK_QUERIES:
+            # One auth check and one pass over the players for the whole list
+            try:
+                player_ids = parse_target_players(body.get("target_player_ids", "all"))
+            except ValueError as e:
+                return create_error_response("INVALID_QUERY", str(e), conversation_id)
+        if query_type == "GET_SCHEDULE" and any(field in body for field in ("filters", "cursor", "limit")):
+            # One filtered page instead of the whole schedule
+            try:
+                page = parse_schedule_query(body.get("filters"), body.get("cursor"), body.get("limit"))
+            except ValueError as e:
+                return create_error_response("INVALID_QUERY", str(e), conversation_id)
+        try:
+            cached = league_manager.cached_query(query_type, body.get("target_player_id", player_id), page,
+                                                 player_ids)
+        except ValueError as e:
+            return create_error_response("INVALID_QUERY", str(e), conversation_id)
+        if cached is None:
+            return create_error_response("UNKNOWN_QUERY", f"Unknown query type: {query_type}", conversation_id)
+        # The result's cached bytes are spliced into the response instead of re-encoding it
+        template = create_league_query_response(query_type, SPLICE, conversation_id)
+        return Spliced(template, cached.encoded, dict(template, data=cached.data))
+    else:
+        return create_error_response("UNKNOWN_MESSAGE_TYPE", f"Unknown message type: {message_type}", conversation_id)
+
+
+def handle_query_request(request: Request, league_manager, query_type: str, player_id: str,
+                         target_player_id: Optional[str] = None,
+                         target_player_ids: Optional[str] = None) -> Response:
+    """
+    Answer a LEAGUE_QUERY sent as a plain HTTP GET, with conditional requests.
+
+    The body is just the query's data, from the cached encoding. Its ETag
+    changes with the league state version, so a client repeating the
+    request with If-None-Match gets 304 Not Modified until something
+    changes.
+
+    Args:
+        request: The GET request; the player's auth token goes in an
+            "Authorization: Bearer <token>" header
+        league_manager: LeagueManager instance
+        query_type: GET_STANDINGS, GET_SCHEDULE, GET_NEXT_MATCH, GET_PLAYER_STATS,
+            GET_PLAYER_STATS_BULK or GET_NEXT_MATCH_BULK
+        player_id: The querying player
+        target_player_id: Player whose stats GET_PLAYER_STATS returns (default: player_id)
+        target_player_ids: Comma-separated players for a bulk query (default: all)
+
+    Raises:
+        HTTPException: 401 for bad credentials, 404 for unknown query types
+    """
+    authorized_player(request, league_manager, player_id)
+    player_ids = None
+    if target_player_ids and target_player_ids != "all":
+        player_ids = tuple(target for target in target_player_ids.split(",") if target)
+    cached = league_manager.cached_query(query_type, target_player_id or player_id, player_ids=player_ids)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"Unknown query type: {query_type}")
+
+    binary = accepts_binary(request.headers.get("accept"))
+    # Each representation gets its own tag
+    etag = cached.etag[:-1] + '-b"' if binary else cached.etag
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept, Authorization"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    media_type = BINARY_MEDIA_TYPE if binary else JSON_MEDIA_TYPE
+    return Response(content=encode_body(cached.encoded, binary=binary), media_type=media_type, headers=headers)
+
+
+def channel_peer_verifier(league_manager) -> Callable[[str, Any], bool]:
+    """
+    verify() for serve_channel on the League Manager's /ws endpoint.
+
+    A body proves that the peer is the agent at the endpoint it announced
+    if it carries the auth token of the player or referee that registered
+    exactly that endpoint first; its ID is taken from the params or, when
+    they have none, from the envelope's sender. Registrations prove
+    nothing, since anyone can claim any endpoint in one.
+    """
+    def proves(endpoint: str, params: Dict[str, Any]) -> bool:
+        owner = league_manager.endpoint_owners.get(endpoint)
+        if owner is None:
+            return False
+        agent_id = params.get("player_id") or params.get("referee_id")
+        sender = params.get("sender")
+        if agent_id is None and isinstance(sender, str) and ":" in sender:
+            agent_id = sender.split(":", 1)[1]
+        if agent_id != owner:
+            return False
+        entity_type = "player" if owner in league_manager.players else "referee"
+        return bool(league_manager.validate_auth(owner, params.get("auth_token"), entity_type))
+
+    def verify(endpoint: str, body: Any) -> bool:
+        for message in body if isinstance(body, list) else (body,):
+            params = message.get("params") if isinstance(message, dict) else None
+            if isinstance(params, dict) and proves(endpoint, params):
+                return True
+        return False
+
+    return verify
+
+
+def handle_schedule_stream(request: Request, league_manager, player_id: str, filters: Dict[str, Any],
+                           cursor: Optional[str] = None, limit: Optional[int] = None) -> StreamingResponse:
+    """
+    Stream the filtered schedule as NDJSON, one match per line.
+
+    Rows are produced while the response is written, so neither side
+    holds the whole schedule; an interrupted download resumes with
+    cursor set to the last match_id received.
+
+    Args:
+        request: The GET request, authorized like handle_query_request
+        league_manager: LeagueManager instance
+        player_id: The querying player
+        filters: Schedule filters (round_id, player_id, status, referee_id)
+        cursor: Start after this match ID
+        limit: Stop after this many matches (default: all)
+
+    Raises:
+        HTTPException: 401 for bad credentials, 400 for invalid filters
+    """
+    authorized_player(request, league_manager, player_id)
     try:
-        league_manager.create_schedule(rounds=rounds)
-        import httpx
-        import asyncio
-        assigned_count = 0
-        for match in league_manager.schedule:
-            referee = league_manager.referees.get(match.referee_id)
-            player1 = league_manager.players.get(match.player1_id)
-            player2 = league_manager.players.get(match.player2_id)
-
-            if not referee or not player1 or not player2:
-                continue
+        filters, cursor, limit = parse_schedule_query(filters, cursor, limit, max_limit=None)
+        # Validate status and cursor before the response starts
+        rows = league_manager.iter_schedule(cursor=cursor, **filters)
+        first = next(rows, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-            assignment_message = create_base_message("MATCH_ASSIGNMENT", str(uuid.uuid4()))
-            assignment_message.update({
-                "match_id": match.match_id,
-                "league_id": "league_2025_even_odd",
-                "round_id": match.round_id,
-                "player1_id": match.player1_id,
-                "player2_id": match.player2_id,
-                "player1_endpoint": player1.metadata.agent_endpoint,
-                "player2_endpoint": player2.metadata.agent_endpoint
-            })
+    async def lines():
+        if first is None:
+            return
+        remaining = limit
+        chunk = [first]
+        for entry in rows if remaining is None else islice(rows, remaining - 1):
+            if len(chunk) == STREAM_CHUNK_ROWS:
+                yield b"\n".join(dumps(row) for row in chunk) + b"\n"
+                chunk = []
+            chunk.append(entry)
+        yield b"\n".join(dumps(row) for row in chunk) + b"\n"
 
-            # Wrap in JSON-RPC 2.0 format
-            jsonrpc_message = wrap_request(assignment_message, request_id=assigned_count + 1)
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
 
-            ref_port = 8001 if assigned_count % 2 == 0 else 8002
-            referee_url = f"http://localhost:{ref_port}/mcp"
 
-            try:
-                async with httpx.AsyncClient() as client:
-                    await client.post(referee_url, json=jsonrpc_message, timeout=10)
-                match.status = MatchStatus.IN_PROGRESS
-                assigned_count += 1
-                # Add delay between assignments to respect max_concurrent_matches
-                await asyncio.sleep(0.5)
-            except Exception as e:
-                logger.error(f"Failed to assign match {match.match_id} to referee: {e}")
+def handle_events_request(request: Request, league_manager, since: Optional[int] = None,
+                          topics: Optional[str] = None):
+    """
+    Stream league events to a read-only follower as Server-Sent Events.
+
+    Args:
+        request: The GET /events request; its Last-Event-ID header resumes
+            an interrupted stream
+        league_manager: LeagueManager instance
+        since: Resume after this event ID (overrides Last-Event-ID)
+        topics: Comma-separated event names to receive (default: all)
+    """
+    try:
+        selected = parse_topics(topics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if since is None:
+        last_event_id = request.headers.get("last-event-id", "")
+        since = int(last_event_id) if last_event_id.isdigit() else None
+    frames = league_manager.events.follow(selected, since, league_manager.stream_snapshot)
+    return StreamingResponse(frames, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
+
+async def start_league(rounds: int, league_manager):
+    """Create schedule and release its first conflict-free wave to the dispatcher"""
+    try:
+        league_manager.create_schedule(rounds=rounds)
+        queued = league_manager.release_next_wave()
         return {
             "status": "success",
-            "message": f"League started, {assigned_count} matches assigned",
-            "matches": len(league_manager.matches)
+            "message": f"League started, {queued} matches of wave 1 queued for dispatch",
+            "matches": league_manager.lazy_schedule.total_matches,
+            "waves": league_manager.lazy_schedule.total_waves
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
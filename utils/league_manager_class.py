@@ -1,33 +1,78 @@
 """
 LeagueManager class implementation
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 from models.league_models import MatchStatus, RefereeMetadata, PlayerMetadata, Referee, Player, Match
-from utils.league_manager_core import LeagueManagerCore
-from utils.jsonrpc_utils import wrap_request
+from utils.league_manager_core import BULK_QUERIES, LeagueManagerCore
+from utils.jsonrpc_utils import wrap_notification, wrap_batch
+from utils.codec import Encoded
+from utils.league_utils import create_message
+from utils.fanout import FanOutSummary, fan_out
+from utils.transport import Transport, get_default_transport
+from utils.jsonl_writer import JsonlWriter, message_type_of
+from utils.standings_index import StandingsIndex
+from utils.standings_feed import StandingsFeed
+from utils.event_stream import EventStream
+from utils.query_cache import CachedResult, QueryCache
+from utils.subscriptions import PLAYER_DEFAULT, REFEREE_DEFAULT, Subscription, SubscriptionRegistry
+from utils.schedule_index import ScheduleIndex
+from utils.match_dispatcher import MatchDispatcher
+from utils.scheduling import LazySchedule
+from utils.match_table import MatchTable
+from utils.league_store import LeagueStore
+import asyncio
 import uuid
 import secrets
-import json
-import itertools
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class LeagueManager(LeagueManagerCore):
-    def __init__(self):
+    def __init__(self, transport: Optional[Transport] = None, store: Optional[LeagueStore] = None):
         self.referees: Dict[str, Referee] = {}
         self.players: Dict[str, Player] = {}
+        # Agent endpoint -> ID of the player or referee that registered it first
+        self.endpoint_owners: Dict[str, str] = {}
+        # Live (not yet completed) matches; every match is a row of match_table
         self.matches: Dict[str, Match] = {}
-        self.schedule: List[Match] = []
+        self.match_table = MatchTable()
+        self.standings_index = StandingsIndex()
+        self.schedule_index = ScheduleIndex()
+        self.lazy_schedule: Optional[LazySchedule] = None
+        self.schedule_referee_ids: List[str] = []
         self.current_round = 0
         self.total_rounds = 0
         self.league_started = False
         self.league_completed = False
 
+        self.transport = transport or get_default_transport()
+        self.broadcast_concurrency = 64
+        self.broadcast_timeout = 5.0
+        self.dispatcher = MatchDispatcher(self)
+        # Standings broadcasts: versioned deltas, coalesced over a time and count window
+        self.standings_feed = StandingsFeed()
+        self.standings_interval = 0.1
+        self.standings_batch_size = 32
+        self._standings_flush: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks = set()
+        # Which broadcasts each agent receives
+        self.subscriptions = SubscriptionRegistry()
+        # Server-Sent Events feed for dashboards and other read-only followers (GET /events)
+        self.events = EventStream()
+        # Bumped on every state change; LEAGUE_QUERY results are cached per version
+        self.state_version = 0
+        self.query_cache = QueryCache()
+        # Optional durable event log + snapshots (see restore())
+        self.store = store
+        self._restoring = False
+        # Set when resume() found no referee to dispatch to; retried on the next registration
+        self.resume_pending = False
+
         import os
         os.makedirs("jsonl", exist_ok=True)
         self.log_file = "jsonl/league_manager.jsonl"
+        self.log_writer = JsonlWriter(self.log_file)
 
     def generate_id(self, prefix: str) -> str:
         return f"{prefix}_{uuid.uuid4().hex[:8]}"
@@ -37,9 +82,7 @@ class LeagueManager(LeagueManagerCore):
 
     def log_message(self, message: Dict[str, Any]):
         try:
-            with open(self.log_file, 'a') as f:
-                json.dump(message, f)
-                f.write('\n')
+            self.log_writer.write(message, message_type_of(message))
         except Exception as e:
             logger.error(f"Failed to log message: {e}")
 
@@ -55,79 +98,514 @@ class LeagueManager(LeagueManagerCore):
     def register_referee(self, metadata: RefereeMetadata) -> tuple[str, str]:
         referee_id = self.generate_id("ref")
         auth_token = self.generate_token()
-        referee = Referee(referee_id, auth_token, metadata)
-        self.referees[referee_id] = referee
+        self._add_referee(referee_id, auth_token, metadata)
+        self.record_event("referee_registered", {"referee_id": referee_id, "auth_token": auth_token,
+                                                 "metadata": metadata.model_dump()})
         logger.info(f"Registered referee: {referee_id} - {metadata.display_name}")
+        if self.resume_pending:
+            self.resume()
         return referee_id, auth_token
 
+    def _add_referee(self, referee_id: str, auth_token: str, metadata: RefereeMetadata):
+        subscription = Subscription.from_spec(metadata.subscriptions, REFEREE_DEFAULT)
+        self.referees[referee_id] = Referee(referee_id, auth_token, metadata)
+        self._claim_endpoint(metadata.endpoint, referee_id)
+        self.subscriptions.set(referee_id, subscription)
+
     def register_player(self, metadata: PlayerMetadata) -> tuple[str, str]:
         player_id = self.generate_id("player")
         auth_token = self.generate_token()
-        player = Player(player_id, auth_token, metadata)
-        self.players[player_id] = player
+        self._add_player(player_id, auth_token, metadata)
+        self.record_event("player_registered", {"player_id": player_id, "auth_token": auth_token,
+                                                "metadata": metadata.model_dump()})
         logger.info(f"Registered player: {player_id} - {metadata.display_name}")
         return player_id, auth_token
 
+    def _add_player(self, player_id: str, auth_token: str, metadata: PlayerMetadata):
+        subscription = Subscription.from_spec(metadata.subscriptions, PLAYER_DEFAULT)
+        self.players[player_id] = Player(player_id, auth_token, metadata)
+        self._claim_endpoint(metadata.agent_endpoint, player_id)
+        self.subscriptions.set(player_id, subscription)
+        self.standings_index.add(player_id)
+        self.standings_feed.mark((player_id,))
+
+    def _claim_endpoint(self, endpoint: Optional[str], agent_id: str):
+        # Later registrations of the same endpoint (e.g. someone else claiming it) do not take it over
+        if endpoint:
+            self.endpoint_owners.setdefault(endpoint, agent_id)
+
+    def subscribe(self, agent_id: str, spec: Dict[str, Any]) -> Subscription:
+        """
+        Change a registered agent's subscriptions; topics left out keep their current setting.
+
+        The agent's next standings update carries everything it subscribes
+        to (the full table, top-K rows or its own row) rather than a delta.
+
+        Raises:
+            KeyError: If no agent has this ID
+            ValueError: If the subscriptions object is malformed
+        """
+        agent = self.players.get(agent_id) or self.referees.get(agent_id)
+        if agent is None:
+            raise KeyError(agent_id)
+        subscription = Subscription.from_spec(spec, self.subscriptions.get(agent_id))
+        self._set_subscription(agent, subscription)
+        self.record_event("subscription_changed", {"agent_id": agent_id, "subscriptions": subscription.to_spec()})
+        logger.info(f"{agent_id} subscribed to {subscription.to_spec()}")
+        return subscription
+
+    def _set_subscription(self, agent: Union[Player, Referee], subscription: Subscription):
+        agent_id = agent.player_id if isinstance(agent, Player) else agent.referee_id
+        # Kept in the metadata so snapshots carry it
+        agent.metadata.subscriptions = subscription.to_spec()
+        self.subscriptions.set(agent_id, subscription)
+        self.standings_feed.delivered.pop(agent_id, None)
+
     def create_schedule(self, rounds: int = 1):
         if len(self.players) < 2:
             raise ValueError("Need at least 2 players to create schedule")
         if len(self.referees) == 0:
             raise ValueError("Need at least 1 referee to create schedule")
 
-        player_ids = list(self.players.keys())
-        referee_ids = list(self.referees.keys())
-
-        self.schedule = []
-        for round_num in range(rounds):
-            round_id = round_num + 1
-            pairings = list(itertools.combinations(player_ids, 2))
+        self._create_schedule(rounds, list(self.players.keys()), list(self.referees.keys()), MatchTable())
+        self.record_event("schedule_created", {"rounds": rounds, "player_ids": self.lazy_schedule.to_state()["player_ids"],
+                                               "referee_ids": self.schedule_referee_ids,
+                                               "id_prefix": self.match_table.id_prefix})
+        logger.info(f"Created schedule with {self.lazy_schedule.total_matches} matches in "
+                    f"{self.lazy_schedule.total_waves} waves across {rounds} rounds")
 
-            for i, (player1_id, player2_id) in enumerate(pairings):
-                match_id = self.generate_id("match")
-                referee_id = referee_ids[i % len(referee_ids)]
-                match = Match(match_id, round_id, player1_id, player2_id, referee_id)
-                self.matches[match_id] = match
-                self.schedule.append(match)
+    def _create_schedule(self, rounds: int, player_ids: List[str], referee_ids: List[str], match_table: MatchTable):
+        # Matches are created wave by wave as the league progresses
+        self.lazy_schedule = LazySchedule(player_ids, rounds)
+        self.schedule_referee_ids = referee_ids
+        self.matches = {}
+        self.match_table = match_table
+        self.schedule_index = ScheduleIndex(self.lazy_schedule.matches_per_round, rounds)
 
         self.total_rounds = rounds
         self.current_round = 1
         self.league_started = True
-        logger.info(f"Created schedule with {len(self.schedule)} matches across {rounds} rounds")
-
-    def broadcast_to_players(self, message: Dict[str, Any]):
-        import requests
-        # Wrap message in JSON-RPC 2.0 format
-        jsonrpc_message = wrap_request(message, request_id=1)
-        for player_id, player in self.players.items():
-            try:
-                endpoint = player.metadata.agent_endpoint
-                response = requests.post(endpoint, json=jsonrpc_message, timeout=5)
-                logger.info(f"Broadcasted {message['message_type']} to {player_id}")
-            except Exception as e:
-                logger.error(f"Failed to broadcast to {player_id}: {e}")
-
-    def broadcast_to_referees(self, message: Dict[str, Any]):
-        import requests
-        # Wrap message in JSON-RPC 2.0 format
-        jsonrpc_message = wrap_request(message, request_id=1)
-        for referee_id, referee in self.referees.items():
-            try:
-                endpoint = referee.metadata.endpoint
-                if endpoint:
-                    response = requests.post(endpoint, json=jsonrpc_message, timeout=5)
-                    logger.info(f"Broadcasted {message['message_type']} to {referee_id}")
-            except Exception as e:
-                logger.error(f"Failed to broadcast to {referee_id}: {e}")
-
-    def broadcast_to_all(self, message: Dict[str, Any]):
-        self.broadcast_to_players(message)
-        self.broadcast_to_referees(message)
+
+    def release_next_wave(self) -> int:
+        """Create the next conflict-free wave of matches and queue it for dispatch"""
+        wave = self._create_next_wave()
+        if not wave:
+            return 0
+        queued = self.dispatcher.submit(wave)
+        logger.info(f"Released round {wave[0].round_id} wave {wave[0].wave_id}: {queued} matches")
+        return queued
+
+    def _create_next_wave(self) -> List[Match]:
+        if self.lazy_schedule is None or not self.lazy_schedule.has_next_wave():
+            return []
+        round_id, wave_id, pairings = self.lazy_schedule.next_wave()
+        wave = []
+        for player1_id, player2_id in pairings:
+            referee_id = self.schedule_referee_ids[len(self.match_table) % len(self.schedule_referee_ids)]
+            match = self.match_table.create_match(round_id, wave_id, player1_id, player2_id, referee_id)
+            self.matches[match.match_id] = match
+            self.schedule_index.add(match)
+            self.publish_match(match)
+            wave.append(match)
+        self.current_round = round_id
+        # Waves are deterministic: replaying the release recreates the same rows
+        self.record_event("wave_released", {"round_id": round_id, "wave_id": wave_id})
+        return wave
+
+    def player_endpoints(self) -> Dict[str, str]:
+        return {player_id: player.metadata.agent_endpoint
+                for player_id, player in self.players.items() if player.metadata.agent_endpoint}
+
+    def referee_endpoints(self) -> Dict[str, str]:
+        return {referee_id: referee.metadata.endpoint
+                for referee_id, referee in self.referees.items() if referee.metadata.endpoint}
+
+    async def broadcast(self, messages: Union[Dict[str, Any], List[Dict[str, Any]]],
+                        recipients: Dict[str, str]) -> FanOutSummary:
+        if isinstance(messages, dict):
+            messages = [messages]
+        # Broadcasts are fire-and-forget: send JSON-RPC notifications, batched
+        # into a single POST per recipient when there is more than one
+        # Encoded once for every recipient
+        return await self._fan_out(recipients, self._notification_payload(messages))
+
+    @staticmethod
+    def _notification_payload(messages: List[Dict[str, Any]]) -> Encoded:
+        return Encoded(wrap_batch([wrap_notification(message) for message in messages]))
+
+    async def _fan_out(self, recipients: Dict[str, str], payload: Optional[Encoded],
+                       payloads: Optional[Dict[str, Encoded]] = None,
+                       message_type: Optional[str] = None) -> FanOutSummary:
+        summary = await fan_out(self.transport, recipients, payload,
+                                max_concurrency=self.broadcast_concurrency,
+                                timeout=self.broadcast_timeout,
+                                message_type=message_type, payloads=payloads)
+        logger.info(f"Broadcasted {summary.message_type} to {len(summary.delivered)}/{len(recipients)} "
+                    f"recipients in {summary.elapsed:.3f}s (slowest {summary.max_latency:.3f}s)")
+        for recipient_id, error in summary.failed.items():
+            logger.error(f"Failed to broadcast to {recipient_id}: {error}")
+        return summary
+
+    async def broadcast_to_players(self, message: Union[Dict[str, Any], List[Dict[str, Any]]]) -> FanOutSummary:
+        return await self.broadcast(message, self.player_endpoints())
+
+    async def broadcast_to_referees(self, message: Union[Dict[str, Any], List[Dict[str, Any]]]) -> FanOutSummary:
+        return await self.broadcast(message, self.referee_endpoints())
+
+    async def broadcast_to_all(self, message: Union[Dict[str, Any], List[Dict[str, Any]]]) -> FanOutSummary:
+        recipients = self.player_endpoints()
+        recipients.update(self.referee_endpoints())
+        return await self.broadcast(message, recipients)
+
+    def schedule_standings_flush(self):
+        """Broadcast pending standings changes standings_interval seconds from now (if not already due)"""
+        if self._standings_flush is None:
+            self._standings_flush = asyncio.get_running_loop().call_later(self.standings_interval,
+                                                                          self._start_standings_flush)
+
+    def _start_standings_flush(self, notifications: List[Dict[str, Any]] = (),
+                              stream_events: List[Tuple[str, Dict[str, Any]]] = ()):
+        """Run flush_standings in a tracked task, so the caller does not wait for the fan-out"""
+        if self._standings_flush is not None:
+            self._standings_flush.cancel()
+            self._standings_flush = None
+        # Results arriving before the task runs are part of this flush
+        self.standings_feed.pending_results = 0
+        task = asyncio.create_task(self.flush_standings(notifications, stream_events))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush_standings(self, notifications: List[Dict[str, Any]] = (),
+                              stream_events: List[Tuple[str, Dict[str, Any]]] = ()) -> int:
+        """
+        Publish a new standings version and deliver it with any round notifications.
+
+        Each recipient gets what it subscribed to (see utils.subscriptions):
+        full-table subscribers a LEAGUE_STANDINGS_UPDATE carrying only the
+        rows changed since the version they last received (base_version > 0),
+        or the full table (base_version 0) if they are new, too far behind
+        or the delta would be more than half the table; top-K and own-row
+        subscribers their rows (base_version 0) when those changed. Round
+        notifications only go to recipients subscribed to them. Messages are
+        encoded once per distinct content and delivered in one fan-out.
+
+        The new version is also published to /events readers, followed by
+        stream_events (the notifications' (event, data) counterparts).
+
+        Returns:
+            The published standings version
+        """
+        if self._standings_flush is not None:
+            self._standings_flush.cancel()
+            self._standings_flush = None
+        feed = self.standings_feed
+        previous_version = feed.version
+        version = feed.commit()
+        # Changed rows by base version, shared by the /events feed and the delta groups
+        delta_rows: Dict[int, List[Dict[str, Any]]] = {}
+
+        def rows_since(base: int) -> List[Dict[str, Any]]:
+            if base not in delta_rows:
+                delta_rows[base] = sorted((self.get_standing_row(player_id) for player_id in feed.changed_since(base)),
+                                          key=lambda row: row["rank"])
+            return delta_rows[base]
+
+        if version != previous_version:
+            # Same delta semantics as LEAGUE_STANDINGS_UPDATE: base_version 0 carries the full table
+            self.publish_event("standings", {
+                "standings_version": version, "base_version": previous_version, "round_id": self.current_round,
+                "standings": self.get_standings() if previous_version == 0 else rows_since(previous_version)
+            })
+        for event, data in stream_events:
+            self.publish_event(event, data)
+
+        recipients = self.player_endpoints()
+        recipients.update(self.referee_endpoints())
+        changed_since: Dict[int, Optional[set]] = {}
+        top_rows: Dict[int, List[Dict[str, Any]]] = {}
+        # Payloads by (standings content, with round notifications)
+        payloads: Dict[Any, Encoded] = {}
+        targets: Dict[str, str] = {}
+        recipient_payloads: Dict[str, Encoded] = {}
+        # What to acknowledge per recipient once delivered: a version or a rows signature
+        sent: Dict[str, Any] = {}
+
+        for recipient_id, url in recipients.items():
+            subscription = self.subscriptions.get(recipient_id)
+            key, rows = None, None
+            if subscription.standings == "full":
+                base = feed.delivered.get(recipient_id, 0)
+                if base not in changed_since:
+                    changed = feed.changed_since(base)
+                    if changed is not None and 2 * len(changed) > len(self.players):
+                        changed = None
+                    changed_since[base] = changed
+                if changed_since[base] is None:
+                    key = ("full", 0)
+                elif base != version:
+                    key = ("delta", base)
+                if key is not None:
+                    sent[recipient_id] = version
+            elif subscription.standings == "top" or (subscription.standings == "own" and recipient_id in self.players):
+                if subscription.standings == "top":
+                    if subscription.top_k not in top_rows:
+                        top_rows[subscription.top_k] = self.get_top_standings(subscription.top_k)
+                    rows = top_rows[subscription.top_k]
+                    key = ("top", subscription.top_k)
+                else:
+                    rows = [self.get_standing_row(recipient_id)]
+                    key = ("own", recipient_id)
+                signature = tuple(tuple(row.values()) for row in rows)
+                if self.subscriptions.is_current(recipient_id, signature):
+                    key = None
+                else:
+                    sent[recipient_id] = signature
+            rounds = bool(notifications) and subscription.rounds
+            if key is None and not rounds:
+                continue
+
+            payload = payloads.get((key, rounds))
+            if payload is None:
+                messages = list(notifications) if rounds else []
+                if key is not None:
+                    if key[0] == "full":
+                        rows = self.get_standings()
+                    elif key[0] == "delta":
+                        rows = rows_since(key[1])
+                    messages.insert(0, create_message("LEAGUE_STANDINGS_UPDATE", league_id="league_2025_even_odd",
+                                                      round_id=self.current_round, standings=rows,
+                                                      standings_version=version,
+                                                      base_version=key[1] if key[0] == "delta" else 0))
+                payload = self._notification_payload(messages)
+                if key is None or key[0] != "own":
+                    payloads[(key, rounds)] = payload
+            targets[recipient_id] = url
+            recipient_payloads[recipient_id] = payload
+
+        if not targets:
+            return version
+        summary = await self._fan_out(targets, None, recipient_payloads,
+                                      message_type="LEAGUE_STANDINGS_UPDATE" if sent else None)
+        for recipient_id in summary.delivered:
+            acknowledged = sent.get(recipient_id)
+            if isinstance(acknowledged, int):
+                feed.acknowledge(recipient_id, acknowledged)
+            elif acknowledged is not None:
+                self.subscriptions.record(recipient_id, acknowledged)
+        return version
+
+    def cached_query(self, query_type: str, player_id: Optional[str] = None,
+                     page: Optional[Tuple[Dict[str, Any], Optional[str], int]] = None,
+                     player_ids: Optional[Tuple[str, ...]] = None) -> Optional[CachedResult]:
+        """
+        Result of a LEAGUE_QUERY, built at most once per state version.
+
+        Args:
+            query_type: GET_STANDINGS, GET_SCHEDULE, GET_NEXT_MATCH, GET_PLAYER_STATS
+                or one of BULK_QUERIES
+            player_id: The player the query is about (GET_NEXT_MATCH, GET_PLAYER_STATS)
+            page: (filters, cursor, limit) for one page of GET_SCHEDULE instead
+                of the whole schedule (see get_schedule_page)
+            player_ids: The players a bulk query is about (None: all of them)
+
+        Returns:
+            The cached result, or None for an unknown query type
+
+        Raises:
+            ValueError: If the page's status or cursor is invalid
+        """
+        if query_type == "GET_STANDINGS":
+            key, build = query_type, self.get_standings
+        elif query_type == "GET_SCHEDULE" and page is not None:
+            filters, cursor, limit = page
+            key = (query_type, tuple(sorted(filters.items())), cursor, limit)
+            build = lambda: self.get_schedule_page(filters, cursor, limit)
+        elif query_type == "GET_SCHEDULE":
+            key, build = query_type, self.get_schedule_data
+        elif query_type == "GET_NEXT_MATCH":
+            key, build = (query_type, player_id), lambda: self.get_next_match(player_id)
+        elif query_type == "GET_PLAYER_STATS":
+            key, build = (query_type, player_id), lambda: self.get_player_stats(player_id)
+        elif query_type in BULK_QUERIES:
+            bulk = getattr(self, BULK_QUERIES[query_type])
+            key, build = (query_type, player_ids), lambda: bulk(player_ids)
+        else:
+            return None
+        return self.query_cache.get(key, self.state_version, build)
+
+    def set_match_status(self, match: Match, status: MatchStatus):
+        self.state_version += 1
+        self.schedule_index.set_status(match, status)
+        if match.row is not None:
+            self.match_table.set_status(match.row, status)
+            # The dispatcher may have moved the match to another referee
+            self.match_table.set_referee(match.row, match.referee_id)
+        if status == MatchStatus.IN_PROGRESS:
+            self.record_event("match_assigned", {"match_id": match.match_id, "referee_id": match.referee_id})
+        self.publish_match(match)
+
+    def publish_event(self, event: str, data: Dict[str, Any]):
+        """Publish to the /events feed (not while replaying persisted events)"""
+        if not self._restoring:
+            self.events.publish(event, data)
+
+    def publish_match(self, match: Match):
+        """Publish a match's status change to the /events feed"""
+        if self._restoring:
+            return
+        data = {"match_id": match.match_id, "round_id": match.round_id, "wave_id": match.wave_id,
+                "player1_id": match.player1_id, "player2_id": match.player2_id,
+                "referee_id": match.referee_id, "status": match.status.value}
+        if match.result is not None:
+            data["result"] = match.result
+        self.events.publish("match", data)
+
+    def stream_snapshot(self) -> Dict[str, Any]:
+        """Current state for /events readers that cannot resume by replay"""
+        return {
+            "standings_version": self.standings_feed.version,
+            "standings": self.get_standings(),
+            "current_round": self.current_round,
+            "total_rounds": self.total_rounds,
+            "league_started": self.league_started,
+            "league_completed": self.league_completed,
+            "completed_matches": self.schedule_index.completed_matches,
+            "live_matches": [self.match_table.row_data(match.row) for match in self.matches.values()
+                             if match.row is not None]
+        }
 
     def check_round_complete(self, round_id: int) -> bool:
-        round_matches = [m for m in self.matches.values() if m.round_id == round_id]
-        if not round_matches:
-            return False
-        return all(m.status == MatchStatus.COMPLETED for m in round_matches)
+        return self.schedule_index.is_round_complete(round_id)
 
     def check_league_complete(self) -> bool:
-        return all(m.status == MatchStatus.COMPLETED for m in self.matches.values())
+        return self.schedule_index.is_league_complete()
+
+    def record_event(self, kind: str, data: Dict[str, Any]):
+        """Append a state change to the durable event log (no-op without a store or while replaying)"""
+        self.state_version += 1
+        if self.store is None or self._restoring:
+            return
+        self.store.record(kind, data)
+        if self.store.should_snapshot():
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        """Queue a full state image so restarts only replay later events"""
+        if self.store is None:
+            return
+        state = {
+            "referees": [[referee.referee_id, referee.auth_token, referee.metadata.model_dump()]
+                         for referee in self.referees.values()],
+            "players": [[player.player_id, player.auth_token, player.metadata.model_dump(), player.wins,
+                         player.losses, player.draws, player.total_points_earned, player.total_points_lost]
+                        for player in self.players.values()],
+            "league_started": self.league_started,
+            "total_rounds": self.total_rounds,
+            "current_round": self.current_round,
+            "schedule_referee_ids": list(self.schedule_referee_ids),
+            "lazy_schedule": self.lazy_schedule.to_state() if self.lazy_schedule else None,
+            "schedule_index": self.schedule_index.to_state()
+        }
+        table_state, columns = self.match_table.to_snapshot()
+        state["match_table"] = table_state
+        self.store.snapshot(state, columns)
+
+    def restore(self) -> bool:
+        """
+        Rebuild state from the store: latest snapshot, then the events after it.
+
+        Returns:
+            True if any persisted state was found
+        """
+        if self.store is None:
+            return False
+        snapshot, events = self.store.load()
+        if snapshot is None and not events:
+            return False
+        self._restoring = True
+        try:
+            if snapshot is not None:
+                self._load_snapshot(snapshot.state, snapshot.columns)
+            for _, kind, data in events:
+                self._apply_event(kind, data)
+        finally:
+            self._restoring = False
+        self.league_completed = self.league_started and self.check_league_complete()
+        logger.info(f"Restored {len(self.players)} players, {len(self.referees)} referees and "
+                    f"{len(self.match_table)} matches ({len(events)} events replayed)")
+        return True
+
+    def _load_snapshot(self, state: Dict[str, Any], columns: Dict[str, bytes]):
+        for referee_id, auth_token, metadata in state["referees"]:
+            self._add_referee(referee_id, auth_token, RefereeMetadata(**metadata))
+        for player_id, auth_token, metadata, wins, losses, draws, points, lost in state["players"]:
+            player = Player(player_id, auth_token, PlayerMetadata(**metadata))
+            player.wins, player.losses, player.draws = wins, losses, draws
+            player.total_points_earned, player.total_points_lost = points, lost
+            self.players[player_id] = player
+            self._claim_endpoint(player.metadata.agent_endpoint, player_id)
+            self.standings_index.add(player_id, points, wins, draws)
+        self.league_started = state["league_started"]
+        self.total_rounds = state["total_rounds"]
+        self.current_round = state["current_round"]
+        self.schedule_referee_ids = state["schedule_referee_ids"]
+        if state["lazy_schedule"] is not None:
+            self.lazy_schedule = LazySchedule.from_state(state["lazy_schedule"])
+        self.match_table = MatchTable.from_snapshot(state["match_table"], columns)
+        live_matches = self.match_table.live_matches()
+        self.matches = {match.match_id: match for match in live_matches}
+        self.schedule_index = ScheduleIndex.from_state(state["schedule_index"], live_matches)
+
+    def _apply_event(self, kind: str, data: Dict[str, Any]):
+        if kind == "referee_registered":
+            self._add_referee(data["referee_id"], data["auth_token"], RefereeMetadata(**data["metadata"]))
+        elif kind == "player_registered":
+            self._add_player(data["player_id"], data["auth_token"], PlayerMetadata(**data["metadata"]))
+        elif kind == "schedule_created":
+            self._create_schedule(data["rounds"], data["player_ids"], data["referee_ids"],
+                                  MatchTable(data["id_prefix"]))
+        elif kind == "wave_released":
+            self._create_next_wave()
+        elif kind == "match_assigned":
+            match = self.matches.get(data["match_id"])
+            if match is not None and match.status == MatchStatus.PENDING:
+                match.referee_id = data["referee_id"]
+                self.set_match_status(match, MatchStatus.IN_PROGRESS)
+        elif kind == "subscription_changed":
+            agent = self.players.get(data["agent_id"]) or self.referees.get(data["agent_id"])
+            if agent is not None:
+                self._set_subscription(agent, Subscription.from_spec(data["subscriptions"], PLAYER_DEFAULT))
+        elif kind == "match_completed":
+            match = self.matches.get(data["match_id"])
+            if match is not None:
+                self.apply_match_result(match, data["result"])
+        else:
+            logger.warning(f"Skipping unknown league event: {kind}")
+
+    def resume(self) -> int:
+        """
+        Queue every restored live match for dispatch again.
+
+        Matches that were in progress go back to their referee; if the
+        original game still reports its result first, the repeat report is
+        ignored as a duplicate. A league stopped at a wave boundary has no
+        live match whose result would release the next wave, so that wave
+        is released here. Without a reachable referee nothing is queued,
+        and the resume is retried when the next referee registers.
+        """
+        self.resume_pending = False
+        live_matches = list(self.matches.values())
+        for match in live_matches:
+            if match.status == MatchStatus.IN_PROGRESS:
+                self.set_match_status(match, MatchStatus.PENDING)
+        try:
+            if not live_matches:
+                # Released waves stay live until submitted, so a retry finds them
+                return self.release_next_wave()
+            queued = self.dispatcher.submit(live_matches)
+        except ValueError as e:
+            logger.warning(f"Cannot resume the league until a referee registers: {e}")
+            self.resume_pending = True
+            return 0
+        logger.info(f"Resumed {queued} restored matches")
+        return queued
@@ -1,23 +1,34 @@
 """
 Core League Manager methods for standings, stats, and match updates
 """
-from typing import Dict, List, Optional, Any
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
 from models.league_models import MatchStatus
-import uuid
+from utils.match_table import is_void
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Schedule pages (GET_SCHEDULE with filters, a cursor or a limit)
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+SCHEDULE_FILTERS = ("round_id", "player_id", "status", "referee_id")
+# Bulk queries: one result answers for many players, as columns
+BULK_QUERIES = {"GET_PLAYER_STATS_BULK": "get_player_stats_bulk", "GET_NEXT_MATCH_BULK": "get_next_match_bulk"}
+NEXT_MATCH_FIELDS = ("match_id", "round_id", "wave_id", "player1_id", "player2_id", "referee_id")
+
 
 class LeagueManagerCore:
     """Mixin class for LeagueManager with additional methods"""
 
-    def update_match_result(self, match_id: str, result: Dict[str, Any]):
+    async def update_match_result(self, match_id: str, result: Dict[str, Any]):
         """
         Process match result from referee and update league standings.
 
-        Updates match status, player win/loss/draw records, points, and broadcasts
-        standings updates. Also checks for round and league completion.
+        Updates match status, player win/loss/draw records and points. Standings
+        updates are coalesced: they are broadcast once standings_batch_size results
+        have accumulated, standings_interval seconds after the first of them, or
+        right away when a round or the league completes.
 
         Args:
             match_id: ID of the completed match
@@ -25,72 +36,49 @@ class LeagueManagerCore:
                 - winner: Player ID of winner or None for draw
                 - score: Dict mapping player IDs to points earned
                 - details: Additional game information
+
+        Raises:
+            ValueError: If the match is unknown or the result does not fit it
         """
-        # Find the match in league schedule
+        # Find the match among the live (not yet completed) matches
         match = self.matches.get(match_id)
         if not match:
+            if self.match_table.row_of(match_id) is not None:
+                logger.warning(f"Ignoring duplicate result for completed match {match_id}")
+                return
             raise ValueError(f"Match {match_id} not found")
 
-        # Mark match as completed and store result
-        match.status = MatchStatus.COMPLETED
-        match.result = result
-
-        # Extract result data
-        winner = result.get("winner")
-        player1_id = match.player1_id
-        player2_id = match.player2_id
-
-        # Get player objects to update their stats
-        player1 = self.players[player1_id]
-        player2 = self.players[player2_id]
-
-        # Update win/loss/draw counts based on match outcome
-        if winner == player1_id:
-            # Player 1 wins
-            player1.wins += 1
-            player2.losses += 1
-        elif winner == player2_id:
-            # Player 2 wins
-            player2.wins += 1
-            player1.losses += 1
-        elif winner is None:
-            # Draw - both players get a draw
-            player1.draws += 1
-            player2.draws += 1
-
-        # Update points from score dictionary (3 for win, 1 for draw, 0 for loss)
-        score = result.get("score", {})
-        if player1_id in score:
-            player1.total_points_earned += score[player1_id]
-        if player2_id in score:
-            player2.total_points_earned += score[player2_id]
-
+        self.apply_match_result(match, result)
+        # Free the referee slot so the next queued match goes out immediately
+        self.dispatcher.complete(match_id)
         logger.info(f"Match {match_id} completed: {result}")
 
-        # Broadcast updated standings to all participants
-        from utils.league_utils import create_base_message
-        standings_message = create_base_message("LEAGUE_STANDINGS_UPDATE", str(uuid.uuid4()))
-        standings_message["league_id"] = "league_2025_even_odd"
-        standings_message["round_id"] = match.round_id
-        standings_message["standings"] = self.get_standings()
-        self.broadcast_to_all(standings_message)
+        # Standings changes are broadcast in coalesced, versioned updates;
+        # round and league notifications go out together with the next one
+        from utils.league_utils import create_message
+        notifications = []
+        # The same events for /events readers, published after the standings they follow
+        stream_events = []
+
+        # Release the next conflict-free wave once this one has finished
+        if self.schedule_index.is_wave_complete(match.round_id, match.wave_id):
+            self.release_next_wave()
 
         # Check if all matches in this round are complete
         if self.check_round_complete(match.round_id):
             # Count total matches in this round
-            round_matches = [m for m in self.schedule if m.round_id == match.round_id]
-            matches_played = len(round_matches)
+            matches_played = self.schedule_index.round_size(match.round_id)
 
             # Determine if there's a next round (None if this was the last round)
             next_round_id = match.round_id + 1 if match.round_id < self.total_rounds else None
 
             # Broadcast ROUND_COMPLETED notification
-            round_complete_message = create_base_message("ROUND_COMPLETED", str(uuid.uuid4()))
-            round_complete_message["league_id"] = "league_2025_even_odd"
-            round_complete_message["round_id"] = match.round_id
-            round_complete_message["matches_played"] = matches_played
-            round_complete_message["next_round_id"] = next_round_id
-            self.broadcast_to_all(round_complete_message)
+            round_complete_message = create_message("ROUND_COMPLETED", league_id="league_2025_even_odd",
+                                                    round_id=match.round_id, matches_played=matches_played,
+                                                    next_round_id=next_round_id)
+            notifications.append(round_complete_message)
+            stream_events.append(("round_completed", {"round_id": match.round_id, "matches_played": matches_played,
+                                                     "next_round_id": next_round_id}))
             logger.info(f"Round {match.round_id} completed")
 
         # Check if all matches in the league are complete
@@ -103,7 +91,7 @@ class LeagueManagerCore:
             # Extract champion information (first place player)
             champion = None
             if full_standings:
-                top_player = full_standings[0]  # Standings are already sorted
+                top_player = full_standings[0]  # Standings index is always sorted
                 champion = {
                     "player_id": top_player["player_id"],
                     "display_name": top_player["display_name"],
@@ -122,20 +110,88 @@ class LeagueManagerCore:
             ]
 
             # Broadcast LEAGUE_COMPLETED notification with final results
-            league_complete_message = create_base_message("LEAGUE_COMPLETED", str(uuid.uuid4()))
-            league_complete_message["league_id"] = "league_2025_even_odd"
-            league_complete_message["total_rounds"] = self.total_rounds
-            league_complete_message["total_matches"] = len(self.schedule)
-            league_complete_message["champion"] = champion
-            league_complete_message["final_standings"] = final_standings
-            self.broadcast_to_all(league_complete_message)
+            league_complete_message = create_message("LEAGUE_COMPLETED", league_id="league_2025_even_odd",
+                                                     total_rounds=self.total_rounds,
+                                                     total_matches=self.schedule_index.planned_matches,
+                                                     champion=champion, final_standings=final_standings)
+            notifications.append(league_complete_message)
+            stream_events.append(("league_completed", {"total_rounds": self.total_rounds,
+                                                       "total_matches": self.schedule_index.planned_matches,
+                                                       "champion": champion, "final_standings": final_standings}))
             logger.info("League completed")
 
+        self.standings_feed.pending_results += 1
+        if notifications or self.standings_feed.pending_results >= self.standings_batch_size:
+            # In its own task: the referee's acknowledgement must not wait for every recipient
+            self._start_standings_flush(notifications, stream_events)
+        else:
+            self.schedule_standings_flush()
+
+    def apply_match_result(self, match, result: Dict[str, Any]):
+        """
+        Record a match result in the match table, player stats and standings.
+
+        This is the state change that update_match_result persists and that
+        restore() replays; notifications and wave release stay with the caller.
+        A void result completes the match without touching any player's
+        wins, draws, losses or points.
+
+        Raises:
+            ValueError: If the result does not fit the match (see MatchTable.record_result)
+        """
+        # Validates every field it stores, so an invalid result changes nothing
+        self.match_table.record_result(match.row, result)
+        # Mark match as completed; from now on it only lives in the match table
+        match.result = result
+        self.set_match_status(match, MatchStatus.COMPLETED)
+        del self.matches[match.match_id]
+        if is_void(result):
+            # Never played (no referee could run it): completes its wave, leaves the standings alone
+            self.record_event("match_completed", {"match_id": match.match_id, "result": result})
+            return
+
+        winner = result.get("winner")
+        player1_id = match.player1_id
+        player2_id = match.player2_id
+
+        # Get player objects to update their stats
+        player1 = self.players[player1_id]
+        player2 = self.players[player2_id]
+
+        # Update win/loss/draw counts based on match outcome
+        if winner == player1_id:
+            # Player 1 wins
+            player1.wins += 1
+            player2.losses += 1
+        elif winner == player2_id:
+            # Player 2 wins
+            player2.wins += 1
+            player1.losses += 1
+        elif winner is None:
+            # Draw - both players get a draw
+            player1.draws += 1
+            player2.draws += 1
+
+        # Update points from score dictionary (3 for win, 1 for draw, 0 for loss)
+        score = result.get("score") or {}
+        if player1_id in score:
+            player1.total_points_earned += score[player1_id]
+        if player2_id in score:
+            player2.total_points_earned += score[player2_id]
+
+        # Reposition just these two players in the ranked standings index
+        for player_id, player in ((player1_id, player1), (player2_id, player2)):
+            self.standings_index.update(player_id, player.total_points_earned, player.wins, player.draws)
+        self.standings_feed.mark((player1_id, player2_id))
+
+        self.record_event("match_completed", {"match_id": match.match_id, "result": result})
+
     def get_standings(self) -> List[Dict[str, Any]]:
         """
-        Calculate and return current league standings sorted by performance.
+        Return current league standings sorted by performance.
 
-        Creates a list of player standings with statistics, sorted by:
+        Materializes the incrementally maintained standings index, which is
+        always ordered by:
         1. Total points (primary)
         2. Wins (tiebreaker)
         3. Draws (secondary tiebreaker)
@@ -151,60 +207,127 @@ class LeagueManagerCore:
                 - losses: Number of losses
                 - points: Total points earned
         """
-        standings = []
-
-        # Build standings list with player statistics
-        for player_id, player in self.players.items():
-            # Calculate total matches played
-            played = player.wins + player.losses + player.draws
-
-            standings.append({
-                "player_id": player_id,
-                "display_name": player.metadata.display_name,
-                "played": played,
-                "wins": player.wins,
-                "draws": player.draws,
-                "losses": player.losses,
-                "points": player.total_points_earned
-            })
+        return [self.get_standing_row(player_id, rank)
+                for rank, player_id in enumerate(self.standings_index, start=1)]
 
-        # Sort standings: primary by points, then by wins, then by draws (all descending)
-        # Higher points = better rank, more wins breaks ties, more draws breaks further ties
-        standings.sort(key=lambda x: (x["points"], x["wins"], x["draws"]), reverse=True)
+    def get_standing_row(self, player_id: str, rank: Optional[int] = None) -> Dict[str, Any]:
+        """Build the standings row for one player (rank looked up if not given)"""
+        player = self.players[player_id]
+        return {
+            "player_id": player_id,
+            "display_name": player.metadata.display_name,
+            "played": player.wins + player.losses + player.draws,
+            "wins": player.wins,
+            "draws": player.draws,
+            "losses": player.losses,
+            "points": player.total_points_earned,
+            "rank": rank if rank is not None else self.standings_index.rank(player_id)
+        }
 
-        # Assign rank based on sorted position (1 = first place)
-        for rank, standing in enumerate(standings, start=1):
-            standing["rank"] = rank
+    def get_player_rank(self, player_id: str) -> Optional[int]:
+        """Get the current standings position of one player"""
+        if player_id not in self.standings_index:
+            return None
+        return self.standings_index.rank(player_id)
 
-        return standings
+    def get_top_standings(self, k: int) -> List[Dict[str, Any]]:
+        """Get the standings rows of the first k players"""
+        return [self.get_standing_row(player_id, rank)
+                for rank, player_id in enumerate(self.standings_index.top(k), start=1)]
 
     def get_schedule_data(self) -> List[Dict[str, Any]]:
         """Get schedule data"""
-        schedule_data = []
-        for match in self.schedule:
-            schedule_data.append({
+        return [self.match_table.row_data(row) for row in range(len(self.match_table))]
+
+    def iter_schedule(self, round_id: Optional[int] = None, player_id: Optional[str] = None,
+                      status: Optional[str] = None, referee_id: Optional[str] = None,
+                      cursor: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily produce the released matches that pass every given filter.
+
+        Entries are schedule rows as in get_schedule_data, plus the result
+        of completed matches, in schedule order. Only matching rows are
+        materialized, so a slice costs in proportion to its size.
+
+        Args:
+            round_id: Only this round
+            player_id: Only matches this player takes part in
+            status: Only matches with this status (pending, in_progress, completed)
+            referee_id: Only matches assigned to this referee
+            cursor: Start after this match ID (the last one already seen)
+
+        Raises:
+            ValueError: For an unknown status or a cursor that is not a match ID
+        """
+        match_status = None
+        if status is not None:
+            try:
+                match_status = MatchStatus(status)
+            except ValueError:
+                raise ValueError(f"Unknown match status: {status}") from None
+        start = 0
+        if cursor is not None:
+            row = self.match_table.row_of(cursor)
+            if row is None:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            start = row + 1
+        table = self.match_table
+        for row in table.find_rows(start, round_id, player_id, match_status, referee_id):
+            entry = table.row_data(row)
+            result = table.result(row)
+            if result is not None:
+                entry["result"] = result
+            yield entry
+
+    def get_schedule_page(self, filters: Dict[str, Any], cursor: Optional[str] = None,
+                          limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        One page of the filtered schedule.
+
+        Returns:
+            Dictionary with:
+                - matches: Up to limit entries (see iter_schedule)
+                - next_cursor: Cursor for the following page, or None after the last one
+        """
+        matches = list(islice(self.iter_schedule(cursor=cursor, **filters), limit + 1))
+        next_cursor = None
+        if len(matches) > limit:
+            matches.pop()
+            next_cursor = matches[-1]["match_id"]
+        return {"matches": matches, "next_cursor": next_cursor}
+
+    def get_next_match(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get next pending match for a player.
+
+        Returns the earliest released pending match, or otherwise the player's
+        next planned pairing from the lazy schedule (no match_id or referee
+        assigned yet).
+        """
+        match = self.schedule_index.next_pending(player_id)
+        if match is not None:
+            return {
                 "match_id": match.match_id,
                 "round_id": match.round_id,
+                "wave_id": match.wave_id,
                 "player1_id": match.player1_id,
                 "player2_id": match.player2_id,
-                "referee_id": match.referee_id,
-                "status": match.status.value
-            })
-        return schedule_data
-
-    def get_next_match(self, player_id: str) -> Optional[Dict[str, Any]]:
-        """Get next pending match for a player"""
-        for match in self.schedule:
-            if match.status == MatchStatus.PENDING:
-                if match.player1_id == player_id or match.player2_id == player_id:
-                    return {
-                        "match_id": match.match_id,
-                        "round_id": match.round_id,
-                        "player1_id": match.player1_id,
-                        "player2_id": match.player2_id,
-                        "referee_id": match.referee_id
-                    }
-        return None
+                "referee_id": match.referee_id
+            }
+        if self.lazy_schedule is None:
+            return None
+        planned = self.lazy_schedule.next_pairing_for(player_id)
+        if planned is None:
+            return None
+        round_id, wave_id, (player1_id, player2_id) = planned
+        return {
+            "match_id": None,
+            "round_id": round_id,
+            "wave_id": wave_id,
+            "player1_id": player1_id,
+            "player2_id": player2_id,
+            "referee_id": None
+        }
 
     def get_player_stats(self, player_id: str) -> Optional[Dict[str, Any]]:
         """Get statistics for a specific player"""
@@ -223,11 +346,73 @@ class LeagueManagerCore:
             "total_games": player.wins + player.losses + player.draws
         }
 
+    def _bulk_players(self, player_ids: Optional[Iterable[str]]) -> Tuple[List[Tuple[str, Any]], List[str]]:
+        """(player_id, Player) pairs for the requested IDs (None: everyone) and the unknown IDs"""
+        if player_ids is None:
+            return list(self.players.items()), []
+        players, unknown = [], []
+        for player_id in player_ids:
+            player = self.players.get(player_id)
+            if player is None:
+                unknown.append(player_id)
+            else:
+                players.append((player_id, player))
+        return players, unknown
+
+    def get_player_stats_bulk(self, player_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Statistics for many players in one columnar result.
+
+        Args:
+            player_ids: The players, or None for every registered player
+
+        Returns:
+            One list per get_player_stats field, aligned by position,
+            plus "unknown": requested IDs that are not registered players
+        """
+        players, unknown = self._bulk_players(player_ids)
+        ids, names, wins, losses, draws, earned, lost, games = [], [], [], [], [], [], [], []
+        for player_id, player in players:
+            ids.append(player_id)
+            names.append(player.metadata.display_name)
+            wins.append(player.wins)
+            losses.append(player.losses)
+            draws.append(player.draws)
+            earned.append(player.total_points_earned)
+            lost.append(player.total_points_lost)
+            games.append(player.wins + player.losses + player.draws)
+        return {"player_id": ids, "display_name": names, "wins": wins, "losses": losses, "draws": draws,
+                "total_points_earned": earned, "total_points_lost": lost, "total_games": games,
+                "unknown": unknown}
+
+    def get_next_match_bulk(self, player_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Next match of many players in one columnar result.
+
+        Args:
+            player_ids: The players, or None for every registered player
+
+        Returns:
+            "player_id" plus one list per get_next_match field, aligned by
+            position (all None for a player with no match left), plus
+            "unknown": requested IDs that are not registered players
+        """
+        players, unknown = self._bulk_players(player_ids)
+        columns = {field: [] for field in ("player_id",) + NEXT_MATCH_FIELDS}
+        appenders = [columns[field].append for field in NEXT_MATCH_FIELDS]
+        add_player = columns["player_id"].append
+        for player_id, _ in players:
+            add_player(player_id)
+            match = self.get_next_match(player_id) or {}
+            for field, append in zip(NEXT_MATCH_FIELDS, appenders):
+                append(match.get(field))
+        columns["unknown"] = unknown
+        return columns
+
     def is_round_completed(self, round_id: int) -> bool:
         """Check if all matches in a round are completed"""
-        round_matches = [m for m in self.schedule if m.round_id == round_id]
-        return all(m.status == MatchStatus.COMPLETED for m in round_matches)
+        return self.schedule_index.is_round_complete(round_id)
 
     def is_league_completed(self) -> bool:
         """Check if all matches are completed"""
-        return all(m.status == MatchStatus.COMPLETED for m in self.schedule)
+        return self.schedule_index.is_league_complete()
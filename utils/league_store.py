@@ -0,0 +1,233 @@
+"""
+Durable League Manager state: SQLite (WAL) event log plus periodic snapshots
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    last_seq INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_columns (
+    snapshot_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (snapshot_id, name)
+);
+"""
+
+
+class Snapshot:
+    """A stored snapshot: JSON state, raw column buffers and the last event it covers"""
+
+    def __init__(self, last_seq: int, state: Dict[str, Any], columns: Dict[str, bytes]):
+        self.last_seq = last_seq
+        self.state = state
+        self.columns = columns
+
+
+class LeagueStore:
+    """
+    Write-ahead event log and snapshots for the League Manager.
+
+    record() assigns the next sequence number and queues the event; a
+    dedicated thread inserts queued events in batches, one transaction per
+    batch. snapshot() queues a full state image that is written after all
+    earlier events; events and snapshots it supersedes are deleted in the
+    same transaction. On start-up load() returns the latest snapshot and
+    only the events recorded after it.
+
+    Event data must not be mutated after it is handed to record().
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 0.2,
+                 snapshot_every: int = 10000):
+        """
+        Args:
+            path: SQLite database file
+            batch_size: Maximum events committed per transaction
+            flush_interval: Maximum seconds an event waits before being committed
+            snapshot_every: Events between automatic snapshots (see should_snapshot)
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+            rows = connection.execute(
+                "SELECT MAX(seq) FROM events UNION ALL SELECT MAX(last_seq) FROM snapshots"
+            ).fetchall()
+        finally:
+            connection.close()
+        self.seq = max((value for (value,) in rows if value is not None), default=0)
+        self.events_since_snapshot = 0
+        self.committed = 0
+        self.snapshots_written = 0
+        self.failed = 0
+
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"league-store:{self.path}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def load(self) -> Tuple[Optional[Snapshot], List[Tuple[int, str, Dict[str, Any]]]]:
+        """Latest snapshot (or None) and the (seq, kind, data) events recorded after it"""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT id, last_seq, state FROM snapshots ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            snapshot = None
+            last_seq = 0
+            if row is not None:
+                snapshot_id, last_seq, state = row
+                columns = dict(connection.execute(
+                    "SELECT name, data FROM snapshot_columns WHERE snapshot_id = ?", (snapshot_id,)
+                ))
+                snapshot = Snapshot(last_seq, json.loads(state), columns)
+            rows = connection.execute(
+                "SELECT seq, kind, data FROM events WHERE seq > ? ORDER BY seq", (last_seq,)
+            ).fetchall()
+            # One decode for the whole tail is much cheaper than one per event
+            payloads = json.loads("[" + ",".join(data for _, _, data in rows) + "]")
+            events = [(seq, kind, data) for (seq, kind, _), data in zip(rows, payloads)]
+        finally:
+            connection.close()
+        return snapshot, events
+
+    def record(self, kind: str, data: Dict[str, Any]) -> int:
+        """Queue an event and return its sequence number"""
+        self.seq += 1
+        self.events_since_snapshot += 1
+        self._queue.put((self.seq, kind, data))
+        return self.seq
+
+    def should_snapshot(self) -> bool:
+        return self.events_since_snapshot >= self.snapshot_every
+
+    def snapshot(self, state: Dict[str, Any], columns: Dict[str, bytes]):
+        """Queue a snapshot covering every event recorded so far"""
+        self.events_since_snapshot = 0
+        self._queue.put(Snapshot(self.seq, state, columns))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything queued so far is committed"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Commit pending events and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        connection = self._connect()
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            events, waiters = [], []
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif isinstance(item, Snapshot):
+                    # Earlier events go in first so the snapshot can supersede them
+                    self._commit_events(connection, events)
+                    events = []
+                    self._write_snapshot(connection, item)
+                else:
+                    seq, kind, data = item
+                    try:
+                        events.append((seq, kind, json.dumps(data, default=str)))
+                    except (TypeError, ValueError):
+                        self.failed += 1
+                if stop or len(events) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._commit_events(connection, events)
+            for waiter in waiters:
+                waiter.set()
+        connection.close()
+
+    def _commit_events(self, connection: sqlite3.Connection, events: List[Tuple[int, str, str]]):
+        if not events:
+            return
+        try:
+            with connection:
+                connection.executemany("INSERT INTO events (seq, kind, data) VALUES (?, ?, ?)", events)
+        except sqlite3.Error as e:
+            self.failed += len(events)
+            logger.error(f"Failed to commit {len(events)} league events: {e}")
+            return
+        self.committed += len(events)
+
+    def _write_snapshot(self, connection: sqlite3.Connection, snapshot: Snapshot):
+        try:
+            self._insert_snapshot(connection, snapshot)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write league snapshot: {e}")
+            return
+        self.snapshots_written += 1
+
+    def _insert_snapshot(self, connection: sqlite3.Connection, snapshot: Snapshot):
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO snapshots (last_seq, created_at, state) VALUES (?, ?, ?)",
+                (snapshot.last_seq, time.time(), json.dumps(snapshot.state))
+            )
+            snapshot_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO snapshot_columns (snapshot_id, name, data) VALUES (?, ?, ?)",
+                [(snapshot_id, name, data) for name, data in snapshot.columns.items()]
+            )
+            connection.execute("DELETE FROM events WHERE seq <= ?", (snapshot.last_seq,))
+            connection.execute("DELETE FROM snapshot_columns WHERE snapshot_id < ?", (snapshot_id,))
+            connection.execute("DELETE FROM snapshots WHERE id < ?", (snapshot_id,))
@@ -0,0 +1,280 @@
+"""
+Capacity- and latency-aware dispatch of scheduled matches to referees
+"""
+import asyncio
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Any
+
+from models.league_models import Match, MatchStatus
+from utils.league_utils import create_message
+from utils.jsonrpc_utils import wrap_request
+
+logger = logging.getLogger(__name__)
+
+
+class RefereeSlots:
+    """Dispatch state for one registered referee"""
+
+    def __init__(self, referee_id: str, endpoint: str, capacity: int):
+        self.referee_id = referee_id
+        self.endpoint = endpoint
+        self.capacity = max(1, capacity)
+        self.queue: Deque[Match] = deque()
+        self.active: Dict[str, Optional[asyncio.TimerHandle]] = {}
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.retry_after = 0.0
+
+    @property
+    def free_slots(self) -> int:
+        return self.capacity - len(self.active)
+
+    def available(self, now: float) -> bool:
+        return self.free_slots > 0 and now >= self.retry_after
+
+
+class MatchDispatcher:
+    """
+    Sends MATCH_ASSIGNMENT messages as soon as referees have capacity.
+
+    Each referee has its own queue, seeded from match.referee_id, and never
+    runs more matches at once than the max_concurrent_matches it declared
+    at registration. A slot frees when the match result is reported (or
+    its lease expires), and the next match goes out immediately. Referees
+    with an empty queue take work from the longest queue, and referees
+    with a lower recent assignment latency are served first.
+
+    A match whose assignment fails or whose lease expires goes back to
+    pending and is queued at another referee. After max_attempts of those
+    it is recorded as void: it completes, so its wave can too, but it
+    counts for neither player's standings.
+    """
+
+    def __init__(self, league_manager, assignment_timeout: float = 10.0, match_timeout: float = 300.0,
+                 max_attempts: int = 3, failure_backoff: float = 2.0, latency_alpha: float = 0.3):
+        self.league_manager = league_manager
+        self.assignment_timeout = assignment_timeout
+        self.match_timeout = match_timeout
+        self.max_attempts = max_attempts
+        self.failure_backoff = failure_backoff
+        self.latency_alpha = latency_alpha
+
+        self.referees: Dict[str, RefereeSlots] = {}
+        self.assigned_to: Dict[str, str] = {}
+        self.attempts: Dict[str, int] = {}
+        self.enqueued_at: Dict[str, float] = {}
+
+        self.dispatched = 0
+        self.failed = 0
+        self.queue_wait_total = 0.0
+        self.assignment_latency_total = 0.0
+        self._pump_scheduled = False
+        self._tasks = set()
+
+    def sync_referees(self):
+        """Pick up newly registered referees and their declared capacity"""
+        for referee_id, referee in self.league_manager.referees.items():
+            if referee_id not in self.referees and referee.metadata.endpoint:
+                self.referees[referee_id] = RefereeSlots(
+                    referee_id, referee.metadata.endpoint, referee.metadata.max_concurrent_matches
+                )
+
+    def submit(self, matches: Iterable[Match]) -> int:
+        """Queue pending matches for dispatch and start sending them"""
+        self.sync_referees()
+        if not self.referees:
+            raise ValueError("No referees with a contact endpoint are registered")
+
+        now = time.monotonic()
+        count = 0
+        for match in matches:
+            if match.status != MatchStatus.PENDING:
+                continue
+            slots = self.referees.get(match.referee_id)
+            if slots is None:
+                # Scheduled referee cannot be reached - use the shortest queue
+                slots = min(self.referees.values(), key=lambda r: len(r.queue) + len(r.active))
+                match.referee_id = slots.referee_id
+            slots.queue.append(match)
+            self.enqueued_at[match.match_id] = now
+            count += 1
+        self.pump()
+        return count
+
+    def complete(self, match_id: str):
+        """Release the referee slot held by a finished match"""
+        self.attempts.pop(match_id, None)
+        referee_id = self.assigned_to.pop(match_id, None)
+        if referee_id is None:
+            return
+        handle = self.referees[referee_id].active.pop(match_id, None)
+        if handle is not None:
+            handle.cancel()
+        self.pump()
+
+    def pump(self):
+        """Start assignments for every free referee slot"""
+        now = time.monotonic()
+        # Serve referees that have recently answered fastest first
+        ready = sorted((r for r in self.referees.values() if r.available(now)), key=lambda r: r.latency or 0.0)
+        for slots in ready:
+            while slots.free_slots > 0:
+                match = self._next_match_for(slots)
+                if match is None:
+                    return
+                if match.status != MatchStatus.PENDING:
+                    # Completed while queued (e.g. a late result after its lease expired)
+                    self.enqueued_at.pop(match.match_id, None)
+                    self.attempts.pop(match.match_id, None)
+                    continue
+                slots.active[match.match_id] = None
+                self.assigned_to[match.match_id] = slots.referee_id
+                asyncio.get_running_loop().create_task(self._assign(slots, match))
+        # Work is left but every free referee is backing off: retry when the first may send again
+        backing_off = [r.retry_after for r in self.referees.values() if r.free_slots > 0 and r.retry_after > now]
+        if backing_off and any(r.queue for r in self.referees.values()):
+            self._schedule_pump(min(backing_off) - now)
+
+    def _next_match_for(self, slots: RefereeSlots) -> Optional[Match]:
+        if slots.queue:
+            return slots.queue.popleft()
+        # Take work from the referee with the longest queue
+        donor = max(self.referees.values(), key=lambda r: len(r.queue))
+        if not donor.queue:
+            return None
+        match = donor.queue.popleft()
+        match.referee_id = slots.referee_id
+        return match
+
+    def _schedule_pump(self, delay: float):
+        if self._pump_scheduled:
+            return
+        self._pump_scheduled = True
+
+        def run():
+            self._pump_scheduled = False
+            self.pump()
+
+        asyncio.get_running_loop().call_later(delay, run)
+
+    def _assignment_message(self, match: Match) -> Dict[str, Any]:
+        player1 = self.league_manager.players.get(match.player1_id)
+        player2 = self.league_manager.players.get(match.player2_id)
+        return create_message(
+            "MATCH_ASSIGNMENT",
+            match_id=match.match_id,
+            league_id="league_2025_even_odd",
+            round_id=match.round_id,
+            player1_id=match.player1_id,
+            player2_id=match.player2_id,
+            player1_endpoint=player1.metadata.agent_endpoint,
+            player2_endpoint=player2.metadata.agent_endpoint
+        )
+
+    async def _assign(self, slots: RefereeSlots, match: Match):
+        jsonrpc_message = wrap_request(self._assignment_message(match), request_id=self.dispatched + 1)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                self.league_manager.transport.post(slots.endpoint, jsonrpc_message, timeout=self.assignment_timeout),
+                self.assignment_timeout
+            )
+        except Exception as e:
+            self._assignment_failed(slots, match, e)
+            return
+
+        now = time.monotonic()
+        latency = now - start
+        if slots.latency is None:
+            slots.latency = latency
+        else:
+            slots.latency += self.latency_alpha * (latency - slots.latency)
+        slots.failures = 0
+
+        self.dispatched += 1
+        self.assignment_latency_total += latency
+        self.queue_wait_total += start - self.enqueued_at.pop(match.match_id, start)
+        if match.status == MatchStatus.PENDING:
+            self.league_manager.set_match_status(match, MatchStatus.IN_PROGRESS)
+        logger.info(f"Assigned match {match.match_id} to {slots.referee_id} in {latency * 1000:.1f} ms")
+
+        if match.match_id in slots.active:
+            # Free the slot even if the referee never reports a result
+            slots.active[match.match_id] = asyncio.get_running_loop().call_later(
+                self.match_timeout, self._lease_expired, slots, match
+            )
+
+    def _assignment_failed(self, slots: RefereeSlots, match: Match, error: Exception):
+        logger.error(f"Failed to assign match {match.match_id} to {slots.referee_id}: {error}")
+        slots.active.pop(match.match_id, None)
+        self.assigned_to.pop(match.match_id, None)
+        slots.failures += 1
+        slots.latency = max(slots.latency or 0.0, self.assignment_timeout)
+        backoff = self.failure_backoff * slots.failures
+        slots.retry_after = time.monotonic() + backoff
+
+        self._retry(slots, match, "failed assignment")
+        self.pump()
+        self._schedule_pump(backoff)
+
+    def _lease_expired(self, slots: RefereeSlots, match: Match):
+        logger.warning(f"No result for match {match.match_id} after {self.match_timeout}s, releasing referee slot")
+        if self.assigned_to.get(match.match_id) != slots.referee_id:
+            return
+        del self.assigned_to[match.match_id]
+        slots.active.pop(match.match_id, None)
+        # Treat a referee that accepts matches but never finishes them like a failing one
+        slots.failures += 1
+        slots.retry_after = time.monotonic() + self.failure_backoff * slots.failures
+        if match.status == MatchStatus.IN_PROGRESS:
+            # A result from the original referee is still accepted until another one reports
+            self.league_manager.set_match_status(match, MatchStatus.PENDING)
+        self._retry(slots, match, "expired lease")
+        self.pump()
+
+    def _retry(self, slots: RefereeSlots, match: Match, reason: str):
+        """Queue a match at another referee, or void it after max_attempts"""
+        attempts = self.attempts.get(match.match_id, 0) + 1
+        self.attempts[match.match_id] = attempts
+        if attempts >= self.max_attempts:
+            self._void(match, f"{attempts} attempts, the last one a {reason}")
+            return
+        # Retry first, at the least failing and least busy other referee
+        others = [r for r in self.referees.values() if r is not slots] or [slots]
+        target = min(others, key=lambda r: (r.failures, len(r.queue) + len(r.active)))
+        match.referee_id = target.referee_id
+        target.queue.appendleft(match)
+
+    def _void(self, match: Match, reason: str):
+        """Record a result for a match no referee could play, so its wave can complete"""
+        self.failed += 1
+        self.attempts.pop(match.match_id, None)
+        self.enqueued_at.pop(match.match_id, None)
+        logger.error(f"Giving up on match {match.match_id} after {reason}, recording it as void")
+        result = {"winner": None, "details": {"void": reason}}
+        task = asyncio.get_running_loop().create_task(
+            self.league_manager.update_match_result(match.match_id, result))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, capacity use and dispatch latency"""
+        return {
+            "queue_depth": sum(len(r.queue) for r in self.referees.values()),
+            "dispatched": self.dispatched,
+            "failed": self.failed,
+            "avg_queue_wait": self.queue_wait_total / self.dispatched if self.dispatched else 0.0,
+            "avg_assignment_latency": (self.assignment_latency_total / self.dispatched
+                                       if self.dispatched else 0.0),
+            "referees": {
+                referee_id: {
+                    "queue_depth": len(r.queue),
+                    "active": len(r.active),
+                    "capacity": r.capacity,
+                    "latency": r.latency
+                }
+                for referee_id, r in self.referees.items()
+            }
+        }
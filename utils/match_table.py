@@ -0,0 +1,356 @@
+"""
+Columnar storage for every match of a league
+"""
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models.league_models import Match, MatchStatus
+
+STATUSES = [MatchStatus.PENDING, MatchStatus.IN_PROGRESS, MatchStatus.COMPLETED]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Outcome column; VOID marks a match completed without being played
+NO_RESULT, DRAW, PLAYER1_WINS, PLAYER2_WINS, VOID = 0, 1, 2, 3, 4
+
+# Choices column: player1 choice in the low two bits, player2 in the next two
+CHOICES = [None, "even", "odd"]
+CHOICE_CODES = {choice: code for code, choice in enumerate(CHOICES)}
+
+
+COLUMNS = ("player1", "player2", "referee", "round", "wave", "status", "outcome",
+           "player1_points", "player2_points", "drawn_number", "choices")
+
+
+class MatchTable:
+    """
+    Struct-of-arrays table with one row per released match.
+
+    Players and referees are stored as integer indexes, status and result
+    fields as single bytes, and match IDs are derived from the row number,
+    so a completed match costs a few bytes instead of a Python object with
+    its own dict and strings. Status counts and scans run over a
+    bytearray at C speed.
+    """
+
+    def __init__(self, id_prefix: Optional[str] = None):
+        self.id_prefix = id_prefix or f"match_{uuid.uuid4().hex[:8]}_"
+
+        self.player_ids: List[str] = []
+        self.player_index: Dict[str, int] = {}
+        self.referee_ids: List[str] = []
+        self.referee_index: Dict[str, int] = {}
+
+        self.player1 = array("I")
+        self.player2 = array("I")
+        self.referee = array("H")
+        self.round = array("H")
+        self.wave = array("I")
+        self.status = bytearray()
+        self.outcome = bytearray()
+        self.player1_points = bytearray()
+        self.player2_points = bytearray()
+        self.drawn_number = bytearray()
+        self.choices = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    @staticmethod
+    def _intern(value: str, values: List[str], index: Dict[str, int]) -> int:
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(values)
+            values.append(value)
+        return position
+
+    def append(self, round_id: int, wave_id: int, player1_id: str, player2_id: str, referee_id: str) -> int:
+        """Add a pending match and return its row"""
+        self.player1.append(self._intern(player1_id, self.player_ids, self.player_index))
+        self.player2.append(self._intern(player2_id, self.player_ids, self.player_index))
+        self.referee.append(self._intern(referee_id, self.referee_ids, self.referee_index))
+        self.round.append(round_id)
+        self.wave.append(wave_id)
+        self.status.append(STATUS_CODES[MatchStatus.PENDING])
+        for column in (self.outcome, self.player1_points, self.player2_points, self.drawn_number, self.choices):
+            column.append(0)
+        return len(self.status) - 1
+
+    def match_id(self, row: int) -> str:
+        return f"{self.id_prefix}{row}"
+
+    def row_of(self, match_id: str) -> Optional[int]:
+        """Row of a match ID issued by this table, or None"""
+        if not match_id or not match_id.startswith(self.id_prefix):
+            return None
+        suffix = match_id[len(self.id_prefix):]
+        if not suffix.isdigit():
+            return None
+        row = int(suffix)
+        return row if row < len(self.status) else None
+
+    def create_match(self, round_id: int, wave_id: int, player1_id: str, player2_id: str, referee_id: str) -> Match:
+        """Append a row and return the live Match object for it"""
+        row = self.append(round_id, wave_id, player1_id, player2_id, referee_id)
+        return Match(self.match_id(row), round_id, player1_id, player2_id, referee_id, wave_id, row)
+
+    def set_status(self, row: int, status: MatchStatus):
+        self.status[row] = STATUS_CODES[status]
+
+    def get_status(self, row: int) -> MatchStatus:
+        return STATUSES[self.status[row]]
+
+    def set_referee(self, row: int, referee_id: str):
+        self.referee[row] = self._intern(referee_id, self.referee_ids, self.referee_index)
+
+    def record_result(self, row: int, result: Dict[str, Any]):
+        """
+        Pack a MATCH_RESULT_REPORT result into the result columns.
+
+        Every column value is checked before any is written, so a rejected
+        result leaves the row as it was. A void result (see is_void) is
+        stored as the VOID outcome.
+
+        Raises:
+            ValueError: If the winner is neither of the match's players, or a
+                score, the drawn number or a section of the result does not
+                fit its column
+        """
+        player1_id = self.player_ids[self.player1[row]]
+        player2_id = self.player_ids[self.player2[row]]
+        match_id = self.match_id(row)
+        if not isinstance(result, dict):
+            raise ValueError(f"Result of {match_id} is not an object")
+        winner = result.get("winner")
+        if winner is None:
+            outcome = DRAW
+        elif winner == player1_id:
+            outcome = PLAYER1_WINS
+        elif winner == player2_id:
+            outcome = PLAYER2_WINS
+        else:
+            raise ValueError(f"Winner {winner!r} of {match_id} is not one of its players")
+        score = _section(result, "score", match_id)
+        player1_points = _byte(score.get(player1_id, 0), f"Score of {player1_id} in {match_id}")
+        player2_points = _byte(score.get(player2_id, 0), f"Score of {player2_id} in {match_id}")
+        details = _section(result, "details", match_id)
+        if details.get("void"):
+            if winner is not None:
+                raise ValueError(f"Void result of {match_id} names a winner")
+            outcome = VOID
+        drawn_number = _byte(details.get("drawn_number") or 0, f"Drawn number of {match_id}")
+        choices = _section(details, "choices", match_id)
+        choice_codes = (CHOICE_CODES.get(_choice(choices.get(player1_id)), 0)
+                        | CHOICE_CODES.get(_choice(choices.get(player2_id)), 0) << 2)
+
+        self.outcome[row] = outcome
+        self.player1_points[row] = player1_points
+        self.player2_points[row] = player2_points
+        self.drawn_number[row] = drawn_number
+        self.choices[row] = choice_codes
+
+    def result(self, row: int) -> Optional[Dict[str, Any]]:
+        """Unpack the stored result of a match (None before it is reported)"""
+        outcome = self.outcome[row]
+        if outcome == NO_RESULT:
+            return None
+        player1_id = self.player_ids[self.player1[row]]
+        player2_id = self.player_ids[self.player2[row]]
+        if outcome == VOID:
+            return {"winner": None, "score": {}, "details": {"void": True}}
+        return {
+            "winner": (None, None, player1_id, player2_id)[outcome],
+            "score": {player1_id: self.player1_points[row], player2_id: self.player2_points[row]},
+            "details": {
+                "drawn_number": self.drawn_number[row] or None,
+                "choices": {player1_id: CHOICES[self.choices[row] & 3], player2_id: CHOICES[self.choices[row] >> 2]}
+            }
+        }
+
+    def row_data(self, row: int) -> Dict[str, Any]:
+        """Schedule entry for one row"""
+        return {
+            "match_id": self.match_id(row),
+            "round_id": self.round[row],
+            "wave_id": self.wave[row],
+            "player1_id": self.player_ids[self.player1[row]],
+            "player2_id": self.player_ids[self.player2[row]],
+            "referee_id": self.referee_ids[self.referee[row]],
+            "status": STATUSES[self.status[row]].value
+        }
+
+    def count_status(self, status: MatchStatus) -> int:
+        return self.status.count(STATUS_CODES[status])
+
+    def rows_with_status(self, status: MatchStatus) -> Iterator[int]:
+        """Rows with a given status, found with bytearray.find"""
+        code = bytes([STATUS_CODES[status]])
+        row = self.status.find(code)
+        while row != -1:
+            yield row
+            row = self.status.find(code, row + 1)
+
+    def find_rows(self, start: int = 0, round_id: Optional[int] = None, player_id: Optional[str] = None,
+                  status: Optional[MatchStatus] = None, referee_id: Optional[str] = None) -> Iterator[int]:
+        """
+        Rows from start on that match every given filter, in schedule order.
+
+        Rows are appended round by round, so a round is a contiguous range
+        found by bisection. Within it the most selective filter (player,
+        then referee, then status) drives a scan with array.index or
+        bytearray.find, and the remaining filters are checked per row.
+        Rows appended while the iterator is live are included: the last
+        round and an unfiltered tail are bounded by the table's current
+        length at each step, not at the call.
+        """
+        stop = open_round = None
+        if round_id is not None:
+            start = max(start, bisect_left(self.round, round_id))
+            stop = bisect_right(self.round, round_id)
+            if stop == len(self.round):
+                # The last round so far can still grow; stop at the next one
+                stop, open_round = None, round_id
+        player = referee = code = None
+        if player_id is not None:
+            player = self.player_index.get(player_id)
+            if player is None:
+                return
+        if referee_id is not None:
+            referee = self.referee_index.get(referee_id)
+            if referee is None:
+                return
+        if status is not None:
+            code = STATUS_CODES[status]
+
+        if player is not None:
+            rows = _merged_positions(self.player1, self.player2, player, start, stop)
+        elif referee is not None:
+            rows = _positions(self.referee, referee, start, stop)
+        elif code is not None:
+            rows = _positions(self.status, code, start, stop)
+        else:
+            rows = _live_range(self.status, start, stop)
+        for row in rows:
+            if open_round is not None and self.round[row] != open_round:
+                return
+            if ((referee is None or self.referee[row] == referee)
+                    and (code is None or self.status[row] == code)):
+                yield row
+
+    def nbytes(self) -> int:
+        """Bytes used by the column buffers"""
+        columns = (self.player1, self.player2, self.referee, self.round, self.wave)
+        return (sum(column.itemsize * len(column) for column in columns)
+                + 6 * len(self.status))
+
+    def to_snapshot(self) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+        """(JSON-serializable state, raw column buffers) for persistence"""
+        state = {"id_prefix": self.id_prefix, "player_ids": list(self.player_ids),
+                 "referee_ids": list(self.referee_ids)}
+        return state, {name: bytes(getattr(self, name)) for name in COLUMNS}
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any], columns: Dict[str, bytes]) -> "MatchTable":
+        table = cls(state["id_prefix"])
+        for player_id in state["player_ids"]:
+            cls._intern(player_id, table.player_ids, table.player_index)
+        for referee_id in state["referee_ids"]:
+            cls._intern(referee_id, table.referee_ids, table.referee_index)
+        for name in COLUMNS:
+            column = getattr(table, name)
+            if isinstance(column, bytearray):
+                column.extend(columns[name])
+            else:
+                column.frombytes(columns[name])
+        return table
+
+    def live_matches(self) -> List[Match]:
+        """Match objects for every row that is not completed, in schedule order"""
+        rows = sorted([*self.rows_with_status(MatchStatus.PENDING), *self.rows_with_status(MatchStatus.IN_PROGRESS)])
+        matches = []
+        for row in rows:
+            match = Match(self.match_id(row), self.round[row], self.player_ids[self.player1[row]],
+                          self.player_ids[self.player2[row]], self.referee_ids[self.referee[row]],
+                          self.wave[row], row)
+            match.status = STATUSES[self.status[row]]
+            matches.append(match)
+        return matches
+
+
+def is_void(result: Dict[str, Any]) -> bool:
+    """Whether a result completes a match that was never played (details.void)"""
+    details = result.get("details")
+    return isinstance(details, dict) and bool(details.get("void"))
+
+
+def _section(result: Dict[str, Any], key: str, match_id: str) -> Dict[str, Any]:
+    """An optional object inside a result ({} when it is missing)"""
+    section = result.get(key)
+    if section is None:
+        return {}
+    if not isinstance(section, dict):
+        raise ValueError(f"'{key}' of {match_id}'s result is not an object")
+    return section
+
+
+def _byte(value: Any, what: str) -> int:
+    """value if it fits a bytearray column"""
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value < 0x100:
+        raise ValueError(f"{what} must be an integer from 0 to 255, got {value!r}")
+    return value
+
+
+def _choice(value: Any) -> Optional[str]:
+    # Unhashable choices would fail the CHOICE_CODES lookup; unknown ones are stored as no choice
+    return value if isinstance(value, str) else None
+
+
+def _live_range(column, start: int, stop: Optional[int]) -> Iterator[int]:
+    """range(start, stop), with stop=None following the column's current length"""
+    if stop is not None:
+        yield from range(start, stop)
+        return
+    while start < len(column):
+        end = len(column)
+        yield from range(start, end)
+        start = end
+
+
+def _merged_positions(first, second, value: int, start: int, stop: Optional[int]) -> Iterator[int]:
+    """Indexes of value in either of two array columns, in order"""
+    columns = (first, second)
+    found: List[Optional[int]] = [None, None]  # next known match per column
+    scanned = [start, start]  # no match in columns[i][start:scanned[i]] beyond found[i]
+    while True:
+        end = len(first) if stop is None else stop
+        for i, column in enumerate(columns):
+            if found[i] is None and scanned[i] < end:
+                try:
+                    found[i] = column.index(value, scanned[i], end)
+                except ValueError:
+                    scanned[i] = end
+        row = min((row for row in found if row is not None), default=None)
+        if row is None:
+            return
+        for i in (0, 1):
+            if found[i] == row:
+                found[i], scanned[i] = None, row + 1
+        yield row
+
+
+def _positions(column, value: int, start: int, stop: Optional[int]) -> Iterator[int]:
+    """Indexes of value in an array or bytearray column, searched in C"""
+    search = column.find if isinstance(column, bytearray) else column.index
+    while True:
+        end = len(column) if stop is None else stop
+        if start >= end:
+            return
+        try:
+            row = search(value, start, end)
+        except ValueError:
+            return
+        if row == -1:
+            return
+        yield row
+        start = row + 1
@@ -1,29 +1,34 @@
 """
 PlayerAgent class implementation
 """
-import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from uuid import uuid4
 
-import requests
-
 from strategies.player_strategies import choose_parity_random, choose_parity_alternating, choose_parity_history
 from utils import player_handlers
-from utils.jsonrpc_utils import wrap_request, wrap_response, unwrap_message, get_request_id, is_jsonrpc_message
+from utils.jsonrpc_utils import (
+    wrap_request, wrap_response, unwrap_message, get_request_id, is_jsonrpc_message,
+    is_notification, is_batch, batch_response, invalid_request_response
+)
+from utils.codec import Encoded, build_message
+from utils.transport import Transport, get_default_transport
+from utils.jsonl_writer import JsonlWriter, message_type_of
 
 
 class PlayerAgent:
     """Player Agent for Even/Odd League"""
 
-    def __init__(self, display_name: str, port: int, strategy: str):
+    def __init__(self, display_name: str, port: int, strategy: str,
+                 transport: Optional[Transport] = None):
         self.display_name = display_name
         self.port = port
         self.strategy = strategy
         self.agent_endpoint = f"http://localhost:{port}/mcp"
         self.league_manager_url = "http://localhost:8000/mcp"
+        self.transport = transport or get_default_transport()
 
         self.player_id: Optional[str] = None
         self.auth_token: Optional[str] = None
@@ -34,9 +39,15 @@ class PlayerAgent:
         self.current_match: Optional[Dict] = None
 
         self.stats = {"wins": 0, "losses": 0, "draws": 0, "total_games": 0}
+        # Local copy of the league table, kept current from LEAGUE_STANDINGS_UPDATE deltas
+        self.standings: Dict[str, Dict] = {}
+        self.standings_version = 0
+        # Broadcast subscriptions declared at registration (None: the league's default)
+        self.subscriptions: Optional[Dict] = None
 
         Path("jsonl").mkdir(exist_ok=True)
         self.log_file = Path(f"jsonl/player_{port}.jsonl")
+        self.log_writer = JsonlWriter(self.log_file)
         self.setup_logging()
 
     def setup_logging(self):
@@ -45,8 +56,7 @@ class PlayerAgent:
 
     def log_message(self, message: Dict, direction: str):
         log_entry = {"timestamp": datetime.now(timezone.utc).isoformat(), "direction": direction, "message": message}
-        with open(self.log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self.log_writer.write(log_entry, message_type_of(message))
 
     def generate_timestamp(self) -> str:
         return datetime.now(timezone.utc).isoformat()
@@ -54,16 +64,20 @@ class PlayerAgent:
     def generate_conversation_id(self) -> str:
         return str(uuid4())
 
-    def send_message(self, url: str, message: Dict, request_id: int = 1) -> Optional[Dict]:
-        # Wrap in JSON-RPC 2.0 format
-        jsonrpc_message = wrap_request(message, request_id)
+    def create_message(self, message_type: str, **fields) -> Dict:
+        """Create a message with standard fields, checked against its schema"""
+        return build_message(message_type, f"player:{self.player_id}", self.generate_timestamp(), **fields)
+
+    async def send_message(self, url: str, message: Dict, request_id: int = 1) -> Optional[Dict]:
+        # Wrap in JSON-RPC 2.0 format; encoded once for the wire and the log
+        jsonrpc_message = Encoded(wrap_request(message, request_id))
         self.log_message(jsonrpc_message, "outgoing")
         self.logger.info(f"Sending {message['message_type']} to {url}")
 
         try:
-            response = requests.post(url, json=jsonrpc_message, timeout=10)
-            response.raise_for_status()
-            result = response.json()
+            result = await self.transport.post(url, jsonrpc_message, timeout=10)
+            if result is None:
+                return None
             self.log_message(result, "incoming")
 
             # Unwrap JSON-RPC response
@@ -90,25 +104,27 @@ class PlayerAgent:
         self.logger.info(f"Chose parity: {choice} (strategy: {self.strategy})")
         return choice
 
-    def register_with_league(self):
+    async def register_with_league(self):
         """Register with league manager"""
         self.logger.info("Registering with league manager...")
 
-        message = {
-            "protocol": "league.v2",
-            "message_type": "LEAGUE_REGISTER_REQUEST",
-            "sender": f"player:{self.display_name}",
-            "timestamp": self.generate_timestamp(),
-            "conversation_id": self.generate_conversation_id(),
-            "player_meta": {
-                "display_name": self.display_name,
-                "version": "1.0.0",
-                "game_types": ["even_odd"],
-                "contact_endpoint": self.agent_endpoint
-            }
+        player_meta = {
+            "display_name": self.display_name,
+            "version": "1.0.0",
+            "game_types": ["even_odd"],
+            "contact_endpoint": self.agent_endpoint
         }
-
-        response = self.send_message(self.league_manager_url, message, request_id=1)
+        if self.subscriptions is not None:
+            player_meta["subscriptions"] = self.subscriptions
+        message = build_message(
+            "LEAGUE_REGISTER_REQUEST",
+            f"player:{self.display_name}",
+            self.generate_timestamp(),
+            conversation_id=self.generate_conversation_id(),
+            player_meta=player_meta
+        )
+
+        response = await self.send_message(self.league_manager_url, message, request_id=1)
 
         if response and response.get("message_type") == "LEAGUE_REGISTER_RESPONSE":
             self.player_id = response.get("player_id")
@@ -119,11 +135,42 @@ class PlayerAgent:
             self.logger.error("Failed to register with league manager")
             return False
 
-    def handle_message(self, message: Dict) -> Optional[Dict]:
-        """Route incoming message to appropriate handler"""
+    async def update_subscriptions(self, subscriptions: Dict) -> bool:
+        """Change which league broadcasts this player receives (topics left out are kept)"""
+        message = self.create_message(
+            "LEAGUE_SUBSCRIBE",
+            conversation_id=self.generate_conversation_id(),
+            player_id=self.player_id,
+            auth_token=self.auth_token,
+            subscriptions=subscriptions
+        )
+        response = await self.send_message(self.league_manager_url, message)
+        if response and response.get("message_type") == "LEAGUE_SUBSCRIBE_RESPONSE":
+            self.subscriptions = response.get("subscriptions")
+            # The next update carries the new selection, possibly at the version already held
+            self.standings_version = 0
+            self.logger.info(f"Subscribed to {self.subscriptions}")
+            return True
+        self.logger.error(f"Failed to update subscriptions: {response}")
+        return False
+
+    def handle_message(self, message: Union[Dict, List[Dict]]) -> Optional[Union[Dict, List[Dict]]]:
+        """Route an incoming message or batch array to the appropriate handlers"""
+        if is_batch(message):
+            if not message:
+                return invalid_request_response()
+            return batch_response([self.handle_single_message(entry) if isinstance(entry, dict)
+                                   else invalid_request_response() for entry in message])
+        if not isinstance(message, dict):
+            return invalid_request_response()
+        return self.handle_single_message(message)
+
+    def handle_single_message(self, message: Dict) -> Optional[Dict]:
+        """Route one incoming message; notifications get no response"""
         self.log_message(message, "incoming")
 
         # Unwrap JSON-RPC if needed
+        notification = is_notification(message)
         request_id = get_request_id(message) if is_jsonrpc_message(message) else 1
         if is_jsonrpc_message(message):
             message = unwrap_message(message)
@@ -143,6 +190,9 @@ class PlayerAgent:
         elif message_type == "LEAGUE_STANDINGS_UPDATE":
             player_handlers.handle_league_standings_update(self, message)
             result = {"status": "received"}
+        elif message_type == "ROUND_COMPLETED":
+            player_handlers.handle_round_completed(self, message)
+            result = {"status": "received"}
         elif message_type == "LEAGUE_COMPLETED":
             player_handlers.handle_league_completed(self, message)
             result = {"status": "received"}
@@ -150,5 +200,8 @@ class PlayerAgent:
             self.logger.warning(f"Unknown message type: {message_type}")
             result = {"status": "unknown_message_type"}
 
+        if notification:
+            return None
+
         # Wrap result in JSON-RPC response
         return wrap_response(result, request_id)
@@ -4,6 +4,9 @@ Message handlers for Player Agent
 from typing import Dict, Optional
 import logging
 
+from utils.codec import build_message
+from utils.standings_feed import apply_standings_delta
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,18 +43,17 @@ def handle_game_invitation(player_agent, message: Dict) -> Dict:
     logger.info(f"Invited to match {match_id} as {role_in_match} vs {opponent_id}")
 
     arrival_timestamp = player_agent.generate_timestamp()
-    return {
-        "protocol": "league.v2",
-        "message_type": "GAME_JOIN_ACK",
-        "sender": f"player:{player_agent.player_id}",
-        "timestamp": arrival_timestamp,
-        "conversation_id": message.get("conversation_id"),
-        "auth_token": player_agent.auth_token,
-        "match_id": match_id,
-        "player_id": player_agent.player_id,
-        "arrival_timestamp": arrival_timestamp,
-        "accept": True
-    }
+    return build_message(
+        "GAME_JOIN_ACK",
+        f"player:{player_agent.player_id}",
+        arrival_timestamp,
+        conversation_id=message.get("conversation_id"),
+        auth_token=player_agent.auth_token,
+        match_id=match_id,
+        player_id=player_agent.player_id,
+        arrival_timestamp=arrival_timestamp,
+        accept=True
+    )
 
 
 def handle_choose_parity_call(player_agent, message: Dict) -> Dict:
@@ -60,16 +62,13 @@ def handle_choose_parity_call(player_agent, message: Dict) -> Dict:
     match_id = message.get("match_id")
     timeout_seconds = message.get("timeout_seconds", 30)
     choice = player_agent.choose_parity()
-    response = {
-        "protocol": "league.v2",
-        "message_type": "CHOOSE_PARITY_RESPONSE",
-        "sender": f"player:{player_agent.player_id}",
-        "timestamp": player_agent.generate_timestamp(),
-        "conversation_id": message.get("conversation_id"),
-        "auth_token": player_agent.auth_token,
-        "match_id": match_id,
-        "choice": choice
-    }
+    response = player_agent.create_message(
+        "CHOOSE_PARITY_RESPONSE",
+        conversation_id=message.get("conversation_id"),
+        auth_token=player_agent.auth_token,
+        match_id=match_id,
+        choice=choice
+    )
 
     logger.info(f"Responding with choice: {choice}")
     return response
@@ -141,37 +140,60 @@ def handle_game_over(player_agent, message: Dict) -> Dict:
     player_agent.current_match = None
 
     # Send acknowledgment back to referee
-    return {
-        "protocol": "league.v2",
-        "message_type": "ACK",
-        "sender": f"player:{player_agent.player_id}",
-        "timestamp": player_agent.generate_timestamp(),
-        "conversation_id": message.get("conversation_id"),
-        "status": "received"
-    }
+    return player_agent.create_message("ACK", conversation_id=message.get("conversation_id"), status="received")
 
 
 def handle_league_standings_update(player_agent, message: Dict):
     """
     Process LEAGUE_STANDINGS_UPDATE message and log player's current position.
 
-    Searches for this player's entry in the standings and logs their rank
-    and statistics.
+    Updates with base_version 0 carry the full table and replace the local
+    copy. Otherwise they carry only the players whose stats changed since
+    base_version, and the ranks of the rest are recomputed locally. A
+    delta applies to a copy at any version from base_version up to the
+    new one. Updates that are not newer than the local copy, full tables
+    included, are ignored: broadcasts are delivered concurrently, so an
+    older one can arrive late. A gap is left for the next full table to
+    repair. Updates without versions (from older league managers) always
+    replace the local copy.
 
     Args:
         player_agent: PlayerAgent instance
         message: LEAGUE_STANDINGS_UPDATE message containing standings array
     """
     logger.info("Received LEAGUE_STANDINGS_UPDATE")
-    standings = message.get("standings", [])
-
-    # Find this player in the standings and log their position
-    for player in standings:
-        if player.get("player_id") == player_agent.player_id:
-            logger.info(f"Current standing: #{player.get('rank')} - "
-                       f"W:{player.get('wins')} L:{player.get('losses')} "
-                       f"D:{player.get('draws')} Pts:{player.get('points')}")
-            break
+    rows = message.get("standings", [])
+    version = message.get("standings_version")
+    base_version = message.get("base_version") or 0
+
+    if version is None:
+        player_agent.standings = {row.get("player_id"): row for row in rows}
+    elif version <= player_agent.standings_version:
+        logger.debug(f"Ignoring stale standings version {version}")
+        return
+    elif base_version == 0:
+        player_agent.standings = {row.get("player_id"): row for row in rows}
+    elif base_version > player_agent.standings_version:
+        logger.warning(f"Missed standings versions {player_agent.standings_version + 1}-{base_version}, "
+                       "waiting for a full table")
+        return
+    else:
+        apply_standings_delta(player_agent.standings, rows)
+    player_agent.standings_version = version or 0
+
+    # Log this player's position from the local copy
+    player = player_agent.standings.get(player_agent.player_id)
+    if player is not None:
+        logger.info(f"Current standing: #{player.get('rank')} - "
+                   f"W:{player.get('wins')} L:{player.get('losses')} "
+                   f"D:{player.get('draws')} Pts:{player.get('points')}")
+
+
+def handle_round_completed(player_agent, message: Dict):
+    """Handle round completion notification"""
+    logger.info(f"Round {message.get('round_id')} completed: "
+                f"{message.get('matches_played')} matches played, "
+                f"next round: {message.get('next_round_id')}")
 
 
 def handle_league_completed(player_agent, message: Dict):
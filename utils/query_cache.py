@@ -0,0 +1,85 @@
+"""
+Versioned cache of encoded LEAGUE_QUERY results
+"""
+import secrets
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils.codec import Encoded
+
+
+class CachedResult:
+    """A query result built at one state version, with its encoding"""
+    __slots__ = ("version", "encoded", "size", "etag")
+
+    def __init__(self, version: int, encoded: Encoded, etag: str):
+        self.version = version
+        self.encoded = encoded
+        self.size = len(encoded.data)
+        self.etag = etag
+
+    @property
+    def data(self) -> Any:
+        return self.encoded.message
+
+
+class QueryCache:
+    """
+    Query results by key, valid while the league state version is unchanged.
+
+    A result is built and JSON-encoded once per state version; repeated
+    queries reuse the object and its bytes (the binary encoding is added on
+    first use). Entries are evicted least recently used first once their
+    JSON encodings exceed max_bytes, and results larger than that are
+    never kept.
+
+    ETags combine a per-process epoch with the state version, so a tag
+    from before a restart never matches.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._epoch = secrets.token_hex(4)
+        self._entries: "OrderedDict[Hashable, CachedResult]" = OrderedDict()
+
+    def get(self, key: Hashable, version: int, build: Callable[[], Any]) -> CachedResult:
+        """Cached result for key at version, built (and cached if it fits) on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        if entry is not None:
+            self._remove(key)
+        entry = CachedResult(version, Encoded(build()), f'"{self._epoch}-{version}"')
+        if entry.size <= self.max_bytes:
+            self._entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def _remove(self, key: Hashable):
+        self.size -= self._entries.pop(key).size
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value lists etag (or *)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
@@ -2,22 +2,28 @@
 RefereeServer class implementation
 """
 import asyncio
-import json
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Optional, Any
-
-import requests
+from typing import Dict, List, Optional, Any, Union
 
 from models.referee_models import GameSession
 from game import game_logic
-from utils.jsonrpc_utils import wrap_request, wrap_response, unwrap_message, get_request_id, is_jsonrpc_message
+from game.batch_referee import BatchReferee
+from utils.jsonrpc_utils import (
+    wrap_request, wrap_response, unwrap_message, get_request_id, is_jsonrpc_message,
+    is_notification, is_batch, batch_response, invalid_request_response
+)
+from utils.codec import Encoded, build_message
+from utils.transport import Transport, get_default_transport
+from utils.jsonl_writer import JsonlWriter, message_type_of
 
 
 class RefereeServer:
     """Referee server managing Even/Odd games"""
 
-    def __init__(self, name: str = "Referee Alpha", port: int = 8001):
+    def __init__(self, name: str = "Referee Alpha", port: int = 8001,
+                 transport: Optional[Transport] = None, max_concurrent_matches: int = 2,
+                 batch_size: Optional[int] = None):
         self.referee_id: Optional[str] = None
         self.auth_token: Optional[str] = None
         self.league_manager_url = "http://localhost:8000/mcp"
@@ -26,9 +32,15 @@ class RefereeServer:
         import os
         os.makedirs("jsonl", exist_ok=True)
         self.log_file = f"jsonl/referee_{port}.jsonl"
+        self.log_writer = JsonlWriter(self.log_file)
 
         self.name = name
         self.port = port
+        self.endpoint = f"http://localhost:{port}/mcp"
+        self.max_concurrent_matches = max_concurrent_matches
+        self.transport = transport or get_default_transport()
+        # Batch mode: resolve and report games in bulk instead of one by one
+        self.batch_referee = BatchReferee(self, batch_size) if batch_size else None
 
     def log_message(self, message: Dict[str, Any], direction: str = "sent"):
         """Log message to JSON Lines file"""
@@ -37,36 +49,28 @@ class RefereeServer:
             "direction": direction,
             "message": message
         }
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        self.log_writer.write(log_entry, message_type_of(message))
 
     def create_message(self, message_type: str, **kwargs) -> Dict[str, Any]:
-        """Create a message with standard fields"""
-        message = {
-            "protocol": "league.v2",
-            "message_type": message_type,
-            "sender": f"referee:{self.referee_id}" if self.referee_id else "referee:UNREGISTERED",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            **kwargs
-        }
-        return message
+        """Create a message with standard fields, checked against its schema"""
+        return build_message(message_type,
+                             f"referee:{self.referee_id}" if self.referee_id else "referee:UNREGISTERED",
+                             datetime.now(timezone.utc).isoformat(), **kwargs)
 
-    def send_message(self, url: str, message: Dict[str, Any], request_id: int = 1) -> Optional[Dict[str, Any]]:
+    async def send_message(self, url: str, message: Dict[str, Any], request_id: int = 1) -> Optional[Dict[str, Any]]:
         """Send HTTP POST request with message in JSON-RPC 2.0 format"""
         # Add auth token if needed
         if self.auth_token and "auth_token" not in message:
             message["auth_token"] = self.auth_token
 
-        # Wrap in JSON-RPC 2.0 format
-        jsonrpc_message = wrap_request(message, request_id)
+        # Wrap in JSON-RPC 2.0 format; encoded once for the wire and the log
+        jsonrpc_message = Encoded(wrap_request(message, request_id))
         self.log_message(jsonrpc_message, "sent")
 
-        headers = {"Content-Type": "application/json"}
-
         try:
-            response = requests.post(url, json=jsonrpc_message, headers=headers, timeout=30)
-            response.raise_for_status()
-            response_data = response.json()
+            response_data = await self.transport.post(url, jsonrpc_message, timeout=30)
+            if response_data is None:
+                return None
             self.log_message(response_data, "received")
 
             # Unwrap JSON-RPC response
@@ -86,12 +90,12 @@ class RefereeServer:
                 "display_name": self.name,
                 "version": "1.0.0",
                 "game_types": ["even_odd"],
-                "contact_endpoint": f"http://localhost:{self.port}/mcp",
-                "max_concurrent_matches": 2
+                "contact_endpoint": self.endpoint,
+                "max_concurrent_matches": self.max_concurrent_matches
             }
         )
 
-        response = self.send_message(self.league_manager_url, message, request_id=1)
+        response = await self.send_message(self.league_manager_url, message, request_id=1)
         if response and response.get("message_type") == "REFEREE_REGISTER_RESPONSE":
             self.referee_id = response.get("referee_id")
             self.auth_token = response.get("auth_token")
@@ -121,21 +125,32 @@ class RefereeServer:
 
         asyncio.create_task(game_logic.run_game(self, game))
 
-        return {
-            "protocol": "league.v2",
-            "message_type": "MATCH_ASSIGNMENT_ACK",
-            "sender": f"referee:{self.referee_id}",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "conversation_id": data.get("conversation_id"),
-            "match_id": match_id,
-            "status": "accepted"
-        }
-
-    async def handle_message(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle incoming JSON-RPC messages"""
+        return self.create_message("MATCH_ASSIGNMENT_ACK", conversation_id=data.get("conversation_id"),
+                                   match_id=match_id, status="accepted")
+
+    async def handle_message(self, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Optional[Any]:
+        """
+        Handle incoming JSON-RPC messages.
+
+        Accepts a single message or a batch array. Notifications are
+        processed without building a response; None is returned when
+        nothing needs to be sent back.
+        """
+        if is_batch(data):
+            if not data:
+                return invalid_request_response()
+            return batch_response([await self.handle_single_message(message) if isinstance(message, dict)
+                                   else invalid_request_response() for message in data])
+        if not isinstance(data, dict):
+            return invalid_request_response()
+        return await self.handle_single_message(data)
+
+    async def handle_single_message(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Handle one JSON-RPC message"""
         self.log_message(data, "received")
 
         # Unwrap JSON-RPC if needed
+        notification = is_notification(data)
         request_id = get_request_id(data) if is_jsonrpc_message(data) else 1
         if is_jsonrpc_message(data):
             data = unwrap_message(data)
@@ -158,11 +173,8 @@ class RefereeServer:
                     game.player2_joined = True
                 print(f"Player {player_id} joined game {match_id}")
 
-        result = {
-            "protocol": "league.v2",
-            "message_type": "ACK",
-            "sender": f"referee:{self.referee_id}",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "conversation_id": data.get("conversation_id", str(uuid.uuid4()))
-        }
+        if notification:
+            return None
+
+        result = self.create_message("ACK", conversation_id=data.get("conversation_id", str(uuid.uuid4())))
         return wrap_response(result, request_id)
@@ -0,0 +1,135 @@
+"""
+Secondary indexes and completion counters over the league schedule
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+from models.league_models import Match, MatchStatus
+
+
+class ScheduleIndex:
+    """
+    Schedule lookups maintained on every match status change.
+
+    Keeps each player's pending matches in schedule order, plus scheduled
+    and completed match counters per round, per wave and for the whole
+    league, so completion checks and next-match lookups never scan the
+    schedule. Only counters are kept for matches that are no longer
+    pending.
+    """
+
+    def __init__(self, matches_per_round: Optional[int] = None, rounds: int = 0):
+        """
+        Args:
+            matches_per_round: Planned matches per round when the schedule is
+                generated lazily (None means only indexed matches count)
+            rounds: Planned number of rounds
+        """
+        self.matches_per_round = matches_per_round
+        self.rounds = rounds
+        self.scheduled_by_round: Dict[int, int] = {}
+        self.scheduled_by_wave: Dict[Tuple[int, int], int] = {}
+        self.completed_by_wave: Dict[Tuple[int, int], int] = {}
+        self.pending_by_player: Dict[str, Dict[str, Match]] = {}
+        self.completed_by_round: Dict[int, int] = {}
+        self.total_matches = 0
+        self.completed_matches = 0
+
+    def add(self, match: Match):
+        """Index a newly scheduled match"""
+        self.scheduled_by_round[match.round_id] = self.scheduled_by_round.get(match.round_id, 0) + 1
+        self.completed_by_round.setdefault(match.round_id, 0)
+        wave = (match.round_id, match.wave_id)
+        self.scheduled_by_wave[wave] = self.scheduled_by_wave.get(wave, 0) + 1
+        self.completed_by_wave.setdefault(wave, 0)
+        self.total_matches += 1
+        if match.status == MatchStatus.PENDING:
+            for player_id in (match.player1_id, match.player2_id):
+                self.pending_by_player.setdefault(player_id, {})[match.match_id] = match
+        elif match.status == MatchStatus.COMPLETED:
+            self._count_completed(match, 1)
+
+    def set_status(self, match: Match, status: MatchStatus):
+        """Change a match status and update the indexes accordingly"""
+        old_status = match.status
+        if old_status == status:
+            return
+        match.status = status
+
+        if old_status == MatchStatus.PENDING:
+            for player_id in (match.player1_id, match.player2_id):
+                self.pending_by_player.get(player_id, {}).pop(match.match_id, None)
+        elif status == MatchStatus.PENDING:
+            for player_id in (match.player1_id, match.player2_id):
+                self.pending_by_player.setdefault(player_id, {})[match.match_id] = match
+
+        if status == MatchStatus.COMPLETED:
+            self._count_completed(match, 1)
+        elif old_status == MatchStatus.COMPLETED:
+            self._count_completed(match, -1)
+
+    def _count_completed(self, match: Match, delta: int):
+        self.completed_by_round[match.round_id] += delta
+        self.completed_by_wave[(match.round_id, match.wave_id)] += delta
+        self.completed_matches += delta
+
+    @property
+    def planned_matches(self) -> int:
+        """Number of matches in the whole schedule, including unreleased ones"""
+        if self.matches_per_round is None:
+            return self.total_matches
+        return self.matches_per_round * self.rounds
+
+    def round_size(self, round_id: int) -> int:
+        """Number of matches scheduled in a round"""
+        if self.matches_per_round is None:
+            return self.scheduled_by_round.get(round_id, 0)
+        return self.matches_per_round if 1 <= round_id <= self.rounds else 0
+
+    def is_round_complete(self, round_id: int) -> bool:
+        """Check if a round has matches and all of them are completed"""
+        size = self.round_size(round_id)
+        return size > 0 and self.completed_by_round.get(round_id, 0) == size
+
+    def is_wave_complete(self, round_id: int, wave_id: int) -> bool:
+        """Check if a wave has matches and all of them are completed"""
+        wave = (round_id, wave_id)
+        size = self.scheduled_by_wave.get(wave, 0)
+        return size > 0 and self.completed_by_wave[wave] == size
+
+    def is_league_complete(self) -> bool:
+        """Check if every scheduled match is completed"""
+        return self.completed_matches == self.planned_matches
+
+    def next_pending(self, player_id: str) -> Optional[Match]:
+        """Earliest pending match (in schedule order) for a player"""
+        pending = self.pending_by_player.get(player_id)
+        if not pending:
+            return None
+        return next(iter(pending.values()))
+
+    def to_state(self) -> Dict[str, Any]:
+        """Counters as JSON-serializable data (pending matches are rebuilt from live matches)"""
+        return {
+            "matches_per_round": self.matches_per_round,
+            "rounds": self.rounds,
+            "scheduled_by_round": list(self.scheduled_by_round.items()),
+            "completed_by_round": list(self.completed_by_round.items()),
+            "scheduled_by_wave": [[*wave, count] for wave, count in self.scheduled_by_wave.items()],
+            "completed_by_wave": [[*wave, count] for wave, count in self.completed_by_wave.items()],
+            "total_matches": self.total_matches,
+            "completed_matches": self.completed_matches
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], live_matches: Iterable[Match]) -> "ScheduleIndex":
+        index = cls(state["matches_per_round"], state["rounds"])
+        index.scheduled_by_round = {round_id: count for round_id, count in state["scheduled_by_round"]}
+        index.completed_by_round = {round_id: count for round_id, count in state["completed_by_round"]}
+        index.scheduled_by_wave = {(round_id, wave_id): count for round_id, wave_id, count in state["scheduled_by_wave"]}
+        index.completed_by_wave = {(round_id, wave_id): count for round_id, wave_id, count in state["completed_by_wave"]}
+        index.total_matches = state["total_matches"]
+        index.completed_matches = state["completed_matches"]
+        for match in live_matches:
+            if match.status == MatchStatus.PENDING:
+                for player_id in (match.player1_id, match.player2_id):
+                    index.pending_by_player.setdefault(player_id, {})[match.match_id] = match
+        return index
@@ -0,0 +1,122 @@
+"""
+Round-robin scheduling for the league
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class LazySchedule:
+    """
+    Round-robin schedule generated one wave at a time.
+
+    Uses the circle method: the first player stays fixed while the others
+    rotate one position per wave. Every pair of players meets exactly once
+    per round and no player appears twice in the same wave, so all matches
+    of a wave can run in parallel. With an odd number of players one
+    player sits out each wave.
+
+    Nothing is precomputed beyond the player order: the pairings of any
+    wave are derived directly from its index, and the only progress state
+    is the cursor of the next wave to release.
+    """
+
+    def __init__(self, player_ids: Sequence[str], rounds: int):
+        self.player_ids: List[Optional[str]] = list(player_ids)
+        self.num_players = len(self.player_ids)
+        if self.num_players % 2:
+            self.player_ids.append(None)  # Bye
+        self.positions: Dict[str, int] = {
+            player_id: position for position, player_id in enumerate(self.player_ids) if player_id is not None
+        }
+        self.rounds = rounds
+        self.cursor = 0
+
+    @property
+    def circle_size(self) -> int:
+        return len(self.player_ids)
+
+    @property
+    def waves_per_round(self) -> int:
+        return max(self.circle_size - 1, 0)
+
+    @property
+    def matches_per_round(self) -> int:
+        return self.num_players * (self.num_players - 1) // 2
+
+    @property
+    def total_waves(self) -> int:
+        return self.rounds * self.waves_per_round
+
+    @property
+    def total_matches(self) -> int:
+        return self.rounds * self.matches_per_round
+
+    def has_next_wave(self) -> bool:
+        return self.cursor < self.total_waves
+
+    def wave_position(self, wave_index: int) -> Tuple[int, int]:
+        """Map a 0-based global wave index to (round_id, wave_id), both 1-based"""
+        round_num, wave_num = divmod(wave_index, self.waves_per_round)
+        return round_num + 1, wave_num + 1
+
+    def _at(self, circle_index: int, wave_num: int) -> Optional[str]:
+        """Player sitting at a circle position in a 0-based wave of a round"""
+        if circle_index == 0:
+            return self.player_ids[0]
+        rotating = self.circle_size - 1
+        return self.player_ids[1 + (circle_index - 1 - wave_num) % rotating]
+
+    def wave_pairings(self, wave_num: int) -> List[Tuple[str, str]]:
+        """(player1_id, player2_id) pairings of a 0-based wave within a round"""
+        n = self.circle_size
+        pairings = []
+        for i in range(n // 2):
+            player1_id, player2_id = self._at(i, wave_num), self._at(n - 1 - i, wave_num)
+            if player1_id is not None and player2_id is not None:
+                pairings.append((player1_id, player2_id))
+        return pairings
+
+    def next_wave(self) -> Tuple[int, int, List[Tuple[str, str]]]:
+        """Advance the cursor and return (round_id, wave_id, pairings)"""
+        if not self.has_next_wave():
+            raise StopIteration("Schedule exhausted")
+        round_id, wave_id = self.wave_position(self.cursor)
+        self.cursor += 1
+        return round_id, wave_id, self.wave_pairings(wave_id - 1)
+
+    def pairing_for(self, player_id: str, wave_index: int) -> Optional[Tuple[str, str]]:
+        """The pairing a player has in a global wave, or None on a bye"""
+        n = self.circle_size
+        wave_num = wave_index % self.waves_per_round
+        position = self.positions[player_id]
+        if position == 0:
+            circle_index = 0
+        else:
+            circle_index = 1 + (position - 1 + wave_num) % (n - 1)
+        opponent_index = n - 1 - circle_index
+        opponent_id = self._at(opponent_index, wave_num)
+        if opponent_id is None:
+            return None
+        if circle_index < opponent_index:
+            return player_id, opponent_id
+        return opponent_id, player_id
+
+    def next_pairing_for(self, player_id: str) -> Optional[Tuple[int, int, Tuple[str, str]]]:
+        """First not-yet-released (round_id, wave_id, pairing) involving a player"""
+        if player_id not in self.positions:
+            return None
+        # A player sits out at most one wave in a row
+        for wave_index in range(self.cursor, min(self.cursor + 2, self.total_waves)):
+            pairing = self.pairing_for(player_id, wave_index)
+            if pairing is not None:
+                round_id, wave_id = self.wave_position(wave_index)
+                return round_id, wave_id, pairing
+        return None
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"player_ids": self.player_ids[:self.num_players], "rounds": self.rounds, "cursor": self.cursor}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "LazySchedule":
+        schedule = cls(state["player_ids"], state["rounds"])
+        schedule.cursor = state["cursor"]
+        return schedule
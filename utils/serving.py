@@ -0,0 +1,97 @@
+"""
+Running agent apps on a TCP port, a Unix domain socket or both
+"""
+import logging
+import os
+import socket
+import stat
+from typing import Callable, List, Optional
+
+import uvicorn
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def bind_tcp_socket(host: str, port: int) -> socket.socket:
+    """
+    Bind a listening TCP socket.
+
+    The socket is created with an explicit IPPROTO_TCP: asyncio only sets
+    TCP_NODELAY on connections whose socket says so, and with Nagle left
+    on every response waits out the peer's delayed ACK (~40 ms).
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    address = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM, socket.IPPROTO_TCP)[0][4]
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(address)
+    return sock
+
+
+def bind_unix_socket(path: str) -> socket.socket:
+    """Bind a listening socket file, replacing one left behind by a previous run"""
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        os.unlink(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, 0o666)
+    return sock
+
+
+class _Server(uvicorn.Server):
+    """uvicorn server that ends streaming responses and removes its socket file on shutdown"""
+
+    def __init__(self, config: uvicorn.Config, uds: Optional[str], on_shutdown: Optional[Callable[[], None]]):
+        super().__init__(config)
+        self.uds = uds
+        self.on_shutdown = on_shutdown
+
+    async def shutdown(self, sockets=None):
+        # uvicorn waits for open connections, so endless responses must end first
+        if self.on_shutdown is not None:
+            self.on_shutdown()
+        await super().shutdown(sockets)
+        # uvicorn re-raises the stopping signal afterwards, so clean up here
+        if self.uds is not None and os.path.exists(self.uds):
+            os.unlink(self.uds)
+
+
+def serve_app(app, host: str = "localhost", port: Optional[int] = None, uds: Optional[str] = None,
+              on_shutdown: Optional[Callable[[], None]] = None):
+    """
+    Serve an ASGI app until interrupted.
+
+    One uvicorn server (and one lifespan) listens on every requested
+    socket, so an agent can be reached over TCP, over its socket file or
+    both.
+
+    Args:
+        app: The FastAPI app
+        host: TCP interface to bind
+        port: TCP port, or None for no TCP listener
+        uds: Unix domain socket path, or None for no socket file
+        on_shutdown: Called when shutdown starts, to end long-lived
+            responses such as event streams
+
+    Raises:
+        ValueError: If neither a port nor a socket path is given
+    """
+    if port is None and uds is None:
+        raise ValueError("Serve on a port, a Unix domain socket or both")
+    config = uvicorn.Config(app, host=host, port=port or 0)
+    sockets: List[socket.socket] = []
+    if port is not None:
+        sockets.append(bind_tcp_socket(host, port))
+        logger.info(f"Listening on http://{host}:{port}")
+    if uds is not None:
+        sockets.append(bind_unix_socket(uds))
+        logger.info(f"Listening on unix:{os.path.abspath(uds)}")
+    try:
+        _Server(config, uds, on_shutdown).run(sockets=sockets)
+    finally:
+        for sock in sockets:
+            sock.close()
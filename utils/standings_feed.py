@@ -0,0 +1,91 @@
+"""
+Versioned standings changes for delta LEAGUE_STANDINGS_UPDATE broadcasts
+"""
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+class StandingsFeed:
+    """
+    Change log of the standings table, one entry per published version.
+
+    Match results mark the players whose stats changed, and commit()
+    turns everything marked since the last broadcast into a new version.
+    For each recipient the feed remembers the newest version delivered to
+    it, so the next update can carry only the rows changed since then.
+    Recipients that are new, or whose version is older than the retained
+    history, get the full table instead.
+
+    Players whose stats did not change keep their relative order, so a
+    delta does not need the rows of everyone whose rank merely shifted:
+    receivers drop the changed players from their copy and reinsert them
+    at their new ranks (see apply_standings_delta). Rows are complete, not
+    increments, so an update from base version B to version V applies to
+    any copy at a version between B and V.
+    """
+
+    def __init__(self, history: int = 256):
+        self.version = 0
+        # Players whose rows changed since the last committed version
+        self.pending: Set[str] = set()
+        self.pending_results = 0
+        self._changes: Deque[Tuple[int, FrozenSet[str]]] = deque(maxlen=history)
+        # Newest version delivered to each recipient
+        self.delivered: Dict[str, int] = {}
+
+    def mark(self, player_ids: Iterable[str]):
+        """Record that these players' rows changed"""
+        self.pending.update(player_ids)
+
+    def commit(self) -> int:
+        """Publish the pending changes as a new version (if any) and return the current version"""
+        if self.pending:
+            self.version += 1
+            self._changes.append((self.version, frozenset(self.pending)))
+            self.pending = set()
+        self.pending_results = 0
+        return self.version
+
+    def changed_since(self, base: int) -> Optional[Set[str]]:
+        """
+        Players whose rows changed after version base.
+
+        Returns:
+            The player IDs, or None if the copy at base cannot be brought
+            up to date from the retained history and needs the full table
+        """
+        if base <= 0 or base > self.version:
+            return None
+        if not self._changes or self._changes[0][0] > base + 1:
+            return None
+        changed: Set[str] = set()
+        for version, player_ids in reversed(self._changes):
+            if version <= base:
+                break
+            changed |= player_ids
+        return changed
+
+    def acknowledge(self, recipient_id: str, version: int):
+        """Remember that a recipient now holds the given version"""
+        if version > self.delivered.get(recipient_id, 0):
+            self.delivered[recipient_id] = version
+
+
+def apply_standings_delta(standings: Dict[str, Dict[str, Any]], rows: List[Dict[str, Any]]):
+    """
+    Apply the changed rows of a delta update to a local standings copy in place.
+
+    Args:
+        standings: Rows by player ID, at a version between the update's
+            base version and its new version
+        rows: The update's rows, each carrying the player's new rank
+    """
+    changed = {row["player_id"] for row in rows}
+    order = [row for row in sorted(standings.values(), key=lambda row: row["rank"])
+             if row["player_id"] not in changed]
+    for row in sorted(rows, key=lambda row: row["rank"]):
+        order.insert(row["rank"] - 1, row)
+    for rank, row in enumerate(order, start=1):
+        if row["rank"] != rank:
+            row = dict(row, rank=rank)
+        standings[row["player_id"]] = row
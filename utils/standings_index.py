@@ -0,0 +1,59 @@
+"""
+Incrementally maintained ranked standings index
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Tuple
+
+
+class StandingsIndex:
+    """
+    Player IDs kept in standings order at all times.
+
+    Ordering matches the league table: points, then wins, then draws (all
+    descending), with ties kept in registration order. Reporting a match
+    result repositions just the two players involved, so rank lookups and
+    top-K queries never need a full re-sort.
+    """
+
+    def __init__(self):
+        # Sorted list of (-points, -wins, -draws, registration_seq, player_id)
+        self._keys: List[Tuple[int, int, int, int, str]] = []
+        self._key_of: Dict[str, Tuple[int, int, int, int, str]] = {}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._key_of
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate player IDs from first to last place"""
+        return (key[4] for key in self._keys)
+
+    def add(self, player_id: str, points: int = 0, wins: int = 0, draws: int = 0):
+        """Insert a newly registered player"""
+        if player_id in self._key_of:
+            raise ValueError(f"Player {player_id} already in standings")
+        key = (-points, -wins, -draws, self._next_seq, player_id)
+        self._next_seq += 1
+        self._key_of[player_id] = key
+        insort(self._keys, key)
+
+    def update(self, player_id: str, points: int, wins: int, draws: int):
+        """Move a player to the position matching their new totals"""
+        old_key = self._key_of[player_id]
+        new_key = (-points, -wins, -draws, old_key[3], player_id)
+        if new_key == old_key:
+            return
+        del self._keys[bisect_left(self._keys, old_key)]
+        insort(self._keys, new_key)
+        self._key_of[player_id] = new_key
+
+    def rank(self, player_id: str) -> int:
+        """Return the 1-indexed standings position of a player"""
+        return bisect_left(self._keys, self._key_of[player_id]) + 1
+
+    def top(self, k: int) -> List[str]:
+        """Return the IDs of the first k players"""
+        return [key[4] for key in self._keys[:k]]
@@ -0,0 +1,111 @@
+"""
+Per-agent subscriptions to league broadcast topics
+
+Agents declare in player_meta/referee_meta at registration, or later with
+LEAGUE_SUBSCRIBE, which broadcasts they want:
+    {"standings": "full" | "top" | "own" | "none", "top_k": 10, "rounds": true}
+
+- standings "full": the whole table, kept current with delta updates
+- standings "top": the first top_k rows, sent when they change
+- standings "own": the agent's own row only (players), sent when it changes
+- standings "none": no LEAGUE_STANDINGS_UPDATE at all
+- rounds: whether ROUND_COMPLETED and LEAGUE_COMPLETED are delivered
+"""
+from typing import Any, Dict, Optional, Tuple
+
+STANDINGS_LEVELS = ("full", "top", "own", "none")
+
+
+class Subscription:
+    """What one agent receives from league broadcasts"""
+    __slots__ = ("standings", "top_k", "rounds")
+
+    def __init__(self, standings: str = "full", top_k: int = 0, rounds: bool = True):
+        self.standings = standings
+        self.top_k = top_k
+        self.rounds = rounds
+
+    @classmethod
+    def from_spec(cls, spec: Optional[Dict[str, Any]], default: "Subscription") -> "Subscription":
+        """
+        Parse a subscriptions object, taking unspecified topics from default.
+
+        Raises:
+            ValueError: If the object is malformed
+        """
+        if spec is None:
+            return cls(default.standings, default.top_k, default.rounds)
+        if not isinstance(spec, dict):
+            raise ValueError("subscriptions must be an object")
+        unknown = set(spec) - {"standings", "top_k", "rounds"}
+        if unknown:
+            raise ValueError(f"Unknown subscription topics: {', '.join(sorted(unknown))}")
+        standings = spec.get("standings", default.standings)
+        if standings not in STANDINGS_LEVELS:
+            raise ValueError(f"standings must be one of {', '.join(STANDINGS_LEVELS)}, not {standings!r}")
+        top_k = spec.get("top_k", default.top_k if standings == default.standings else 0)
+        if standings == "top" and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+            raise ValueError("standings 'top' needs a positive integer top_k")
+        rounds = spec.get("rounds", default.rounds)
+        if not isinstance(rounds, bool):
+            raise ValueError("rounds must be true or false")
+        return cls(standings, top_k if standings == "top" else 0, rounds)
+
+    def to_spec(self) -> Dict[str, Any]:
+        spec = {"standings": self.standings, "rounds": self.rounds}
+        if self.standings == "top":
+            spec["top_k"] = self.top_k
+        return spec
+
+
+PLAYER_DEFAULT = Subscription("full", rounds=True)
+# Referees never act on standings
+REFEREE_DEFAULT = Subscription("none", rounds=True)
+
+
+class SubscriptionRegistry:
+    """
+    Subscriptions of every registered agent, plus what each top-K or
+    own-row subscriber last received so unchanged rows are not resent.
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._sent: Dict[str, Tuple] = {}
+
+    def set(self, recipient_id: str, subscription: Subscription):
+        """Replace an agent's subscription; its next update starts from scratch"""
+        self.subscriptions[recipient_id] = subscription
+        self._sent.pop(recipient_id, None)
+
+    def get(self, recipient_id: str) -> Subscription:
+        return self.subscriptions.get(recipient_id, PLAYER_DEFAULT)
+
+    def is_current(self, recipient_id: str, signature: Tuple) -> bool:
+        """Whether the recipient already holds rows with this signature"""
+        return self._sent.get(recipient_id) == signature
+
+    def record(self, recipient_id: str, signature: Tuple):
+        """Remember the rows delivered to a top-K or own-row subscriber"""
+        self._sent[recipient_id] = signature
+
+
+def parse_subscription_option(value: str) -> Dict[str, Any]:
+    """
+    Subscriptions object for a command line value.
+
+    Accepts full, own, top:K, rounds (round events only) and none.
+
+    Raises:
+        ValueError: If the value is not one of those
+    """
+    if value == "rounds":
+        return {"standings": "none", "rounds": True}
+    if value == "none":
+        return {"standings": "none", "rounds": False}
+    if value in ("full", "own"):
+        return {"standings": value, "rounds": True}
+    level, _, top_k = value.partition(":")
+    if level == "top" and top_k.isdigit() and int(top_k) > 0:
+        return {"standings": "top", "top_k": int(top_k), "rounds": True}
+    raise ValueError(f"Expected full, own, top:K, rounds or none, not {value!r}")
@@ -0,0 +1,216 @@
+"""
+Message transports for league agents
+
+HttpTransport (the default) posts JSON-RPC bodies to agents' /mcp URLs over
+pooled keep-alive connections. InProcessTransport routes the same bodies
+straight to the handlers of agents living in the same event loop.
+
+Besides http:// URLs, agents on the same host can be reached through
+Unix domain socket endpoints of the form unix:<socket path>.
+"""
+import asyncio
+import inspect
+import os
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Any, Optional, Set, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from utils import binary_codec
+from utils.codec import ACCEPT_BINARY, BINARY_HEADERS, JSON_HEADERS, body_of, encode_body, is_binary, loads
+
+# Request headers by (body is binary, binary responses accepted)
+_REQUEST_HEADERS = {
+    (False, False): JSON_HEADERS,
+    (False, True): {**JSON_HEADERS, "Accept": ACCEPT_BINARY},
+    (True, True): {**BINARY_HEADERS, "Accept": ACCEPT_BINARY},
+}
+
+UNIX_SCHEME = "unix:"
+
+
+def unix_endpoint(path: str) -> str:
+    """Contact endpoint of an agent serving /mcp on a Unix domain socket"""
+    return UNIX_SCHEME + os.path.abspath(path)
+
+
+def unix_socket_path(url: str) -> Optional[str]:
+    """Socket path of a unix: endpoint, None for other URLs"""
+    return url[len(UNIX_SCHEME):] if url.startswith(UNIX_SCHEME) else None
+
+
+def endpoint_host(url: str) -> str:
+    """Key of the agent behind an endpoint: its socket path or its host:port"""
+    return unix_socket_path(url) or urlsplit(url).netloc
+
+
+def http_url(url: str, path: str = "/mcp") -> str:
+    """URL to request for an endpoint (over its socket for unix: endpoints)"""
+    return f"http://localhost{path}" if url.startswith(UNIX_SCHEME) else url
+
+
+class Transport(ABC):
+    """Interface shared by all transports"""
+
+    @abstractmethod
+    async def post(self, url: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        """Deliver a JSON-RPC body (plain or Encoded) to an agent and return its decoded response (or None)"""
+
+    async def aclose(self):
+        """Release any resources held by the transport"""
+
+
+class HttpTransport(Transport):
+    """
+    Keep-alive connection pools shared by every agent in the process.
+
+    Each destination host gets its own small httpx.AsyncClient pool so
+    consecutive messages to the same agent reuse open TCP connections.
+    A semaphore per host caps how many requests can be in flight towards
+    one agent; keeping pools per host also keeps httpcore's connection
+    bookkeeping cheap when hundreds of games run concurrently.
+
+    With binary=True bodies start out as JSON with an Accept header naming
+    the binary format. Once a host answers in binary, later bodies to it
+    are sent binary as well; hosts that never do (older agents) stay on
+    JSON. The binary format is smaller but encoded in pure Python, so it
+    pays off on constrained links rather than on localhost.
+    """
+
+    def __init__(self, max_connections_per_host: int = 8, keepalive_expiry: float = 30.0,
+                 timeout: float = 30.0, binary: bool = False):
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_connections_per_host,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.binary = binary
+        # Hosts that answered in the binary format
+        self.binary_hosts: Set[str] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _pool(self, url: str) -> tuple[str, httpx.AsyncClient, asyncio.Semaphore]:
+        """Return the host (or socket path), client and in-flight slot for the URL"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Connections cannot be shared across event loops
+            self._clients = {}
+            self._host_slots = {}
+            self._loop = loop
+
+        host = endpoint_host(url)
+        client = self._clients.get(host)
+        if client is None:
+            uds = unix_socket_path(url)
+            # Connections to unix: endpoints go through the socket file
+            transport = httpx.AsyncHTTPTransport(uds=uds, limits=self.limits) if uds else None
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, transport=transport)
+            self._clients[host] = client
+            self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return host, client, self._host_slots[host]
+
+    async def post(self, url: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        """
+        POST a JSON payload and return the decoded JSON response.
+
+        Args:
+            url: Agent endpoint URL (http:// or unix:)
+            payload: JSON-serializable body (usually a JSON-RPC message) or an
+                Encoded one, whose existing bytes are sent
+            timeout: Per-request timeout in seconds (defaults to transport timeout)
+
+        Returns:
+            Decoded JSON response body, or None if the receiver sent no body
+            (e.g. 204 No Content for notifications)
+
+        Raises:
+            httpx.HTTPError: On connection failure, timeout or non-2xx status
+        """
+        host, client, slot = self._pool(url)
+        send_binary = self.binary and host in self.binary_hosts
+        async with slot:
+            response = await client.post(http_url(url), content=encode_body(payload, binary=send_binary),
+                                         headers=_REQUEST_HEADERS[send_binary, self.binary],
+                                         timeout=timeout or self.timeout)
+        if send_binary and response.status_code in (400, 415, 422):
+            # The agent was replaced by one that only reads JSON
+            self.binary_hosts.discard(host)
+            return await self.post(url, payload, timeout)
+        response.raise_for_status()
+        if response.status_code == 204 or not response.content:
+            return None
+        if is_binary(response.headers.get("content-type")):
+            self.binary_hosts.add(host)
+            return binary_codec.decode(response.content)
+        return loads(response.content)
+
+    async def aclose(self):
+        """Close all pooled connections"""
+        clients, self._clients, self._host_slots = self._clients, {}, {}
+        self.binary_hosts.clear()
+        for client in clients.values():
+            await client.aclose()
+        self._loop = None
+
+
+Handler = Callable[[Any], Union[Any, Awaitable[Any]]]
+
+
+class InProcessTransport(Transport):
+    """
+    Routes league.v2 messages directly to agent handlers in this process.
+
+    Agents keep using their usual endpoint URLs; the transport looks the
+    URL up in its registry and calls the matching handler with the
+    JSON-RPC body, so no sockets, HTTP framing or JSON encoding are
+    involved. Bodies are passed by reference and must not be mutated by
+    receivers.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Handler] = {}
+
+    def register(self, url: str, handler: Handler):
+        """Route messages for a URL to a (sync or async) body handler"""
+        self.handlers[url] = handler
+
+    def register_league_manager(self, league_manager, url: str = "http://localhost:8000/mcp"):
+        from utils.league_endpoints import handle_mcp_body
+        self.register(url, lambda body: handle_mcp_body(body, league_manager))
+
+    def register_referee(self, referee):
+        self.register(referee.endpoint, referee.handle_message)
+
+    def register_player(self, player):
+        self.register(player.agent_endpoint, player.handle_message)
+
+    async def post(self, url: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Call the handler registered for a URL.
+
+        Raises:
+            ConnectionError: If no agent is registered under the URL
+        """
+        handler = self.handlers.get(url)
+        if handler is None:
+            raise ConnectionError(f"No in-process agent registered for {url}")
+        result = handler(body_of(payload))
+        if inspect.isawaitable(result):
+            result = await result
+        return body_of(result)
+
+
+_default_transport: Optional[HttpTransport] = None
+
+
+def get_default_transport() -> HttpTransport:
+    """Return the process-wide shared transport"""
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = HttpTransport()
+    return _default_transport
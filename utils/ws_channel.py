@@ -0,0 +1,318 @@
+"""
+Persistent WebSocket channels between league agents
+
+A channel is one long-lived WebSocket over which both ends send league.v2
+JSON-RPC bodies and receive the replies, so a game's invitation, parity
+calls and GAME_OVER cost a frame each instead of an HTTP request. Every
+agent app serves channels on /ws next to /mcp; WebSocketTransport dials
+them and falls back to HTTP POST for agents that do not.
+
+Each frame is one flag byte, a 4-byte stream ID and the body (JSON, or
+binary_codec when the sender uses the binary format). Replies carry the
+stream ID of their request: agents reuse JSON-RPC ids and conversation
+IDs across messages, so neither can tell concurrent calls apart.
+"""
+import asyncio
+import inspect
+import itertools
+import logging
+import struct
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+from urllib.parse import quote, urlsplit, urlunsplit
+
+from utils import binary_codec
+from utils.codec import encode_body, loads
+from utils.transport import Handler, HttpTransport, endpoint_host, http_url, unix_socket_path
+
+try:
+    from websockets.asyncio.client import connect, unix_connect
+    from websockets.exceptions import InvalidHandshake
+except ImportError:  # pragma: no cover - websockets is optional
+    connect = None
+
+logger = logging.getLogger(__name__)
+
+# Frame flags
+RESPONSE = 1
+BINARY = 2
+ERROR = 4
+
+_header = struct.Struct(">BI")
+# Largest frame accepted from a peer (final standings of big leagues are a few MB)
+MAX_FRAME_SIZE = 64 * 2 ** 20
+
+
+class ChannelError(Exception):
+    """The peer failed to handle a request sent over a channel"""
+
+
+class Channel:
+    """
+    One end of a WebSocket carrying JSON-RPC bodies in both directions.
+
+    call() sends a request frame and waits for the reply with the same
+    stream ID. Request frames from the peer are handed to the handler in
+    their own task, so a slow handler never holds up other calls sharing
+    the socket.
+    """
+
+    def __init__(self, send: Callable[[bytes], Awaitable[None]], handler: Optional[Handler] = None,
+                 binary: bool = False):
+        self._send = send
+        self.handler = handler
+        self.binary = binary
+        self.closed = False
+        self._stream_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
+
+    async def _write(self, flags: int, stream_id: int, body: bytes):
+        async with self._send_lock:
+            await self._send(_header.pack(flags, stream_id) + body)
+
+    async def call(self, payload: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Send a JSON-RPC body (plain or Encoded) and return the peer's decoded reply (or None).
+
+        Raises:
+            ConnectionError: If the channel is or gets closed before the reply
+            ChannelError: If the peer's handler failed
+            asyncio.TimeoutError: If no reply arrives within timeout seconds
+        """
+        if self.closed:
+            raise ConnectionError("Channel is closed")
+        stream_id = next(self._stream_ids) & 0xffffffff
+        future = asyncio.get_running_loop().create_future()
+        self._pending[stream_id] = future
+        try:
+            await self._write(BINARY if self.binary else 0, stream_id, encode_body(payload, binary=self.binary))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(stream_id, None)
+
+    async def _handle_request(self, stream_id: int, flags: int, body: bytes):
+        try:
+            message = binary_codec.decode(body) if flags & BINARY else loads(body)
+            result = self.handler(message)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            logger.error(f"Error handling channel request: {e}", exc_info=True)
+            reply_flags, reply = RESPONSE | ERROR, (str(e) or type(e).__name__).encode("utf-8")
+        else:
+            reply_flags = RESPONSE | (BINARY if self.binary else 0)
+            reply = b"" if result is None else encode_body(result, binary=self.binary)
+        if not self.closed:
+            await self._write(reply_flags, stream_id, reply)
+
+    def _receive(self, frame: bytes):
+        flags, stream_id = _header.unpack_from(frame)
+        body = frame[_header.size:]
+        if not flags & RESPONSE:
+            task = asyncio.create_task(self._handle_request(stream_id, flags, body))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+        future = self._pending.get(stream_id)
+        if future is None or future.done():
+            # The caller already gave up on this reply
+            return
+        if flags & ERROR:
+            future.set_exception(ChannelError(body.decode("utf-8", "replace")))
+        elif not body:
+            future.set_result(None)
+        else:
+            try:
+                future.set_result(binary_codec.decode(body) if flags & BINARY else loads(body))
+            except ValueError as e:
+                future.set_exception(e)
+
+    async def serve(self, frames: AsyncIterator[Any]):
+        """Dispatch incoming frames until the socket closes, then fail the calls still waiting"""
+        try:
+            async for frame in frames:
+                if isinstance(frame, str):
+                    frame = frame.encode("utf-8")
+                if len(frame) >= _header.size:
+                    self._receive(frame)
+        except Exception as e:
+            logger.debug(f"Channel closed: {e}")
+        finally:
+            self.close()
+
+    def close(self):
+        """Mark the channel closed and fail pending calls"""
+        self.closed = True
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Channel closed before the reply arrived"))
+
+
+def channel_url(url: str, endpoint: Optional[str] = None) -> str:
+    """ws:// URL of the channel served next to an agent's /mcp URL (or unix: endpoint)"""
+    parts = urlsplit(http_url(url))
+    path = parts.path[:-len("/mcp")] if parts.path.endswith("/mcp") else parts.path.rstrip("/")
+    query = f"endpoint={quote(endpoint, safe='')}" if endpoint else ""
+    return urlunsplit(("wss" if parts.scheme == "https" else "ws", parts.netloc, path + "/ws", query, ""))
+
+
+class WebSocketTransport(HttpTransport):
+    """
+    HTTP transport that prefers persistent channels.
+
+    The first message to a host dials its /ws endpoint, announcing this
+    agent's own endpoint so the peer can push requests back over the same
+    socket; later messages in either direction reuse it. A channel that a
+    peer dials in carries messages to the exact endpoint it announced,
+    once the peer has proved it is the agent there (see serve_channel).
+    Hosts that refuse the handshake are remembered and reached over HTTP
+    POST, as is every host when the websockets package is not installed.
+
+    Args:
+        endpoint: This agent's /mcp URL, announced to the peers it dials
+        handler: This agent's body handler, called for requests that
+            peers push over dialed channels
+        **kwargs: HttpTransport options
+    """
+
+    def __init__(self, endpoint: Optional[str] = None, handler: Optional[Handler] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self.handler = handler
+        # Open channels by peer host
+        self.channels: Dict[str, Channel] = {}
+        # Channels dialed in by verified peers, by their exact endpoint
+        self.inbound: Dict[str, Channel] = {}
+        # Hosts without a channel endpoint
+        self.http_hosts: Set[str] = set()
+        self._dialing: Dict[str, asyncio.Future] = {}
+        self._connections: Set[Any] = set()
+        # Reader tasks of dialed channels
+        self._tasks: Set[asyncio.Task] = set()
+
+    def attach(self, endpoint: str, channel: Channel):
+        """Use a channel dialed in by the agent at endpoint for messages to that endpoint"""
+        self.inbound[endpoint] = channel
+
+    def detach(self, endpoint: str, channel: Channel):
+        if self.inbound.get(endpoint) is channel:
+            del self.inbound[endpoint]
+
+    async def _dial(self, url: str, host: str) -> Optional[Channel]:
+        uds = unix_socket_path(url)
+        options = {"max_size": MAX_FRAME_SIZE, "compression": None, "open_timeout": self.timeout}
+        try:
+            if uds:
+                connection = await unix_connect(uds, channel_url(url, self.endpoint), **options)
+            else:
+                connection = await connect(channel_url(url, self.endpoint), **options)
+        except InvalidHandshake as e:
+            # No /ws there (an older agent): use HTTP from now on
+            logger.info(f"No channel endpoint at {host}, using HTTP: {e}")
+            self.http_hosts.add(host)
+            return None
+        except OSError:
+            # Unreachable; let the HTTP attempt report it without remembering anything
+            return None
+        channel = Channel(connection.send, self.handler, self.binary)
+        self.channels[host] = channel
+        self._connections.add(connection)
+
+        async def serve():
+            await channel.serve(connection)
+            self._connections.discard(connection)
+            if self.channels.get(host) is channel:
+                del self.channels[host]
+
+        task = asyncio.create_task(serve())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return channel
+
+    async def _channel(self, url: str) -> Optional[Channel]:
+        """Open channel to the URL's host, dialing it first if needed (None means use HTTP)"""
+        channel = self.inbound.get(url)
+        if channel is not None and not channel.closed:
+            return channel
+        host = endpoint_host(url)
+        channel = self.channels.get(host)
+        if channel is not None and not channel.closed:
+            return channel
+        if connect is None or host in self.http_hosts:
+            return None
+        dialing = self._dialing.get(host)
+        if dialing is not None:
+            # Concurrent first messages to a host share one handshake
+            return await asyncio.shield(dialing)
+        dialing = self._dialing[host] = asyncio.get_running_loop().create_future()
+        channel = None
+        try:
+            channel = await self._dial(url, host)
+        finally:
+            del self._dialing[host]
+            dialing.set_result(channel)
+        return channel
+
+    async def post(self, url: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Deliver a body over the host's channel, or by HTTP POST if it has none.
+
+        Raises:
+            ConnectionError: If the channel closes before the reply arrives
+            ChannelError: If the receiving agent failed to handle the body
+            asyncio.TimeoutError: If the reply takes longer than the timeout
+            httpx.HTTPError: On HTTP fallback failures
+        """
+        channel = await self._channel(url)
+        if channel is None:
+            return await super().post(url, payload, timeout)
+        return await channel.call(payload, timeout or self.timeout)
+
+    async def aclose(self):
+        """Close all channels and pooled connections"""
+        connections, self._connections = self._connections, set()
+        for channel in (*self.channels.values(), *self.inbound.values()):
+            channel.close()
+        self.channels, self.inbound = {}, {}
+        self.http_hosts.clear()
+        for connection in connections:
+            await connection.close()
+        await super().aclose()
+
+
+async def serve_channel(websocket, handler: Handler, transport: Any = None,
+                        verify: Optional[Callable[[str, Any], bool]] = None):
+    """
+    Serve a channel dialed in to an agent's /ws endpoint (a Starlette WebSocket).
+
+    Requests from the peer go to the agent's body handler and are answered
+    over the channel. The endpoint the peer announces is not trusted by
+    itself: only once a request it sent passes verify(endpoint, body)
+    (checked after the handler ran, e.g. a message with the auth token of
+    the agent at that endpoint) does an agent using a WebSocketTransport
+    also send its own messages for that exact endpoint over this channel.
+    Without verify the channel only carries replies.
+    """
+    await websocket.accept()
+    channel = Channel(websocket.send_bytes, handler, getattr(transport, "binary", False))
+    endpoint = websocket.query_params.get("endpoint")
+    attached = False
+    if endpoint and verify is not None and isinstance(transport, WebSocketTransport):
+        async def handle(body: Any) -> Any:
+            nonlocal attached
+            result = handler(body)
+            if inspect.isawaitable(result):
+                result = await result
+            if not attached and not channel.closed and verify(endpoint, body):
+                transport.attach(endpoint, channel)
+                attached = True
+            return result
+
+        channel.handler = handle
+    try:
+        await channel.serve(websocket.iter_bytes())
+    finally:
+        if attached:
+            transport.detach(endpoint, channel)